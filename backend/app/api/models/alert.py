@@ -1,6 +1,7 @@
 from datetime import datetime
-from pydantic import Field, UUID4
-from typing import Optional
+from enum import Enum
+from pydantic import BaseModel, conint, conlist, Field, root_validator, UUID4
+from typing import List, Optional, Union
 from uuid import uuid4
 
 from api.models import type_str, validators
@@ -11,6 +12,8 @@ from api.models.alert_tool_instance import AlertToolInstanceRead
 from api.models.alert_type import AlertTypeRead
 from api.models.analysis import AnalysisRead
 from api.models.node import NodeBase, NodeCreate, NodeRead, NodeUpdate
+from api.models.node_tree import AnalysisTreeCreate, AnalysisTreeRead, AnalysisTreeUUIDs
+from api.models.pagination import Page
 from api.models.user import UserRead
 
 
@@ -47,9 +50,35 @@ class AlertBase(NodeBase):
 
 
 class AlertCreate(NodeCreate, AlertBase):
+    fingerprint: Optional[type_str] = Field(
+        description="""An optional value that identifies the detection, such as a hash of the email's message ID or of
+            the IDS signature and host. If the alert's tool or type has a dedup window, an alert created with the same
+            fingerprint, type, and tool as an open alert inside of the window is merged into that alert instead."""
+    )
+
     uuid: UUID4 = Field(default_factory=uuid4, description="The UUID of the alert")
 
 
+class AlertTreeCreate(AlertCreate):
+    analysis: AnalysisTreeCreate = Field(
+        default_factory=AnalysisTreeCreate,
+        description="The analysis representing this alert along with the observable instances and analyses beneath it"
+    )
+
+
+class AlertTreeUUIDs(BaseModel):
+    """The UUIDs that were assigned to the nodes of an alert tree when it was created."""
+
+    analysis: AnalysisTreeUUIDs = Field(
+        description="The UUIDs of the analysis representing this alert and its children"
+    )
+
+    uuid: UUID4 = Field(
+        description="""The UUID of the alert. This is the UUID of the existing alert if the new one was merged into it
+            as a duplicate."""
+    )
+
+
 class AlertRead(NodeRead, AlertBase):
     analysis: AnalysisRead = Field(description="The analysis representing this alert")
 
@@ -61,8 +90,12 @@ class AlertRead(NodeRead, AlertBase):
 
     disposition_user: Optional[UserRead] = Field(description="The user who most recently dispositioned this alert")
 
+    duplicate_count: int = Field(description="The number of duplicate alerts that were merged into this alert")
+
     event_uuid: Optional[UUID4] = Field(description="The UUID of the event containing this alert")
 
+    fingerprint: Optional[str] = Field(description="The value that identifies the detection this alert represents")
+
     insert_time: datetime = Field(description="The time this alert was created")
 
     owner: Optional[UserRead] = Field(description="The user who has taken ownership of this alert")
@@ -83,6 +116,161 @@ class AlertRead(NodeRead, AlertBase):
         orm_mode = True
 
 
+class AlertCount(BaseModel):
+    """Represents the number of alerts that share the same value of a field (such as their disposition)."""
+
+    count: int = Field(description="The number of alerts")
+
+    value: Optional[str] = Field(description="The value of the field. This is null for alerts without a value.")
+
+
+class ObservableAlertsRead(Page[AlertRead]):
+    """Represents a page of the alerts that contain an observable along with counts of every alert that contains it."""
+
+    dispositions: List[AlertCount] = Field(
+        description="The number of alerts containing the observable with each disposition"
+    )
+
+    queues: List[AlertCount] = Field(description="The number of alerts containing the observable in each queue")
+
+
+class AlertTreeRead(AlertRead):
+    analysis: AnalysisTreeRead = Field(
+        description="The analysis representing this alert along with the observable instances and analyses beneath it"
+    )
+
+
+class AlertSort(str, Enum):
+    """The columns that can be used to sort the alerts when listing them. Alerts are always listed newest first."""
+
+    event_time = "event_time"
+    insert_time = "insert_time"
+
+
+class AlertSearchField(str, Enum):
+    """The fields that alerts can be searched on. The directive, tag, and threat fields match the values assigned to the
+    alert itself, and the observable field matches the observables of any observable instance in the alert."""
+
+    directive = "directive"
+    disposition = "disposition"
+    disposition_time = "disposition_time"
+    event_time = "event_time"
+    event_uuid = "event_uuid"
+    fingerprint = "fingerprint"
+    insert_time = "insert_time"
+    name = "name"
+    observable = "observable"
+    owner = "owner"
+    queue = "queue"
+    tag = "tag"
+    threat = "threat"
+    tool = "tool"
+    tool_instance = "tool_instance"
+    type = "type"
+
+
+class AlertSearchOperator(str, Enum):
+    """The operators used to compare a field to the value of a search condition."""
+
+    contains = "contains"
+    eq = "eq"
+    gt = "gt"
+    gte = "gte"
+    in_ = "in"
+    is_null = "is_null"
+    lt = "lt"
+    lte = "lte"
+
+
+class AlertSearchCondition(BaseModel):
+    """Matches the alerts whose field compares to the value using the operator."""
+
+    field: AlertSearchField = Field(description="The field to compare")
+
+    op: AlertSearchOperator = Field(description="The operator used to compare the field to the value")
+
+    type: Optional[type_str] = Field(description="The observable type to match. Required by the observable field.")
+
+    value: Optional[Union[conlist(type_str, min_items=1, max_items=1000), type_str]] = Field(
+        description="""The value to compare the field to. The in operator takes a list of values, the is_null operator
+            does not take a value, and the other operators take a single value. Times are given in ISO 8601 format."""
+    )
+
+    class Config:
+        extra = "forbid"
+
+    @root_validator
+    def _check_value(cls, values):
+        op, value = values.get("op"), values.get("value")
+        if op == AlertSearchOperator.is_null:
+            assert value is None, "The is_null operator does not take a value"
+        elif op == AlertSearchOperator.in_:
+            assert isinstance(value, list), "The in operator requires a list of values"
+        elif op is not None:
+            assert isinstance(value, str), f"The {op.value} operator requires a single value"
+
+        if values.get("field") == AlertSearchField.observable:
+            assert values.get("type"), "The observable field requires a type"
+        else:
+            assert values.get("type") is None, "Only the observable field takes a type"
+
+        return values
+
+
+class AlertSearchAnd(BaseModel):
+    """Matches the alerts that match every one of the filters."""
+
+    and_: List["AlertSearchFilter"] = Field(alias="and", description="The filters (between 1 and 100)")
+
+    class Config:
+        extra = "forbid"
+
+    _list_length: classmethod = validators.list_length(1, 100, "and_")
+
+
+class AlertSearchOr(BaseModel):
+    """Matches the alerts that match any of the filters."""
+
+    or_: List["AlertSearchFilter"] = Field(alias="or", description="The filters (between 1 and 100)")
+
+    class Config:
+        extra = "forbid"
+
+    _list_length: classmethod = validators.list_length(1, 100, "or_")
+
+
+class AlertSearchNot(BaseModel):
+    """Matches the alerts that do not match the filter."""
+
+    not_: "AlertSearchFilter" = Field(alias="not", description="The filter")
+
+    class Config:
+        extra = "forbid"
+
+
+AlertSearchFilter = Union[AlertSearchAnd, AlertSearchOr, AlertSearchNot, AlertSearchCondition]
+
+AlertSearchAnd.update_forward_refs()
+AlertSearchOr.update_forward_refs()
+AlertSearchNot.update_forward_refs()
+
+
+class AlertSearch(BaseModel):
+    """Represents an ad-hoc search for the alerts matching a tree of filters.
+
+    Every search has to be able to use an index, so conditions that could only be answered by reading every alert are
+    refused. This means that a not filter cannot be used on its own, an and filter needs at least one child that can
+    use an index, and every child of an or filter has to be able to use one."""
+
+    cursor: Optional[str] = Field(description="The cursor pointing to the page of alerts to return")
+
+    filter: AlertSearchFilter = Field(description="The filter the alerts have to match")
+
+    limit: conint(ge=1, le=1000) = Field(50, description="The maximum number of alerts to return")
+
+    sort: AlertSort = Field(AlertSort.insert_time, description="The column used to sort the alerts")
+
+
 class AlertUpdate(NodeUpdate, AlertBase):
     disposition: Optional[type_str] = Field(description="The disposition assigned to this alert")
 
@@ -98,3 +286,52 @@ class AlertUpdate(NodeUpdate, AlertBase):
     type: Optional[type_str] = Field(description="The type of this alert")
 
     _prevent_none: classmethod = validators.prevent_none("queue", "type")
+
+
+class AlertBulkUpdateVersion(BaseModel):
+    """Identifies a single alert in a bulk update along with the version it is expected to be at."""
+
+    uuid: UUID4 = Field(description="The UUID of the alert")
+
+    version: UUID4 = Field(description="The version of the alert")
+
+
+class AlertBulkUpdate(BaseModel):
+    """Represents a change applied to many alerts at once, such as when an analyst dispositions a batch of alerts.
+
+    Only the fields given in the request are changed. The disposition, event_uuid, and owner fields can be set to null
+    to clear them."""
+
+    alerts: conlist(AlertBulkUpdateVersion, min_items=1, max_items=10000) = Field(
+        description="""The alerts to update. Each alert's version must match its current version for the alert to be
+            updated."""
+    )
+
+    disposition: Optional[type_str] = Field(description="The disposition to assign to the alerts")
+
+    event_uuid: Optional[UUID4] = Field(description="The UUID of the event to add the alerts to")
+
+    owner: Optional[type_str] = Field(description="The username of the user to assign the alerts to")
+
+    queue: Optional[type_str] = Field(description="The alert queue to move the alerts to")
+
+    _prevent_none: classmethod = validators.prevent_none("queue")
+
+    @root_validator(pre=True)
+    def _require_change(cls, values):
+        assert {"disposition", "event_uuid", "owner", "queue"} & set(values), "No changes were given"
+        return values
+
+
+class AlertBulkUpdateResult(BaseModel):
+    """Reports the outcome of a bulk alert update for each of the requested alerts."""
+
+    updated: List[AlertBulkUpdateVersion] = Field(
+        description="The alerts that were updated along with the new version they were given"
+    )
+
+    conflicts: List[UUID4] = Field(
+        description="The alerts that were not updated because their version did not match their current version"
+    )
+
+    not_found: List[UUID4] = Field(description="The alerts that do not exist")
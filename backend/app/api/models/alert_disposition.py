@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, UUID4
+from pydantic import BaseModel, Field, StrictBool, UUID4
 from typing import Optional
 from uuid import uuid4
 
@@ -11,6 +11,11 @@ class AlertDispositionBase(BaseModel):
 
     description: Optional[type_str] = Field(description="An optional human-readable description of the disposition")
 
+    malicious: StrictBool = Field(
+        default=False,
+        description="Whether or not alerts with this disposition count as malicious sightings of their observables",
+    )
+
     rank: type_int = Field(description="An integer value used to sort the dispositions")
 
     value: type_str = Field(description="The value of the disposition")
@@ -28,8 +33,12 @@ class AlertDispositionRead(AlertDispositionBase):
 
 
 class AlertDispositionUpdate(AlertDispositionBase):
+    malicious: Optional[StrictBool] = Field(
+        description="Whether or not alerts with this disposition count as malicious sightings of their observables"
+    )
+
     rank: Optional[type_int] = Field(description="An integer value used to sort the dispositions")
 
     value: Optional[type_str] = Field(description="The value of the disposition")
 
-    _prevent_none: classmethod = validators.prevent_none("rank", "value")
+    _prevent_none: classmethod = validators.prevent_none("malicious", "rank", "value")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, UUID4
+from pydantic import BaseModel, conint, Field, UUID4
 from typing import Optional
 from uuid import uuid4
 
@@ -8,6 +8,12 @@ from api.models import type_str, validators
 class AlertToolBase(BaseModel):
     """Represents a type of alert."""
 
+    dedup_window: Optional[conint(gt=0)] = Field(
+        description="""The number of seconds after an alert from this tool is created during which another alert with
+            the same fingerprint is merged into it instead of being created. This takes precedence over the window
+            of the alert's type. The type's window is used if this is null."""
+    )
+
     description: Optional[type_str] = Field(description="An optional human-readable description of the alert tool")
 
     value: type_str = Field(description="The value of the alert tool")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, UUID4
+from pydantic import BaseModel, conint, Field, UUID4
 from typing import Optional
 from uuid import uuid4
 
@@ -8,6 +8,12 @@ from api.models import type_str, validators
 class AlertTypeBase(BaseModel):
     """Represents a type of alert."""
 
+    dedup_window: Optional[conint(gt=0)] = Field(
+        description="""The number of seconds after an alert of this type is created during which another alert with
+            the same fingerprint is merged into it instead of being created. Alerts are not deduplicated if this is
+            null."""
+    )
+
     description: Optional[type_str] = Field(description="An optional human-readable description of the alert type")
 
     value: type_str = Field(description="The value of the alert type")
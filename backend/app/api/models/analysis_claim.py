@@ -0,0 +1,42 @@
+from datetime import datetime
+from pydantic import BaseModel, conint, Field, UUID4
+from typing import Optional
+
+from api.models import type_str
+
+
+class AnalysisClaimCreate(BaseModel):
+    """Represents a request from an analysis worker to claim a batch of observable instances to analyze."""
+
+    analysis_module_type: type_str = Field(
+        description="The value of the analysis module type that will perform the analysis"
+    )
+
+    analysis_module_type_version: type_str = Field(description="The version of the analysis module type")
+
+    lease_seconds: conint(strict=True, ge=1, le=86400) = Field(
+        default=300,
+        description="""The number of seconds the claims last. An observable instance whose analysis was not created
+            before its claim expired can be claimed by another worker.""",
+    )
+
+    limit: conint(strict=True, ge=1, le=1000) = Field(
+        default=10, description="The maximum number of observable instances to claim"
+    )
+
+
+class AnalysisClaimRead(BaseModel):
+    """Represents an observable instance that was claimed for analysis."""
+
+    alert_uuid: Optional[UUID4] = Field(description="The UUID of the alert containing the observable instance")
+
+    expires_on: datetime = Field(description="The time the claim on the observable instance expires")
+
+    observable_instance_uuid: UUID4 = Field(description="The UUID of the claimed observable instance")
+
+    type: type_str = Field(description="The type of the observable")
+
+    value: type_str = Field(description="The value of the observable")
+
+    class Config:
+        orm_mode = True
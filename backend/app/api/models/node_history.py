@@ -1,25 +1,30 @@
 from datetime import datetime
-from pydantic import BaseModel, Field, Json
+from pydantic import BaseModel, Field, UUID4
+from typing import Optional
 
-from api.models.node import Node
-from api.models.node_history_action import NodeHistoryAction
-from api.models.user import User
+from api.models.node_history_action import NodeHistoryActionRead
+from api.models.user import UserRead
 
 
-class NodeHistory(BaseModel):
+class NodeHistoryRead(BaseModel):
     """Represents a historical action performed on a node."""
 
-    id: int = Field(description="The ID of the historical action")
+    uuid: UUID4 = Field(description="The UUID of the historical action")
 
-    action: NodeHistoryAction = Field(description="The action that was performed")
+    action: NodeHistoryActionRead = Field(description="The action that was performed")
 
-    action_user: User = Field(description="The user that performed the action")
+    action_user: Optional[UserRead] = Field(description="The user that performed the action")
 
-    after: Json = Field(description="The JSON representation of the node after the action was performed")
+    after: Optional[dict] = Field(
+        description="The values of the fields that were changed by the action after it was performed"
+    )
 
-    before: Json = Field(description="The JSON representation of the node before the action was performed")
+    before: Optional[dict] = Field(
+        description="""The values of the fields that were changed by the action before it was performed. This is null
+            when the action created the node."""
+    )
 
-    node: Node = Field(description="The node on which the action was performed")
+    node_uuid: UUID4 = Field(description="The UUID of the node on which the action was performed")
 
     timestamp: datetime = Field(description="The time the action was performed")
 
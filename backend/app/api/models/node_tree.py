@@ -0,0 +1,112 @@
+from datetime import datetime
+from pydantic import BaseModel, Field, UUID4
+from typing import List, Optional
+from uuid import uuid4
+
+from api.models import type_str
+from api.models.analysis import AnalysisBase, AnalysisRead
+from api.models.node import NodeCreate, NodeUpdate
+from api.models.observable_instance import ObservableInstanceRead
+
+
+class ObservableInstanceTreeCreate(NodeCreate):
+    """Represents an observable instance (and the analyses performed on it) nested inside of a tree of nodes."""
+
+    analyses: List["AnalysisTreeCreate"] = Field(
+        default_factory=list,
+        description="A list of analyses that were performed on this observable instance"
+    )
+
+    context: Optional[type_str] = Field(
+        description="""Optional context surrounding the observation. This is used to communicate additional information
+            to the analysts, such as where the observation was made. For example, 'Source IP address of the sender of
+            the email.' or 'From address in the email.'"""
+    )
+
+    redirection_uuid: Optional[UUID4] = Field(
+        description="""The UUID of another observable instance to which this one should point. This can be an
+            observable instance in the same tree or one that already exists."""
+    )
+
+    time: datetime = Field(
+        default_factory=datetime.utcnow,
+        description="The time this observable instance was observed"
+    )
+
+    type: type_str = Field(description="The type of the observable instance")
+
+    uuid: UUID4 = Field(default_factory=uuid4, description="The UUID of the observable instance")
+
+    value: type_str = Field(description="The value of the observable instance")
+
+
+class AnalysisTreeCreate(NodeCreate, AnalysisBase):
+    """Represents an analysis (and the observable instances it discovered) nested inside of a tree of nodes."""
+
+    discovered_observables: List[ObservableInstanceTreeCreate] = Field(
+        default_factory=list,
+        description="A list of observable instances discovered while performing this analysis"
+    )
+
+    uuid: UUID4 = Field(default_factory=uuid4, description="The UUID of the analysis")
+
+
+ObservableInstanceTreeCreate.update_forward_refs()
+
+
+class AnalysisResultsCreate(NodeUpdate, AnalysisBase):
+    """Represents the results of an existing analysis submitted all at once by the worker that performed it."""
+
+    discovered_observables: List[ObservableInstanceTreeCreate] = Field(
+        default_factory=list,
+        description="""A list of observable instances discovered while performing this analysis along with any analyses
+            performed on them"""
+    )
+
+
+class ObservableInstanceTreeUUIDs(BaseModel):
+    """The UUIDs that were assigned to an observable instance created as part of a tree of nodes."""
+
+    analyses: List["AnalysisTreeUUIDs"] = Field(
+        description="The UUIDs of the analyses that were performed on this observable instance"
+    )
+
+    observable_uuid: UUID4 = Field(description="The UUID of the observable represented by this instance")
+
+    uuid: UUID4 = Field(description="The UUID of the observable instance")
+
+
+class AnalysisTreeUUIDs(BaseModel):
+    """The UUIDs that were assigned to an analysis created as part of a tree of nodes."""
+
+    discovered_observables: List[ObservableInstanceTreeUUIDs] = Field(
+        description="The UUIDs of the observable instances discovered while performing this analysis"
+    )
+
+    uuid: UUID4 = Field(description="The UUID of the analysis")
+
+
+ObservableInstanceTreeUUIDs.update_forward_refs()
+
+
+class ObservableInstanceTreeRead(ObservableInstanceRead):
+    """Represents an observable instance (and the analyses performed on it) read as part of a tree of nodes."""
+
+    children: List["AnalysisTreeRead"] = Field(
+        default_factory=list,
+        description="""The analyses that were performed on this observable instance. This is empty if the tree was cut
+            off at its maximum depth, in which case the performed_analysis_uuids are still listed."""
+    )
+
+
+class AnalysisTreeRead(AnalysisRead):
+    """Represents an analysis (and the observable instances it discovered) read as part of a tree of nodes."""
+
+    children: List[ObservableInstanceTreeRead] = Field(
+        default_factory=list,
+        description="""The observable instances discovered while performing this analysis. This is empty if the tree
+            was cut off at its maximum depth, in which case the discovered_observable_uuids are still listed."""
+    )
+
+
+ObservableInstanceTreeRead.update_forward_refs()
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from pydantic import BaseModel, Field, StrictBool, UUID4
 from typing import Optional
 from uuid import uuid4
@@ -29,6 +30,16 @@ class ObservableCreate(ObservableBase):
 
 
 class ObservableRead(ObservableBase):
+    alert_count: int = Field(description="The number of alerts the observable has appeared in")
+
+    first_seen: Optional[datetime] = Field(description="The earliest time the observable was seen in an alert")
+
+    last_seen: Optional[datetime] = Field(description="The latest time the observable was seen in an alert")
+
+    malicious_alert_count: int = Field(
+        description="The number of alerts the observable has appeared in that have a malicious disposition"
+    )
+
     type: ObservableTypeRead = Field(description="The type of the observable")
 
     uuid: UUID4 = Field(description="The UUID of the observable")
@@ -37,6 +48,16 @@ class ObservableRead(ObservableBase):
         orm_mode = True
 
 
+class ObservableSort(str, Enum):
+    """The sighting statistics that can be used to sort the observables when listing them. Observables are listed in
+    descending order, so the most frequently or most recently seen observables come first."""
+
+    alert_count = "alert_count"
+    first_seen = "first_seen"
+    last_seen = "last_seen"
+    malicious_alert_count = "malicious_alert_count"
+
+
 class ObservableUpdate(ObservableBase):
     for_detection: Optional[StrictBool] = Field(
         description="Whether or not this observable should be included in the observable detection exports"
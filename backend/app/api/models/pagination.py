@@ -0,0 +1,17 @@
+from pydantic import Field
+from pydantic.generics import GenericModel
+from typing import Generic, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class Page(GenericModel, Generic[T]):
+    """Represents a single page of results from an endpoint that uses keyset (cursor) pagination."""
+
+    items: List[T] = Field(description="The results on this page")
+
+    next_cursor: Optional[str] = Field(
+        description="""An opaque cursor that can be passed back to the endpoint to retrieve the next page of results.
+            This is null when there are no more results."""
+    )
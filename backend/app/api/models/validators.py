@@ -24,6 +24,20 @@ def convert_association_list(*fields: str) -> classmethod:
     return _build_decorator(_validate, *fields)
 
 
+def list_length(min_items: int, max_items: int, *fields: str) -> classmethod:
+    """
+    Pydantic validator to ensure that a list has between min_items and max_items items. This is needed for lists of
+    models that refer to themselves, which cannot be constrained with conlist.
+    """
+
+    def _validate(value: Any) -> list:
+        assert isinstance(value, list), "Field must be a list"
+        assert min_items <= len(value) <= max_items, f"Field must have between {min_items} and {max_items} items"
+        return value
+
+    return _build_decorator(_validate, *fields)
+
+
 def prevent_none(*fields: str) -> classmethod:
     """
     Pydantic validator for optional fields that, if given in the request, can not be None. Using a validator is
@@ -1,13 +1,39 @@
-from fastapi import APIRouter, Depends, Request, Response
-from sqlalchemy.orm import Session
-from uuid import UUID, uuid4
+import asyncio
 
-from api.models.alert import AlertCreate, AlertRead, AlertUpdate
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import Select
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+
+from api.models.alert import (
+    AlertBulkUpdate,
+    AlertBulkUpdateResult,
+    AlertBulkUpdateVersion,
+    AlertCreate,
+    AlertRead,
+    AlertSearch,
+    AlertSort,
+    AlertTreeCreate,
+    AlertTreeRead,
+    AlertTreeUUIDs,
+    AlertUpdate,
+)
 from api.models.analysis import AnalysisCreate
+from api.models.node_tree import AnalysisTreeUUIDs, ObservableInstanceTreeCreate
+from api.models.pagination import Page
 from api.routes import helpers
-from api.routes.node import create_node, update_node
-from db import crud
-from db.database import get_db
+from api.routes.alert_search import search_alerts_statement
+from api.routes.node import create_node, read_node, update_node
+from api.routes.node_tree import NodeTree, read_analysis_tree
+from core.config import get_settings
+from db import crud, node_history, node_versions
+from db.alert_stream import alert_stream, notify_alert_changes, RESET
+from db.database import get_async_db, get_db
 from db.schemas.alert import Alert
 from db.schemas.alert_disposition import AlertDisposition
 from db.schemas.alert_queue import AlertQueue
@@ -16,6 +42,10 @@ from db.schemas.alert_tool_instance import AlertToolInstance
 from db.schemas.alert_type import AlertType
 from db.schemas.analysis import Analysis
 from db.schemas.event import Event
+from db.schemas.node import Node
+from db.schemas.observable import Observable
+from db.schemas.observable_instance import ObservableInstance
+from db.schemas.observable_type import ObservableType
 
 
 router = APIRouter(
@@ -29,25 +59,47 @@ router = APIRouter(
 #
 
 
-def create_alert(
+async def create_alert(
     alert: AlertCreate,
     request: Request,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    # The database work is done by a regular function that the async session runs on the event loop using the asyncpg
+    # driver. This reuses the crud functions without tying up a threadpool thread while waiting on the database.
+    uuid: UUID = await db.run_sync(_create_alert, alert)
+
+    # A duplicate alert is merged into the existing alert instead of being created
+    if uuid != alert.uuid:
+        response.status_code = status.HTTP_200_OK
+
+    response.headers["Content-Location"] = request.url_for("get_alert", uuid=uuid)
+
+
+def _create_alert(db: Session, alert: AlertCreate) -> UUID:
+    # The type and tool determine whether or not the alert is a duplicate of an existing alert, in which case it is
+    # merged into the existing alert instead of being created
+    type = crud.read_by_value(value=alert.type, db_table=AlertType, db=db)
+    tool = crud.read_by_value(value=alert.tool, db_table=AlertTool, db=db)
+
+    duplicate = _read_duplicate_alert(alert=alert, type=type, tool=tool, db=db)
+    if duplicate:
+        _merge_duplicate_alert(duplicate=duplicate, discovered_observables=[], db=db)
+        return duplicate.uuid
+
     # Create the new alert Node using the data from the request
     new_alert: Alert = create_node(node_create=alert, db_node_type=Alert, db=db)
 
     # Set the required alert properties
     new_alert.queue = crud.read_by_value(value=alert.queue, db_table=AlertQueue, db=db)
-    new_alert.type = crud.read_by_value(value=alert.type, db_table=AlertType, db=db)
+    new_alert.type = type
 
     # Set the various optional alert properties if they were given in the request.
     if alert.owner:
         new_alert.owner = crud.read_user_by_username(username=alert.owner, db=db)
 
-    if alert.tool:
-        new_alert.tool = crud.read_by_value(value=alert.tool, db_table=AlertTool, db=db)
+    if tool:
+        new_alert.tool = tool
 
     if alert.tool_instance:
         new_alert.tool_instance = crud.read_by_value(value=alert.tool_instance, db_table=AlertToolInstance, db=db)
@@ -57,12 +109,174 @@ def create_alert(
 
     # Save the new alert (including the new analysis) to the database
     db.add(new_alert)
+    crud.flush(db)
+    notify_alert_changes([(alert.uuid, "CREATE", [], None)], db=db)
+    crud.commit(db)
+
+    return alert.uuid
+
+
+async def create_alert_tree(
+    alert: AlertTreeCreate,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    uuids: AlertTreeUUIDs = await db.run_sync(_create_alert_tree, alert)
+
+    # A duplicate alert is merged into the existing alert instead of being created
+    if uuids.uuid != alert.uuid:
+        response.status_code = status.HTTP_200_OK
+
+    response.headers["Content-Location"] = request.url_for("get_alert", uuid=uuids.uuid)
+
+    return uuids
+
+
+def _create_alert_tree(db: Session, alert: AlertTreeCreate) -> AlertTreeUUIDs:
+    # Read the alert properties from the database. The optional ones are only read if they were given in the request.
+    owner = crud.read_user_by_username(username=alert.owner, db=db) if alert.owner else None
+    queue = crud.read_by_value(value=alert.queue, db_table=AlertQueue, db=db)
+    tool = crud.read_by_value(value=alert.tool, db_table=AlertTool, db=db)
+    tool_instance = crud.read_by_value(value=alert.tool_instance, db_table=AlertToolInstance, db=db)
+    type = crud.read_by_value(value=alert.type, db_table=AlertType, db=db)
+
+    # Only the observable instances the alert's analysis discovered are merged into a duplicate alert
+    duplicate = _read_duplicate_alert(alert=alert, type=type, tool=tool, db=db)
+    if duplicate:
+        tree, merged = _merge_duplicate_alert(
+            duplicate=duplicate, discovered_observables=alert.analysis.discovered_observables, db=db
+        )
+        return AlertTreeUUIDs(
+            analysis=AnalysisTreeUUIDs(
+                discovered_observables=[tree.observable_instance_uuids(o) for o in merged],
+                uuid=duplicate.analysis_uuid,
+            ),
+            uuid=duplicate.uuid,
+        )
+
+    # Collect the rows for the alert and every analysis and observable instance beneath it so that the entire tree
+    # can be written using one multi-row INSERT per table instead of one round-trip per node.
+    tree = NodeTree(alert_uuid=alert.uuid)
+    tree.add_node(node_create=alert, node_type="alert")
+    tree.add_analysis(analysis=alert.analysis)
+
+    tree.add_row(
+        Alert,
+        {
+            "uuid": alert.uuid,
+            "analysis_uuid": alert.analysis.uuid,
+            "description": alert.description,
+            "event_time": alert.event_time,
+            "fingerprint": alert.fingerprint,
+            "instructions": alert.instructions,
+            "name": alert.name,
+            "owner_uuid": owner.uuid if owner else None,
+            "queue_uuid": queue.uuid,
+            "tool_uuid": tool.uuid if tool else None,
+            "tool_instance_uuid": tool_instance.uuid if tool_instance else None,
+            "type_uuid": type.uuid,
+        },
+    )
+
+    # Save the entire tree to the database in a single transaction
+    tree.insert(db)
+    notify_alert_changes([(alert.uuid, "CREATE", [], None)], db=db)
+    crud.commit(db)
+
+    return AlertTreeUUIDs(analysis=tree.analysis_uuids(alert.analysis), uuid=alert.uuid)
+
+
+def _read_duplicate_alert(alert: AlertCreate, type: AlertType, tool: Optional[AlertTool], db: Session) -> Optional[Row]:
+    """Returns the (uuid, analysis_uuid) of the existing alert the new alert is a duplicate of, if there is one. The
+    tool's dedup window takes precedence over the type's, and alerts are only deduplicated if one of them has a window
+    and the new alert has a fingerprint."""
+
+    window = tool.dedup_window if tool and tool.dedup_window is not None else type.dedup_window
+    if not alert.fingerprint or window is None:
+        return None
+
+    return crud.read_duplicate_alert(
+        fingerprint=alert.fingerprint,
+        type_uuid=type.uuid,
+        tool_uuid=tool.uuid if tool else None,
+        window=window,
+        db=db,
+    )
+
+
+def _merge_duplicate_alert(
+    duplicate: Row, discovered_observables: List[ObservableInstanceTreeCreate], db: Session
+) -> Tuple[NodeTree, List[ObservableInstanceTreeCreate]]:
+    """Merges a duplicate alert into the existing alert and commits. The discovered observable instances whose
+    observables the existing alert does not already contain are added beneath its analysis, and its duplicate count is
+    incremented. Returns the inserted tree along with the observable instances that were merged."""
+
+    existing = set(
+        db.execute(
+            select(ObservableType.value, Observable.value)
+            .select_from(ObservableInstance)
+            .join(Observable, Observable.uuid == ObservableInstance.observable_uuid)
+            .join(ObservableType, ObservableType.uuid == Observable.type_uuid)
+            .where(ObservableInstance.alert_uuid == duplicate.uuid)
+        ).all()
+    )
+
+    merged = []
+    tree = NodeTree(alert_uuid=duplicate.uuid)
+    for observable_instance in discovered_observables:
+        if (observable_instance.type, observable_instance.value) not in existing:
+            existing.add((observable_instance.type, observable_instance.value))
+            merged.append(observable_instance)
+            tree.add_observable_instance(
+                observable_instance=observable_instance, parent_analysis_uuid=duplicate.analysis_uuid
+            )
+    tree.insert(db)
+
+    # Adding children to the analysis counts as editing it
+    if merged:
+        node_versions.bump(db, duplicate.analysis_uuid)
+
+    # The alert receives its new version in the same statement (instead of when the transaction commits) so that the
+    # notification sent to the alert stream contains it. The second references to the tables still see the previous
+    # values, which are used for the node history.
+    node, alert = Node.__table__, Alert.__table__
+    old_node, old_alert = node.alias("old_node"), alert.alias("old_alert")
+    bumped = (
+        update(node)
+        .where(node.c.uuid == duplicate.uuid, old_node.c.uuid == node.c.uuid)
+        .values(version=func.gen_random_uuid())
+        .returning(node.c.uuid, node.c.version, old_node.c.version.label("old_version"))
+        .cte("bumped")
+    )
+    row = db.execute(
+        update(alert)
+        .where(alert.c.uuid == bumped.c.uuid, old_alert.c.uuid == alert.c.uuid)
+        .values(duplicate_count=alert.c.duplicate_count + 1)
+        .returning(
+            bumped.c.version,
+            bumped.c.old_version,
+            alert.c.duplicate_count,
+            old_alert.c.duplicate_count.label("old_count"),
+        )
+    ).one()
+
+    node_history.record(
+        db,
+        node_uuid=duplicate.uuid,
+        action="UPDATE",
+        before={"duplicate_count": row.old_count, "version": row.old_version},
+        after={"duplicate_count": row.duplicate_count, "version": row.version},
+    )
+
+    notify_alert_changes([(duplicate.uuid, "UPDATE", ["duplicate_count"], None)], db=db)
     crud.commit(db)
 
-    response.headers["Content-Location"] = request.url_for("get_alert", uuid=new_alert.uuid)
+    return tree, merged
 
 
 helpers.api_route_create(router, create_alert)
+helpers.api_route_create(router, create_alert_tree, path="/tree", response_model=AlertTreeUUIDs)
 
 
 #
@@ -70,17 +284,187 @@ helpers.api_route_create(router, create_alert)
 #
 
 
-# def get_all_alerts(db: Session = Depends(get_db)):
-#     return crud.read_all(db_table=Alert, db=db)
+async def get_all_alerts(
+    cursor: Optional[str] = None,
+    disposition: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    owner: Optional[str] = None,
+    queue: Optional[str] = None,
+    sort: AlertSort = AlertSort.insert_time,
+    tool: Optional[str] = None,
+    tool_instance: Optional[str] = None,
+    type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(
+        _read_alerts,
+        cursor=cursor,
+        filters={
+            "disposition": disposition,
+            "owner": owner,
+            "queue": queue,
+            "tool": tool,
+            "tool_instance": tool_instance,
+            "type": type,
+        },
+        limit=limit,
+        sort=sort,
+    )
+
+
+def _read_alerts(db: Session, cursor: Optional[str], filters: dict, limit: int, sort: AlertSort) -> Page[AlertRead]:
+    query = select(Alert)
+
+    # The filter values are read from the database first so that the alerts can be filtered by their foreign keys,
+    # which lets the database use the composite (filter, sort, uuid) indices instead of joining the lookup tables.
+    lookup_filters = [
+        (Alert.disposition_uuid, filters["disposition"], AlertDisposition),
+        (Alert.queue_uuid, filters["queue"], AlertQueue),
+        (Alert.tool_uuid, filters["tool"], AlertTool),
+        (Alert.tool_instance_uuid, filters["tool_instance"], AlertToolInstance),
+        (Alert.type_uuid, filters["type"], AlertType),
+    ]
+    for column, value, db_table in lookup_filters:
+        if value:
+            query = query.where(column == crud.read_by_value(value=value, db_table=db_table, db=db).uuid)
+
+    if filters["owner"]:
+        query = query.where(Alert.owner_uuid == crud.read_user_by_username(username=filters["owner"], db=db).uuid)
+
+    return _read_alert_page(query, cursor=cursor, limit=limit, sort=sort, db=db)
+
+
+def _read_alert_page(
+    query: Select, cursor: Optional[str], limit: int, sort: AlertSort, db: Session
+) -> Page[AlertRead]:
+    query = query.options(*crud.eager_load_options(model=AlertRead, db_table=Alert))
+
+    sort_column = Alert.event_time if sort == AlertSort.event_time else Alert.insert_time
+    items, next_cursor = crud.read_page(
+        statement=query, keys=[sort_column, Alert.uuid], limit=limit, cursor=cursor, db=db
+    )
+
+    # The response is built while still inside of the session so that the relationships can be loaded.
+    return Page[AlertRead](items=[AlertRead.from_orm(a) for a in items], next_cursor=next_cursor)
+
+
+async def search_alerts(search: AlertSearch, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_search_alerts, search)
+
+
+def _search_alerts(db: Session, search: AlertSearch) -> Page[AlertRead]:
+    query = search_alerts_statement(filter=search.filter, db=db)
+    return _read_alert_page(query, cursor=search.cursor, limit=search.limit, sort=search.sort, db=db)
+
+
+async def get_alert(
+    uuid: UUID, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(_read_alert, uuid, if_none_match)
+
+
+def _read_alert(db: Session, uuid: UUID, if_none_match: Optional[str] = None) -> Response:
+    # The alert's analysis can be updated without the alert receiving a new version, so its version is part of the ETag
+    versions = (
+        select(Alert.version, Analysis.version)
+        .join(Analysis, Alert.analysis_uuid == Analysis.uuid)
+        .where(Alert.uuid == uuid)
+    )
+    return read_node(
+        db, uuid=uuid, db_table=Alert, response_model=AlertRead, if_none_match=if_none_match, versions=versions
+    )
+
+
+async def get_alert_tree(
+    uuid: UUID,
+    max_depth: Optional[int] = Query(
+        None,
+        ge=0,
+        description="""The number of levels beneath the alert's analysis to include. The observable instances it
+            discovered are at depth 1, the analyses performed on those are at depth 2, and so on.""",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(_read_alert_tree, uuid, max_depth)
+
+
+def _read_alert_tree(db: Session, uuid: UUID, max_depth: Optional[int]) -> AlertTreeRead:
+    # The alert's analysis is not eagerly loaded here since it is read along with the rest of the tree
+    db_alert: Optional[Alert] = db.execute(
+        select(Alert)
+        .where(Alert.uuid == uuid)
+        .options(*crud.eager_load_options(model=AlertTreeRead, db_table=Alert, exclude=frozenset({"analysis"})))
+    ).scalars().one_or_none()
 
+    if db_alert is None:
+        raise HTTPException(status_code=404, detail=f"UUID {uuid} does not exist.")
 
-def get_alert(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=Alert, db=db)
+    # Read the tree first so that the alert's analysis is already in the session with its relationships filled in
+    analysis = read_analysis_tree(uuid=db_alert.analysis_uuid, max_depth=max_depth, db=db)
 
+    alert = AlertTreeRead.from_orm(db_alert)
+    alert.analysis = analysis
+    return alert
 
-# It does not make sense to have a get_all_alerts route at this point (and certainly not without pagination).
-# helpers.api_route_read_all(router, get_all_alerts, List[AlertRead])
+
+async def stream_alerts(
+    request: Request,
+    queue: Optional[str] = Query(
+        None, description="Only stream the changes to the alerts in this alert queue (or moved out of it)"
+    ),
+):
+    # Open the listening connection before responding so that a client never misses a change made after it connected
+    await alert_stream.listen()
+    subscription = alert_stream.subscribe(queue)
+
+    return StreamingResponse(
+        _stream_alert_events(request, queue, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_alert_events(
+    request: Request, queue: Optional[str], subscription: asyncio.Queue
+) -> AsyncIterator[str]:
+    keepalive = get_settings().alert_stream_keepalive
+
+    try:
+        while not await request.is_disconnected():
+            try:
+                payload = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            # A reset means changes were missed, so the client has to read the alert queue again
+            if payload == RESET:
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                yield f"event: alert\ndata: {payload}\n\n"
+    finally:
+        alert_stream.unsubscribe(queue, subscription)
+
+
+helpers.api_route_read_all(router, get_all_alerts, Page[AlertRead])
+router.add_api_route(path="/search", endpoint=search_alerts, methods=["POST"], response_model=Page[AlertRead])
+# The stream must be registered before the single read so that "stream" is not treated as a UUID
+router.add_api_route(
+    path="/stream",
+    endpoint=stream_alerts,
+    methods=["GET"],
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": """A stream of server-sent events. Each "alert" event contains the alert's UUID, new version,
+                queue, the action (CREATE or UPDATE), and the fields that changed. A "reset" event means some changes
+                were missed and the alerts have to be read again.""",
+        },
+    },
+)
 helpers.api_route_read(router, get_alert, AlertRead)
+helpers.api_route_read(router, get_alert_tree, AlertTreeRead, path="/{uuid}/tree")
 
 
 #
@@ -88,6 +472,108 @@ helpers.api_route_read(router, get_alert, AlertRead)
 #
 
 
+async def update_alerts(alerts: AlertBulkUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_update_alerts, alerts)
+
+
+def _update_alerts(db: Session, alerts: AlertBulkUpdate) -> AlertBulkUpdateResult:
+    # Resolve the new values once for the whole batch instead of once per alert
+    update_data = alerts.dict(exclude_unset=True, exclude={"alerts"})
+    values = {}
+
+    if "disposition" in update_data:
+        values["disposition_uuid"] = (
+            crud.read_by_value(value=update_data["disposition"], db_table=AlertDisposition, db=db).uuid
+            if update_data["disposition"]
+            else None
+        )
+
+    if "event_uuid" in update_data:
+        values["event_uuid"] = None
+        if update_data["event_uuid"]:
+            event: Event = crud.read(uuid=update_data["event_uuid"], db_table=Event, db=db)
+            values["event_uuid"] = event.uuid
+
+    if "owner" in update_data:
+        values["owner_uuid"] = (
+            crud.read_user_by_username(username=update_data["owner"], db=db).uuid if update_data["owner"] else None
+        )
+
+    if "queue" in update_data:
+        values["queue_uuid"] = crud.read_by_value(value=update_data["queue"], db_table=AlertQueue, db=db).uuid
+
+    # Bump the version of every alert whose version matches the one given in the request and apply the changes to
+    # those same alerts. The version lives in the node table, so the first UPDATE is a CTE that the second one joins
+    # against, which lets the entire batch be updated in a single statement.
+    requested = {a.uuid: a.version for a in alerts.alerts}
+    node, alert = Node.__table__, Alert.__table__
+    bumped = (
+        update(node)
+        .where(tuple_(node.c.uuid, node.c.version).in_(list(requested.items())), node.c.node_type == "alert")
+        .values(version=func.gen_random_uuid())
+        .returning(node.c.uuid, node.c.version)
+        .cte("bumped")
+    )
+    # The second reference to the alert table still sees the previous values, which are used for the node history
+    old = alert.alias("old")
+    rows = db.execute(
+        update(alert)
+        .where(alert.c.uuid == bumped.c.uuid, old.c.uuid == alert.c.uuid)
+        .values(**values)
+        .returning(bumped.c.uuid, bumped.c.version, *[old.c[k].label(f"old_{k}") for k in values])
+    ).all()
+
+    updated = [AlertBulkUpdateVersion(uuid=row.uuid, version=row.version) for row in rows]
+
+    for row in rows:
+        changed = [k for k in values if row._mapping[f"old_{k}"] != values[k]]
+        node_history.record(
+            db,
+            node_uuid=row.uuid,
+            action="UPDATE",
+            before={"version": requested[row.uuid], **{k: row._mapping[f"old_{k}"] for k in changed}},
+            after={"version": row.version, **{k: values[k] for k in changed}},
+        )
+
+    if "disposition_uuid" in values:
+        crud.update_observable_dispositions(
+            [(row.uuid, row.old_disposition_uuid, values["disposition_uuid"]) for row in rows], db=db
+        )
+
+    notify_alert_changes(
+        [
+            (
+                row.uuid,
+                "UPDATE",
+                _changed_fields([k for k in values if row._mapping[f"old_{k}"] != values[k]]),
+                row.old_queue_uuid if "queue_uuid" in values and row.old_queue_uuid != values["queue_uuid"] else None,
+            )
+            for row in rows
+        ],
+        db=db,
+    )
+
+    # Any alerts that were not updated either have a different version or do not exist
+    missing = set(requested) - {row.uuid for row in rows}
+    existing = set(db.execute(select(Alert.uuid).where(Alert.uuid.in_(missing))).scalars()) if missing else set()
+
+    # Adding alerts to an event counts as editing the event, so it should receive a new version.
+    if updated and update_data.get("event_uuid"):
+        node_versions.bump(db, event.uuid)
+
+    # The same goes for the events the alerts were removed from
+    if "event_uuid" in values:
+        node_versions.bump(db, *{row.old_event_uuid for row in rows})
+
+    crud.commit(db)
+
+    return AlertBulkUpdateResult(
+        updated=updated,
+        conflicts=[u for u in requested if u in existing],
+        not_found=[u for u in requested if u in missing and u not in existing],
+    )
+
+
 def update_alert(
     uuid: UUID,
     alert: AlertUpdate,
@@ -95,57 +581,75 @@ def update_alert(
     response: Response,
     db: Session = Depends(get_db),
 ):
-    # Update the Node attributes
-    db_alert: Alert = update_node(node_update=alert, uuid=uuid, db_table=Alert, db=db)
-
-    # Get the data that was given in the request and use it to update the database object
+    # Get the data that was given in the request and use it to build the new column values
     update_data = alert.dict(exclude_unset=True)
-
-    if "description" in update_data:
-        db_alert.description = update_data["description"]
-
-    if "disposition" in update_data:
-        db_alert.disposition = crud.read_by_value(value=update_data["disposition"], db_table=AlertDisposition, db=db)
+    values = {}
+
+    for field in ["description", "event_time", "instructions", "name"]:
+        if field in update_data:
+            values[field] = update_data[field]
+
+    lookups = {
+        "disposition": AlertDisposition,
+        "queue": AlertQueue,
+        "tool": AlertTool,
+        "tool_instance": AlertToolInstance,
+        "type": AlertType,
+    }
+    for field, db_table in lookups.items():
+        if field in update_data:
+            values[f"{field}_uuid"] = (
+                crud.read_by_value(value=update_data[field], db_table=db_table, db=db).uuid
+                if update_data[field]
+                else None
+            )
 
     if "event_uuid" in update_data:
-        db_alert.event = crud.read(uuid=update_data["event_uuid"], db_table=Event, db=db)
-
-        # This counts as editing the event, so it should receive a new version.
-        db_alert.event.version = uuid4()
+        values["event_uuid"] = None
+        if update_data["event_uuid"]:
+            db_event: Event = crud.read(uuid=update_data["event_uuid"], db_table=Event, db=db)
+            values["event_uuid"] = db_event.uuid
 
-    if "event_time" in update_data:
-        db_alert.event_time = update_data["event_time"]
-
-    if "instructions" in update_data:
-        db_alert.instructions = update_data["instructions"]
-
-    if "name" in update_data:
-        db_alert.name = update_data["name"]
+            # This counts as editing the event, so it should receive a new version.
+            node_versions.bump(db, db_event.uuid)
 
     if "owner" in update_data:
-        db_alert.owner = crud.read_user_by_username(username=update_data["owner"], db=db)
-
-    if "queue" in update_data:
-        db_alert.queue = crud.read_by_value(value=update_data["queue"], db_table=AlertQueue, db=db)
+        values["owner_uuid"] = (
+            crud.read_user_by_username(username=update_data["owner"], db=db).uuid if update_data["owner"] else None
+        )
 
-    if "tool" in update_data:
-        db_alert.tool = crud.read_by_value(value=update_data["tool"], db_table=AlertTool, db=db)
+    # Check the version and update the alert using a single statement
+    old_values = update_node(node_update=alert, uuid=uuid, db_table=Alert, db=db, values=values)
 
-    if "tool_instance" in update_data:
-        db_alert.tool_instance = crud.read_by_value(
-            value=update_data["tool_instance"],
-            db_table=AlertToolInstance,
-            db=db,
+    # Changing the disposition can change whether or not the alert counts as a malicious sighting of its observables
+    if "disposition_uuid" in values and old_values["disposition_uuid"] != values["disposition_uuid"]:
+        crud.update_observable_dispositions(
+            [(uuid, old_values["disposition_uuid"], values["disposition_uuid"])], db=db
         )
 
-    if "type" in update_data:
-        db_alert.type = crud.read_by_value(value=update_data["type"], db_table=AlertType, db=db)
+    # Removing the alert from its previous event counts as editing that event as well
+    if "event_uuid" in values:
+        node_versions.bump(db, old_values["event_uuid"])
+
+    # The node fields are included whenever they were given since their previous values are not read
+    changed = [k for k in values if old_values[k] != values[k]]
+    node_fields = [k for k in ["directives", "tags", "threat_actor", "threats"] if k in update_data]
+    previous_queue_uuid = old_values["queue_uuid"] if "queue_uuid" in changed else None
+    notify_alert_changes([(uuid, "UPDATE", _changed_fields(changed + node_fields), previous_queue_uuid)], db=db)
 
     crud.commit(db)
 
     response.headers["Content-Location"] = request.url_for("get_alert", uuid=uuid)
 
 
+def _changed_fields(columns: List[str]) -> List[str]:
+    """Returns the names the API uses for the given alert columns (such as "queue" instead of "queue_uuid")."""
+
+    return sorted(c[: -len("_uuid")] if c.endswith("_uuid") and c != "event_uuid" else c for c in columns)
+
+
+# The bulk update must be registered before the single update so that "bulk" is not treated as a UUID
+helpers.api_route_update_bulk(router, update_alerts, AlertBulkUpdateResult)
 helpers.api_route_update(router, update_alert)
 
 
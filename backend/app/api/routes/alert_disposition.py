@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.alert_disposition import (
@@ -9,6 +9,7 @@ from api.models.alert_disposition import (
     AlertDispositionUpdate,
 )
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.alert_disposition import AlertDisposition
@@ -44,8 +45,10 @@ helpers.api_route_create(router, create_disposition)
 #
 
 
-def get_all_dispositions(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=AlertDisposition, db=db)
+def get_all_dispositions(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(
+        db, db_table=AlertDisposition, response_model=AlertDispositionRead, if_none_match=if_none_match
+    )
 
 
 def get_disposition(uuid: UUID, db: Session = Depends(get_db)):
@@ -70,6 +73,11 @@ def update_disposition(
 ):
     crud.update(uuid=uuid, obj=disposition, db_table=AlertDisposition, db=db)
 
+    # The observables in alerts with this disposition need to be recounted if it stopped or started being malicious
+    if "malicious" in disposition.dict(exclude_unset=True):
+        crud.refresh_observable_malicious_counts(disposition_uuid=uuid, db=db)
+        crud.commit(db)
+
     response.headers["Content-Location"] = request.url_for("get_disposition", uuid=uuid)
 
 
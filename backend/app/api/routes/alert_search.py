@@ -0,0 +1,326 @@
+import operator
+import threading
+
+from collections import OrderedDict
+from datetime import datetime
+from fastapi import HTTPException, status
+from pydantic import parse_obj_as, ValidationError
+from sqlalchemy import and_, bindparam, exists, not_, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.decl_api import DeclarativeMeta
+from sqlalchemy.sql.expression import ColumnElement, Select
+from typing import Any, Dict, Hashable, Optional, Tuple
+from uuid import UUID
+
+from api.models.alert import (
+    AlertSearchAnd,
+    AlertSearchCondition,
+    AlertSearchField,
+    AlertSearchFilter,
+    AlertSearchNot,
+    AlertSearchOperator,
+    AlertSearchOr,
+)
+from core.config import get_settings
+from db import crud
+from db.schemas.alert import Alert
+from db.schemas.alert_disposition import AlertDisposition
+from db.schemas.alert_queue import AlertQueue
+from db.schemas.alert_tool import AlertTool
+from db.schemas.alert_tool_instance import AlertToolInstance
+from db.schemas.alert_type import AlertType
+from db.schemas.node_directive import NodeDirective
+from db.schemas.node_directive_mapping import node_directive_mapping
+from db.schemas.node_tag import NodeTag
+from db.schemas.node_tag_mapping import node_tag_mapping
+from db.schemas.node_threat import NodeThreat
+from db.schemas.node_threat_mapping import node_threat_mapping
+from db.schemas.observable import Observable
+from db.schemas.observable_instance import ObservableInstance
+from db.schemas.observable_type import ObservableType
+
+
+SearchField, Op = AlertSearchField, AlertSearchOperator
+
+alert, instance, observable = Alert.__table__, ObservableInstance.__table__, Observable.__table__
+
+# The operators that can use an index for each field. The lookup fields are compared using the UUIDs of their values
+# so that the foreign key indices are used instead of joining the lookup tables. The contains operator uses the trigram
+# indices, which need at least three characters to narrow down the rows.
+OPERATORS = {
+    SearchField.directive: {Op.eq, Op.in_},
+    SearchField.disposition: {Op.eq, Op.in_, Op.is_null},
+    SearchField.disposition_time: {Op.gt, Op.gte, Op.is_null, Op.lt, Op.lte},
+    SearchField.event_time: {Op.gt, Op.gte, Op.lt, Op.lte},
+    SearchField.event_uuid: {Op.eq, Op.is_null},
+    SearchField.fingerprint: {Op.eq, Op.in_},
+    SearchField.insert_time: {Op.gt, Op.gte, Op.lt, Op.lte},
+    SearchField.name: {Op.contains},
+    SearchField.observable: {Op.contains, Op.eq, Op.in_},
+    SearchField.owner: {Op.eq, Op.in_, Op.is_null},
+    SearchField.queue: {Op.eq, Op.in_},
+    SearchField.tag: {Op.eq, Op.in_},
+    SearchField.threat: {Op.eq, Op.in_},
+    SearchField.tool: {Op.eq, Op.in_, Op.is_null},
+    SearchField.tool_instance: {Op.eq, Op.in_, Op.is_null},
+    SearchField.type: {Op.eq, Op.in_},
+}
+
+# The alert column each field is compared to
+COLUMNS = {
+    SearchField.disposition: alert.c.disposition_uuid,
+    SearchField.disposition_time: alert.c.disposition_time,
+    SearchField.event_time: alert.c.event_time,
+    SearchField.event_uuid: alert.c.event_uuid,
+    SearchField.fingerprint: alert.c.fingerprint,
+    SearchField.insert_time: alert.c.insert_time,
+    SearchField.name: alert.c.name,
+    SearchField.owner: alert.c.owner_uuid,
+    SearchField.queue: alert.c.queue_uuid,
+    SearchField.tool: alert.c.tool_uuid,
+    SearchField.tool_instance: alert.c.tool_instance_uuid,
+    SearchField.type: alert.c.type_uuid,
+}
+
+# The lookup table each field's values are read from
+LOOKUPS: Dict[SearchField, DeclarativeMeta] = {
+    SearchField.directive: NodeDirective,
+    SearchField.disposition: AlertDisposition,
+    SearchField.queue: AlertQueue,
+    SearchField.tag: NodeTag,
+    SearchField.threat: NodeThreat,
+    SearchField.tool: AlertTool,
+    SearchField.tool_instance: AlertToolInstance,
+    SearchField.type: AlertType,
+}
+
+# The mapping table and column the alert's own directives, tags, and threats are stored in
+MAPPINGS = {
+    SearchField.directive: (node_directive_mapping, node_directive_mapping.c.directive_uuid),
+    SearchField.tag: (node_tag_mapping, node_tag_mapping.c.tag_uuid),
+    SearchField.threat: (node_threat_mapping, node_threat_mapping.c.threat_uuid),
+}
+
+TIME_FIELDS = {SearchField.disposition_time, SearchField.event_time, SearchField.insert_time}
+
+
+class AlertSearchStatements:
+    """
+    A process-local LRU cache of the WHERE clauses built for the alert searches, keyed by the shape of their filter.
+
+    The shape is the filter tree with its values replaced by the names of the bound parameters that hold them, so every
+    search with the same fields and operators in the same arrangement shares a clause no matter what values it searches
+    for. Only the clause is cached since binding the values clones what it is applied to, and cloning an entire ORM
+    statement copies the alert's joined table as well, which then shows up twice in the FROM clause. A size of 0
+    disables the cache.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        # Maps the shape to the clause from the least to the most recently used
+        self._entries: "OrderedDict[Hashable, ColumnElement]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, shape: Hashable) -> Optional[ColumnElement]:
+        """Returns the cached clause for the given filter shape if there is one."""
+
+        with self._lock:
+            clause = self._entries.get(shape)
+            if clause is not None:
+                self._entries.move_to_end(shape)
+                self.hits += 1
+                return clause
+
+            self.misses += 1
+            return None
+
+    def set(self, shape: Hashable, clause: ColumnElement):
+        """Adds the given clause to the cache and evicts the least recently used one if the cache is full."""
+
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[shape] = clause
+            self._entries.move_to_end(shape)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the number of cached clauses."""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+alert_search_statements = AlertSearchStatements(max_size=get_settings().alert_search_cache_size)
+
+
+def search_alerts_statement(filter: AlertSearchFilter, db: Session) -> Select:
+    """Returns a statement that selects the alerts matching the given filter using a single query. The directive, tag,
+    threat, and observable conditions are EXISTS subqueries against their mapping tables.
+
+    Designed to be called only by the API since it raises an HTTPException if the filter cannot use an index or one of
+    its values does not exist."""
+
+    params: Dict[str, Any] = {}
+    shape = _shape(filter, params=params, db=db)
+
+    if not _uses_index(shape):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "The filter cannot use an index. A not filter cannot be used on its own, an and filter needs at least "
+                "one child that can use an index, and every child of an or filter has to be able to use one."
+            ),
+        )
+
+    clause = alert_search_statements.get(shape)
+    if clause is None:
+        clause = _build(shape)
+        alert_search_statements.set(shape, clause)
+
+    return select(Alert).where(clause.params(params))
+
+
+def _shape(filter: AlertSearchFilter, params: Dict[str, Any], db: Session) -> Tuple:
+    """Returns the shape of the filter and adds the values of its conditions to the parameters."""
+
+    if isinstance(filter, AlertSearchAnd):
+        return ("and", tuple(_shape(f, params=params, db=db) for f in filter.and_))
+
+    if isinstance(filter, AlertSearchOr):
+        return ("or", tuple(_shape(f, params=params, db=db) for f in filter.or_))
+
+    if isinstance(filter, AlertSearchNot):
+        return ("not", _shape(filter.not_, params=params, db=db))
+
+    return _condition_shape(filter, params=params, db=db)
+
+
+def _condition_shape(condition: AlertSearchCondition, params: Dict[str, Any], db: Session) -> Tuple:
+    field, op = condition.field, condition.op
+
+    if op not in OPERATORS[field]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The {op.value} operator cannot use an index for the {field.value} field",
+        )
+
+    names = []
+    if field == SearchField.observable:
+        names.append(_add_param(params, crud.read_by_value(value=condition.type, db_table=ObservableType, db=db).uuid))
+
+    if op != Op.is_null:
+        names.append(_add_param(params, _condition_value(condition, db=db)))
+
+    return ("condition", field, op, tuple(names))
+
+
+def _condition_value(condition: AlertSearchCondition, db: Session) -> Any:
+    """Returns the value the condition's field is compared to in the database."""
+
+    field, op, value = condition.field, condition.op, condition.value
+
+    if op == Op.contains:
+        if len(value) < 3:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The contains operator cannot use an index for values shorter than 3 characters: {value}",
+            )
+
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{escaped}%"
+
+    values = value if isinstance(value, list) else [value]
+
+    if field in LOOKUPS:
+        uuids = {r.value: r.uuid for r in crud.read_by_values(values=values, db_table=LOOKUPS[field], db=db)}
+        values = [uuids[v] for v in values]
+    elif field == SearchField.owner:
+        values = [crud.read_user_by_username(username=v, db=db).uuid for v in values]
+    elif field == SearchField.event_uuid:
+        values = [_parse(v, type_=UUID, field=field) for v in values]
+    elif field in TIME_FIELDS:
+        values = [_parse(v, type_=datetime, field=field) for v in values]
+
+    return values if op == Op.in_ else values[0]
+
+
+def _parse(value: str, type_: Any, field: SearchField) -> Any:
+    try:
+        return parse_obj_as(type_, value)
+    except ValidationError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{value} is not a valid value for the {field.value} field",
+        )
+
+
+def _add_param(params: Dict[str, Any], value: Any) -> str:
+    name = f"p{len(params)}"
+    params[name] = value
+    return name
+
+
+def _uses_index(shape: Tuple) -> bool:
+    """Returns whether or not the database can find the rows matching the filter shape using an index. Every condition
+    that was accepted can use an index, but negating one means every alert that does not match it has to be read."""
+
+    if shape[0] == "and":
+        return any(_uses_index(s) for s in shape[1])
+
+    if shape[0] == "or":
+        return all(_uses_index(s) for s in shape[1])
+
+    return shape[0] == "condition"
+
+
+def _build(shape: Tuple) -> ColumnElement:
+    """Builds the WHERE clause for the filter shape using bound parameters for all of its values."""
+
+    if shape[0] == "and":
+        return and_(*[_build(s) for s in shape[1]])
+
+    if shape[0] == "or":
+        return or_(*[_build(s) for s in shape[1]])
+
+    if shape[0] == "not":
+        return not_(_build(shape[1]))
+
+    _, field, op, names = shape
+
+    if field in MAPPINGS:
+        mapping, column = MAPPINGS[field]
+        return exists().where((mapping.c.node_uuid == alert.c.uuid) & _compare(column, op, names[0]))
+
+    if field == SearchField.observable:
+        return exists(
+            select(instance.c.uuid)
+            .select_from(instance.join(observable, observable.c.uuid == instance.c.observable_uuid))
+            .where(
+                instance.c.alert_uuid == alert.c.uuid,
+                observable.c.type_uuid == bindparam(names[0], type_=observable.c.type_uuid.type),
+                _compare(observable.c.value, op, names[1]),
+            )
+        )
+
+    return _compare(COLUMNS[field], op, names[0] if names else None)
+
+
+def _compare(column: ColumnElement, op: Op, name: Optional[str]) -> ColumnElement:
+    if op == Op.is_null:
+        return column.is_(None)
+
+    if op == Op.in_:
+        return column.in_(bindparam(name, type_=column.type, expanding=True))
+
+    param = bindparam(name, type_=column.type)
+    if op == Op.contains:
+        return column.ilike(param)
+
+    comparisons = {Op.eq: operator.eq, Op.gt: operator.gt, Op.gte: operator.ge, Op.lt: operator.lt, Op.lte: operator.le}
+    return comparisons[op](column, param)
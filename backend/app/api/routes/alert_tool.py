@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.alert_tool import AlertToolCreate, AlertToolRead, AlertToolUpdate
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.alert_tool import AlertTool
@@ -40,8 +41,8 @@ helpers.api_route_create(router, create_alert_tool)
 #
 
 
-def get_all_alert_tools(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=AlertTool, db=db)
+def get_all_alert_tools(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(db, db_table=AlertTool, response_model=AlertToolRead, if_none_match=if_none_match)
 
 
 def get_alert_tool(uuid: UUID, db: Session = Depends(get_db)):
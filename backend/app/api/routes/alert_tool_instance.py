@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.alert_tool_instance import AlertToolInstanceCreate, AlertToolInstanceRead, AlertToolInstanceUpdate
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.alert_tool_instance import AlertToolInstance
@@ -40,8 +41,10 @@ helpers.api_route_create(router, create_alert_tool_instance)
 #
 
 
-def get_all_alert_tool_instances(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=AlertToolInstance, db=db)
+def get_all_alert_tool_instances(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(
+        db, db_table=AlertToolInstance, response_model=AlertToolInstanceRead, if_none_match=if_none_match
+    )
 
 
 def get_alert_tool_instance(uuid: UUID, db: Session = Depends(get_db)):
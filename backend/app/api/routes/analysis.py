@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from uuid import UUID, uuid4
+from typing import List, Optional
+from uuid import UUID
 
 from api.models.analysis import AnalysisCreate, AnalysisRead, AnalysisUpdate
+from api.models.analysis_claim import AnalysisClaimCreate, AnalysisClaimRead
+from api.models.node_tree import AnalysisResultsCreate, AnalysisTreeUUIDs
 from api.routes import helpers
-from api.routes.node import create_node, update_node
-from db import crud
-from db.database import get_db
+from api.routes.node import create_node, read_node, update_node
+from api.routes.node_tree import NodeTree
+from core.config import get_settings
+from db import crud, node_versions
+from db.database import get_async_db, get_db
+from db.schemas.alert import Alert
 from db.schemas.analysis import Analysis
 from db.schemas.analysis_module_type import AnalysisModuleType
 from db.schemas.observable_instance import ObservableInstance
+from db.schemas.observable_instance_analysis_mapping import observable_instance_analysis_mapping
 
 
 router = APIRouter(
@@ -25,12 +34,18 @@ router = APIRouter(
 # TODO: Create/add a discovered observable to an analysis
 
 
-def create_analysis(
+async def create_analysis(
     analysis: AnalysisCreate,
     request: Request,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    await db.run_sync(_create_analysis, analysis)
+
+    response.headers["Content-Location"] = request.url_for("get_analysis", uuid=analysis.uuid)
+
+
+def _create_analysis(db: Session, analysis: AnalysisCreate):
     # Create the new analysis Node using the data from the request
     new_analysis: Analysis = create_node(
         node_create=analysis,
@@ -44,6 +59,7 @@ def create_analysis(
         new_analysis.analysis_module_type = crud.read(
             uuid=analysis.analysis_module_type, db_table=AnalysisModuleType, db=db
         )
+        new_analysis.extended_version = new_analysis.analysis_module_type.extended_version
 
     # Set the parent observable if one was given
     if analysis.parent_observable_uuid:
@@ -52,18 +68,53 @@ def create_analysis(
         )
 
         # This counts as editing the observable instance, so it should receive an updated version
-        new_analysis.parent_observable.version = uuid4()
+        node_versions.bump(db, new_analysis.parent_observable.uuid)
+
+        # The observable instance no longer needs to be held by the worker that claimed it for this analysis
+        if new_analysis.analysis_module_type:
+            crud.delete_analysis_claim(
+                observable_instance_uuid=new_analysis.parent_observable.uuid,
+                analysis_module_type_uuid=new_analysis.analysis_module_type.uuid,
+                db=db,
+            )
 
     # Save the new analysis to the database
     db.add(new_analysis)
     crud.commit(db)
 
-    response.headers["Content-Location"] = request.url_for("get_analysis", uuid=new_analysis.uuid)
-
 
 helpers.api_route_create(router, create_analysis)
 
 
+async def claim_analysis_work(claim: AnalysisClaimCreate, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_claim_analysis_work, claim)
+
+
+def _claim_analysis_work(db: Session, claim: AnalysisClaimCreate):
+    analysis_module_type = crud.read_analysis_module_type(
+        value=claim.analysis_module_type, version=claim.analysis_module_type_version, db=db
+    )
+
+    claimed = crud.claim_observable_instances(
+        analysis_module_type=analysis_module_type, limit=claim.limit, lease_seconds=claim.lease_seconds, db=db
+    )
+
+    crud.commit(db)
+
+    return claimed
+
+
+router.add_api_route(
+    path="/work/claim",
+    endpoint=claim_analysis_work,
+    methods=["POST"],
+    response_model=List[AnalysisClaimRead],
+    responses={
+        status.HTTP_404_NOT_FOUND: {"description": "The analysis module type was not found"},
+    },
+)
+
+
 #
 # READ
 #
@@ -73,12 +124,59 @@ helpers.api_route_create(router, create_analysis)
 #     return crud.read_all(db_table=Analysis, db=db)
 
 
-def get_analysis(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=Analysis, db=db)
+async def get_analysis(
+    uuid: UUID, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        read_node, uuid=uuid, db_table=Analysis, response_model=AnalysisRead, if_none_match=if_none_match
+    )
+
+
+async def get_reusable_analysis(
+    observable_uuid: UUID,
+    analysis_module_type_uuid: UUID,
+    max_age: Optional[int] = Query(
+        None,
+        ge=0,
+        description="""The maximum age (in seconds) of the analysis. It cannot be longer than the configured analysis
+            result max age, which is used when this is not given.""",
+    ),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(
+        _read_reusable_analysis, observable_uuid, analysis_module_type_uuid, max_age, if_none_match
+    )
+
+
+def _read_reusable_analysis(
+    db: Session,
+    observable_uuid: UUID,
+    analysis_module_type_uuid: UUID,
+    max_age: Optional[int],
+    if_none_match: Optional[str],
+):
+    configured_max_age = get_settings().analysis_result_max_age
+    max_age = configured_max_age if max_age is None else min(max_age, configured_max_age)
+
+    uuid = crud.read_reusable_analysis_uuid(
+        observable_uuid=observable_uuid, analysis_module_type_uuid=analysis_module_type_uuid, max_age=max_age, db=db
+    )
+    if uuid is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"There is no reusable analysis of the observable {observable_uuid}",
+        )
+
+    return read_node(
+        db, uuid=uuid, db_table=Analysis, response_model=AnalysisRead, if_none_match=if_none_match
+    )
 
 
 # It does not make sense to have a get_all_analysis route at this point (and certainly not without pagination).
 # helpers.api_route_read_all(router, get_all_analysis, List[AnalysisRead])
+# The reusable analysis route must be registered before the single read so that "reusable" is not treated as a UUID
+helpers.api_route_read(router, get_reusable_analysis, AnalysisRead, path="/reusable")
 helpers.api_route_read(router, get_analysis, AnalysisRead)
 
 
@@ -94,36 +192,89 @@ def update_analysis(
     response: Response,
     db: Session = Depends(get_db),
 ):
-    # Update the Node attributes
-    db_analysis: Analysis = update_node(node_update=analysis, uuid=uuid, db_table=Analysis, db=db)
+    # Check the version and update the analysis using a single statement
+    update_node(node_update=analysis, uuid=uuid, db_table=Analysis, db=db, values=_analysis_values(analysis, db=db))
+
+    crud.commit(db)
+
+    response.headers["Content-Location"] = request.url_for("get_analysis", uuid=uuid)
+
+
+def _analysis_values(analysis: AnalysisUpdate, db: Session) -> dict:
+    """Builds the new analysis column values from the data that was given in the request."""
 
-    # Get the data that was given in the request and use it to update the database object
     update_data = analysis.dict(exclude_unset=True)
+    values = {}
 
     if "analysis_module_type" in update_data:
         db_analysis_module_type = crud.read(
             uuid=update_data["analysis_module_type"], db_table=AnalysisModuleType, db=db
         )
-        db_analysis.analysis_module_type = db_analysis_module_type
+        values["analysis_module_type_uuid"] = db_analysis_module_type.uuid
+        values["extended_version"] = db_analysis_module_type.extended_version
 
-    if "details" in update_data:
-        db_analysis.details = update_data["details"]
+    for field in ["details", "error_message", "stack_trace", "summary"]:
+        if field in update_data:
+            values[field] = update_data[field]
 
-    if "error_message" in update_data:
-        db_analysis.error_message = update_data["error_message"]
+    return values
 
-    if "stack_trace" in update_data:
-        db_analysis.stack_trace = update_data["stack_trace"]
 
-    if "summary" in update_data:
-        db_analysis.summary = update_data["summary"]
+helpers.api_route_update(router, update_analysis)
 
-    crud.commit(db)
+
+async def submit_analysis_results(
+    uuid: UUID,
+    results: AnalysisResultsCreate,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    tree: NodeTree = await db.run_sync(_submit_analysis_results, uuid, results)
 
     response.headers["Content-Location"] = request.url_for("get_analysis", uuid=uuid)
 
+    return AnalysisTreeUUIDs(
+        discovered_observables=[tree.observable_instance_uuids(o) for o in results.discovered_observables],
+        uuid=uuid,
+    )
 
-helpers.api_route_update(router, update_analysis)
+
+def _submit_analysis_results(db: Session, uuid: UUID, results: AnalysisResultsCreate) -> NodeTree:
+    # Check the version and update the analysis itself using a single statement. This is also the only version bump
+    # the analysis receives, no matter how many observable instances it discovered.
+    update_node(node_update=results, uuid=uuid, db_table=Analysis, db=db, values=_analysis_values(results, db=db))
+
+    # The discovered observable instances belong to the same alert as the analysis, which is either the alert of its
+    # parent observable instance or the alert it is the root analysis of
+    alert_uuid = db.execute(
+        union_all(
+            select(ObservableInstance.alert_uuid)
+            .join(
+                observable_instance_analysis_mapping,
+                observable_instance_analysis_mapping.c.observable_instance_uuid == ObservableInstance.uuid,
+            )
+            .where(observable_instance_analysis_mapping.c.analysis_uuid == uuid),
+            select(Alert.uuid).where(Alert.analysis_uuid == uuid),
+        )
+    ).scalars().first()
+
+    # Write every discovered observable instance and the analyses beneath them using one INSERT per table
+    tree = NodeTree(alert_uuid=alert_uuid)
+    for observable_instance in results.discovered_observables:
+        tree.add_observable_instance(observable_instance=observable_instance, parent_analysis_uuid=uuid)
+    tree.insert(db)
+
+    # Adding observable instances counts as modifying the alert, so it receives a single new version for the batch
+    if results.discovered_observables:
+        node_versions.bump(db, alert_uuid)
+
+    crud.commit(db)
+
+    return tree
+
+
+helpers.api_route_create(router, submit_analysis_results, path="/{uuid}/results", response_model=AnalysisTreeUUIDs)
 
 
 #
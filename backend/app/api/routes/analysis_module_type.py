@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.analysis_module_type import (
@@ -9,6 +9,7 @@ from api.models.analysis_module_type import (
     AnalysisModuleTypeUpdate,
 )
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.analysis_module_type import AnalysisModuleType
@@ -63,7 +64,7 @@ def create_analysis_module_type(
 
     # Save the new analysis module type to the database
     db.add(new_analysis_module_type)
-    crud.commit(db)
+    crud.commit(db, invalidate=AnalysisModuleType)
 
     response.headers["Content-Location"] = request.url_for(
         "get_analysis_module_type", uuid=new_analysis_module_type.uuid
@@ -78,12 +79,14 @@ helpers.api_route_create(router, create_analysis_module_type)
 #
 
 
-def get_all_analysis_module_types(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=AnalysisModuleType, db=db)
+def get_all_analysis_module_types(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(
+        db, db_table=AnalysisModuleType, response_model=AnalysisModuleTypeRead, if_none_match=if_none_match
+    )
 
 
 def get_analysis_module_type(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=AnalysisModuleType, db=db)
+    return crud.read(uuid=uuid, db_table=AnalysisModuleType, db=db, response_model=AnalysisModuleTypeRead)
 
 
 helpers.api_route_read_all(router, get_all_analysis_module_types, List[AnalysisModuleTypeRead])
@@ -138,7 +141,7 @@ def update_analysis_module_type(
     if "version" in update_data:
         db_analysis_module_type.version = update_data["version"]
 
-    crud.commit(db)
+    crud.commit(db, invalidate=AnalysisModuleType)
 
     response.headers["Content-Location"] = request.url_for("get_analysis_module_type", uuid=uuid)
 
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
+from typing import Optional
 from uuid import UUID
 
 from api.models.event import EventCreate, EventRead, EventUpdate
 from api.routes import helpers
-from api.routes.node import create_node, update_node
+from api.routes.node import create_node, read_node, update_node
 from db import crud
 from db.database import get_db
 from db.schemas.event import Event
@@ -85,8 +86,8 @@ helpers.api_route_create(router, create_event)
 #     return crud.read_all(db_table=Event, db=db)
 
 
-def get_event(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=Event, db=db)
+def get_event(uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_node(db, uuid=uuid, db_table=Event, response_model=EventRead, if_none_match=if_none_match)
 
 
 # It does not make sense to have a get_all_events route at this point (and certainly not without pagination).
@@ -106,64 +107,59 @@ def update_event(
     response: Response,
     db: Session = Depends(get_db),
 ):
-    # Update the Node attributes
-    db_event: Event = update_node(node_update=event, uuid=uuid, db_table=Event, db=db)
-
-    # Get the data that was given in the request and use it to update the database object
+    # Get the data that was given in the request and use it to build the new column values
     update_data = event.dict(exclude_unset=True)
-
-    if "alert_time" in update_data:
-        db_event.alert_time = update_data["alert_time"]
-
-    if "contain_time" in update_data:
-        db_event.contain_time = update_data["contain_time"]
-
-    if "disposition_time" in update_data:
-        db_event.disposition_time = update_data["disposition_time"]
-
-    if "event_time" in update_data:
-        db_event.event_time = update_data["event_time"]
-
-    if "name" in update_data:
-        db_event.name = update_data["name"]
+    values = {}
+
+    for field in [
+        "alert_time",
+        "contain_time",
+        "disposition_time",
+        "event_time",
+        "name",
+        "ownership_time",
+        "remediation_time",
+    ]:
+        if field in update_data:
+            values[field] = update_data[field]
 
     if "owner" in update_data:
-        db_event.owner = crud.read_user_by_username(username=update_data["owner"], db=db)
-
-    if "ownership_time" in update_data:
-        db_event.ownership_time = update_data["ownership_time"]
-
-    if "prevention_tools" in update_data:
-        db_event.prevention_tools = crud.read_by_values(
-            values=update_data["prevention_tools"],
-            db_table=EventPreventionTool,
-            db=db,
-        )
-
-    if "remediation_time" in update_data:
-        db_event.remediation_time = update_data["remediation_time"]
-
-    if "remediations" in update_data:
-        db_event.remediations = crud.read_by_values(
-            values=update_data["remediations"],
-            db_table=EventRemediation,
-            db=db,
+        values["owner_uuid"] = (
+            crud.read_user_by_username(username=update_data["owner"], db=db).uuid if update_data["owner"] else None
         )
 
-    if "risk_level" in update_data:
-        db_event.risk_level = crud.read_by_value(value=update_data["risk_level"], db_table=EventRiskLevel, db=db)
-
-    if "source" in update_data:
-        db_event.source = crud.read_by_value(value=update_data["source"], db_table=EventSource, db=db)
-
-    if "status" in update_data:
-        db_event.status = crud.read_by_value(value=update_data["status"], db_table=EventStatus, db=db)
-
-    if "type" in update_data:
-        db_event.type = crud.read_by_value(value=update_data["type"], db_table=EventType, db=db)
-
-    if "vectors" in update_data:
-        db_event.vectors = crud.read_by_values(values=update_data["vectors"], db_table=EventVector, db=db)
+    lookups = {"risk_level": EventRiskLevel, "source": EventSource, "status": EventStatus, "type": EventType}
+    for field, db_table in lookups.items():
+        if field in update_data:
+            values[f"{field}_uuid"] = (
+                crud.read_by_value(value=update_data[field], db_table=db_table, db=db).uuid
+                if update_data[field]
+                else None
+            )
+
+    # Check the version and update the event using a single statement
+    update_node(node_update=event, uuid=uuid, db_table=Event, db=db, values=values)
+
+    # The lists live in mapping tables, so the event only needs to be loaded if one of them changed
+    if {"prevention_tools", "remediations", "vectors"} & set(update_data):
+        db_event: Event = crud.read(uuid=uuid, db_table=Event, db=db)
+
+        if "prevention_tools" in update_data:
+            db_event.prevention_tools = crud.read_by_values(
+                values=update_data["prevention_tools"],
+                db_table=EventPreventionTool,
+                db=db,
+            )
+
+        if "remediations" in update_data:
+            db_event.remediations = crud.read_by_values(
+                values=update_data["remediations"],
+                db_table=EventRemediation,
+                db=db,
+            )
+
+        if "vectors" in update_data:
+            db_event.vectors = crud.read_by_values(values=update_data["vectors"], db_table=EventVector, db=db)
 
     crud.commit(db)
 
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.event_prevention_tool import (
@@ -9,6 +9,7 @@ from api.models.event_prevention_tool import (
     EventPreventionToolUpdate,
 )
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.event_prevention_tool import EventPreventionTool
@@ -44,8 +45,10 @@ helpers.api_route_create(router, create_event_prevention_tool)
 #
 
 
-def get_all_event_prevention_tools(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=EventPreventionTool, db=db)
+def get_all_event_prevention_tools(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(
+        db, db_table=EventPreventionTool, response_model=EventPreventionToolRead, if_none_match=if_none_match
+    )
 
 
 def get_event_prevention_tool(uuid: UUID, db: Session = Depends(get_db)):
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.event_remediation import (
@@ -9,6 +9,7 @@ from api.models.event_remediation import (
     EventRemediationUpdate,
 )
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.event_remediation import EventRemediation
@@ -44,8 +45,10 @@ helpers.api_route_create(router, create_event_remediation)
 #
 
 
-def get_all_event_remediations(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=EventRemediation, db=db)
+def get_all_event_remediations(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(
+        db, db_table=EventRemediation, response_model=EventRemediationRead, if_none_match=if_none_match
+    )
 
 
 def get_event_remediation(uuid: UUID, db: Session = Depends(get_db)):
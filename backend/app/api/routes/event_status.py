@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.event_status import (
@@ -9,6 +9,7 @@ from api.models.event_status import (
     EventStatusUpdate,
 )
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.event_status import EventStatus
@@ -44,8 +45,8 @@ helpers.api_route_create(router, create_event_status)
 #
 
 
-def get_all_event_statuses(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=EventStatus, db=db)
+def get_all_event_statuses(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(db, db_table=EventStatus, response_model=EventStatusRead, if_none_match=if_none_match)
 
 
 def get_event_status(uuid: UUID, db: Session = Depends(get_db)):
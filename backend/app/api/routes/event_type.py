@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.event_type import EventTypeCreate, EventTypeRead, EventTypeUpdate
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.event_type import EventType
@@ -40,8 +41,8 @@ helpers.api_route_create(router, create_event_type)
 #
 
 
-def get_all_event_types(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=EventType, db=db)
+def get_all_event_types(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(db, db_table=EventType, response_model=EventTypeRead, if_none_match=if_none_match)
 
 
 def get_event_type(uuid: UUID, db: Session = Depends(get_db)):
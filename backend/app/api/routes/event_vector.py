@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.event_vector import (
@@ -9,6 +9,7 @@ from api.models.event_vector import (
     EventVectorUpdate,
 )
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.event_vector import EventVector
@@ -44,8 +45,8 @@ helpers.api_route_create(router, create_event_vector)
 #
 
 
-def get_all_event_vectors(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=EventVector, db=db)
+def get_all_event_vectors(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(db, db_table=EventVector, response_model=EventVectorRead, if_none_match=if_none_match)
 
 
 def get_event_vector(uuid: UUID, db: Session = Depends(get_db)):
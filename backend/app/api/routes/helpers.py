@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Response, status
 from pydantic import BaseModel
-from typing import Callable
+from typing import Callable, Optional
 
 
 #
@@ -8,12 +8,16 @@ from typing import Callable
 #
 
 
-def api_route_create(router: APIRouter, endpoint: Callable, path: str = "/"):
+def api_route_create(router: APIRouter, endpoint: Callable, path: str = "/", response_model: BaseModel = None):
+    # Most create endpoints respond with a 201 and no body. Using the Response class allows this to be listed in the
+    # documentation. Endpoints that need to return something in the body (like a map of created UUIDs) use a model.
+    response_options = {"response_model": response_model} if response_model else {"response_class": Response}
+
     router.add_api_route(
         path=path,
         endpoint=endpoint,
         methods=["POST"],
-        response_class=Response,  # This allows to respond with a 201 and no body listed in the documentation
+        **response_options,
         responses={
             status.HTTP_201_CREATED: {
                 "headers": {
@@ -56,6 +60,17 @@ def api_route_read(router: APIRouter, endpoint: Callable, response_model: BaseMo
     )
 
 
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Returns whether or not the ETag matches the If-None-Match header, which can contain a list of ETags (any of
+    which can be weak) or "*"."""
+
+    if not if_none_match:
+        return False
+
+    tags = {tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
 #
 # UPDATE
 #
@@ -77,6 +92,20 @@ def api_route_update(router: APIRouter, endpoint: Callable, path: str = "/{uuid}
     )
 
 
+def api_route_update_bulk(router: APIRouter, endpoint: Callable, response_model: BaseModel, path: str = "/bulk"):
+    # Bulk updates respond with a body that reports what happened to each of the requested resources since some of
+    # them can fail (such as from a version mismatch) without failing the rest of the request.
+    router.add_api_route(
+        path=path,
+        endpoint=endpoint,
+        methods=["PATCH"],
+        response_model=response_model,
+        responses={
+            status.HTTP_404_NOT_FOUND: {"description": "One of the values used in the update was not found"},
+        },
+    )
+
+
 #
 # DELETE
 #
@@ -0,0 +1,40 @@
+from fastapi import Response, status
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.decl_api import DeclarativeMeta
+from typing import Optional, Type
+
+from api.routes import helpers
+from core.config import get_settings
+from db import crud
+from db.crud.lookup_snapshots import lookup_snapshots
+
+
+def read_all_lookups(
+    db: Session,
+    db_table: DeclarativeMeta,
+    response_model: Type[BaseModel],
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """
+    Helper function when listing every row of a lookup table. The serialized list is kept as an in-memory snapshot, so
+    most requests neither query the database nor validate any models, and it is returned with an ETag and a
+    Cache-Control header so that browsers and proxies can cache it as well.
+    """
+
+    snapshot = lookup_snapshots.get(db_table)
+    if snapshot is None:
+        generation = lookup_snapshots.generation
+        objs = crud.read_all(db_table=db_table, db=db, response_model=response_model)
+        body = f"[{','.join(response_model.from_orm(o).json() for o in objs)}]".encode()
+        snapshot = lookup_snapshots.set(db_table, body=body, generation=generation)
+
+    etag, body = snapshot
+
+    max_age = get_settings().lookup_list_max_age
+    headers = {"Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "public, no-cache", "ETag": etag}
+
+    if helpers.etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from api.routes.alert_search import alert_search_statements
+from db.alert_stream import alert_stream
+from db.crud.lookup_cache import lookup_cache
+from db.crud.lookup_snapshots import lookup_snapshots
+from db.crud.node_cache import node_cache
+from db.database import async_engine, async_pool_metrics, engine, pool_metrics
+from db.node_history import node_history_writer
+
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def metrics() -> dict:
+    return {
+        "database_pool": pool_metrics.snapshot(engine.pool),
+        "async_database_pool": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+        "alert_search_statements": alert_search_statements.stats(),
+        "alert_stream": alert_stream.stats(),
+        "lookup_cache": lookup_cache.stats(),
+        "lookup_snapshots": lookup_snapshots.stats(),
+        "node_cache": node_cache.stats(),
+        "node_history": node_history_writer.stats(),
+    }
@@ -1,11 +1,20 @@
-from fastapi import status
+import hashlib
+
+from fastapi import Response, status
 from fastapi.exceptions import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import inspect, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.decl_api import DeclarativeMeta
+from sqlalchemy.sql.expression import Select
+from typing import Optional, Type
 from uuid import UUID, uuid4
 
 from api.models.node import NodeCreate, NodeUpdate
-from db import crud
+from api.routes import helpers
+from db import crud, node_history
+from db.crud.node_cache import node_cache
 from db.schemas.node import Node
 from db.schemas.node_directive import NodeDirective
 from db.schemas.node_tag import NodeTag
@@ -40,36 +49,174 @@ def create_node(
     return db_node
 
 
-def update_node(node_update: NodeUpdate, uuid: UUID, db_table: DeclarativeMeta, db: Session) -> DeclarativeMeta:
+def read_node(
+    db: Session,
+    uuid: UUID,
+    db_table: DeclarativeMeta,
+    response_model: Type[BaseModel],
+    if_none_match: Optional[str] = None,
+    versions: Optional[Select] = None,
+) -> Response:
     """
-    Helper function when updating a Node that enforces version matching and updates the attributes inherited from Node.
+    Helper function when reading a single Node that supports conditional requests and caches the serialized response.
+
+    The ETag is built from the Node's version, so the only query needed to answer a client that already has the
+    current version is a primary key lookup of the version. The serialized response is cached by the UUID and ETag, so
+    a client that does not have the current version usually still gets it without the Node being read or validated.
+
+    If the response includes other Nodes (or other rows) that can change without the Node receiving a new version,
+    the versions statement should select those values along with the Node's version so that they are part of the ETag.
+    A 304 is only returned while the response is cached, so the related objects without a version (such as the alert
+    queue) are never stale for longer than the cache's TTL.
     """
 
-    # Fetch the Node from the database
-    db_node: Node = crud.read(uuid=uuid, db_table=db_table, db=db)
+    if versions is None:
+        versions = select(db_table.version).where(db_table.uuid == uuid)
+
+    row = db.execute(versions).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"UUID {uuid} does not exist.")
+
+    if len(row) == 1:
+        etag = f'"{row[0]}"'
+    else:
+        etag = f'"{hashlib.sha1("|".join(str(v) for v in row).encode()).hexdigest()}"'
+
+    headers = {"Cache-Control": "no-cache", "ETag": etag}
+
+    body = node_cache.get((uuid, etag))
+    if body is not None and helpers.etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if body is None:
+        db_node = crud.read(uuid=uuid, db_table=db_table, db=db, response_model=response_model)
+        body = response_model.from_orm(db_node).json().encode()
+
+        # The Node could have been updated between the two queries, in which case the response is not cached
+        if db_node.version == row[0]:
+            node_cache.set((uuid, etag), body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def update_node(
+    node_update: NodeUpdate,
+    uuid: UUID,
+    db_table: DeclarativeMeta,
+    db: Session,
+    values: Optional[dict] = None,
+) -> dict:
+    """
+    Helper function when updating a Node that enforces version matching and updates the attributes inherited from Node.
+
+    The version check and the update happen in a single conditional UPDATE statement instead of reading the Node and
+    comparing its version in Python, so two concurrent updates using the same version can never both succeed. Any
+    column values given for the Node subclass's own table (such as an alert's queue_uuid) are applied by the same
+    statement. Returns the previous values of the columns that were updated.
+    """
 
     # Get the data that was given in the request and use it to update the database object
     update_data = node_update.dict(exclude_unset=True)
 
-    # Return an exception if the passed in version does not match the Node's current version
-    if update_data["version"] != db_node.version:
+    node_values = {"version": uuid4()}
+    if "threat_actor" in update_data:
+        node_values["threat_actor_uuid"] = (
+            crud.read_by_value(value=update_data["threat_actor"], db_table=NodeThreatActor, db=db).uuid
+            if update_data["threat_actor"]
+            else None
+        )
+
+    try:
+        old_values = _conditional_update(
+            uuid=uuid, version=update_data["version"], db_table=db_table, node_values=node_values, values=values, db=db
+        )
+    except IntegrityError:
+        crud.rollback(db)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Got an IntegrityError while updating UUID {uuid}."
+        )
+
+    # An extra query is only needed to tell the difference between a missing Node and a version mismatch
+    if old_values is None:
+        if db.execute(select(db_table.uuid).where(db_table.uuid == uuid)).first() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"UUID {uuid} does not exist.")
+
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Unable to update Node due to version mismatch"
         )
 
+    # Only the fields that actually changed (and the version) are recorded in the history
+    new_values = {**node_values, **(values or {})}
+    changed = [k for k in new_values if k == "version" or old_values[k] != new_values[k]]
+    node_history.record(
+        db,
+        node_uuid=uuid,
+        action="UPDATE",
+        before={k: old_values[k] for k in changed},
+        after={k: new_values[k] for k in changed},
+    )
+
+    # The Node's relationship lists live in mapping tables, so the Node only needs to be loaded if one of them changed
+    if {"directives", "tags", "threats"} & set(update_data):
+        _update_node_lists(update_data=update_data, uuid=uuid, db_table=db_table, db=db)
+
+    return old_values
+
+
+def _conditional_update(
+    uuid: UUID,
+    version: UUID,
+    db_table: DeclarativeMeta,
+    node_values: dict,
+    values: Optional[dict],
+    db: Session,
+) -> Optional[dict]:
+    """Updates the Node only if it is the expected type and its version matches the given version. Returns the values
+    the updated columns had before the update, or None if nothing was updated.
+
+    The previous values are read from a second reference to the same table in the UPDATE's FROM clause, which still
+    sees the row as it was before the update. Since the update only happens if the version has not changed, those are
+    the values the caller's version refers to."""
+
+    node = Node.__table__
+    old_node = node.alias("old_node")
+    statement = (
+        update(node)
+        .where(
+            node.c.uuid == uuid,
+            node.c.version == version,
+            node.c.node_type == inspect(db_table).polymorphic_identity,
+            old_node.c.uuid == node.c.uuid,
+        )
+        .values(**node_values)
+        .returning(node.c.uuid, *[old_node.c[k].label(k) for k in node_values])
+    )
+
+    # The subclass columns live in a separate table, so the node UPDATE becomes a CTE that the subclass table's UPDATE
+    # joins against. This way the subclass table is only updated if the version matched.
+    if values:
+        bumped = statement.cte("bumped")
+        table = db_table.__table__
+        old = table.alias("old")
+        statement = (
+            update(table)
+            .where(table.c.uuid == bumped.c.uuid, old.c.uuid == table.c.uuid)
+            .values(**values)
+            .returning(table.c.uuid, *[bumped.c[k] for k in node_values], *[old.c[k].label(k) for k in values])
+        )
+
+    row = db.execute(statement).first()
+    return dict(row._mapping) if row else None
+
+
+def _update_node_lists(update_data: dict, uuid: UUID, db_table: DeclarativeMeta, db: Session):
+    db_node: Node = crud.read(uuid=uuid, db_table=db_table, db=db)
+
     if "directives" in update_data:
         db_node.directives = crud.read_by_values(values=update_data["directives"], db_table=NodeDirective, db=db)
 
     if "tags" in update_data:
         db_node.tags = crud.read_by_values(values=update_data["tags"], db_table=NodeTag, db=db)
 
-    if "threat_actor" in update_data:
-        db_node.threat_actor = crud.read_by_value(value=update_data["threat_actor"], db_table=NodeThreatActor, db=db)
-
     if "threats" in update_data:
         db_node.threats = crud.read_by_values(values=update_data["threats"], db_table=NodeThreat, db=db)
-
-    # Update the node version
-    db_node.version = uuid4()
-
-    return db_node
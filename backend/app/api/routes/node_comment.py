@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
-from uuid import UUID, uuid4
+from uuid import UUID
 
 from api.models.node_comment import NodeCommentCreate, NodeCommentRead, NodeCommentUpdate
 from api.routes import helpers
-from db import crud
+from db import crud, node_versions
 from db.database import get_db
 from db.schemas.node import Node
 from db.schemas.node_comment import NodeComment
@@ -34,7 +34,7 @@ def create_node_comment(
     db_node = crud.read(uuid=node_comment.node_uuid, db_table=Node, db=db)
 
     # This counts a modifying the node, so it should receive a new version.
-    db_node.version = uuid4()
+    node_versions.bump(db, db_node.uuid)
 
     # Set the user on the comment
     new_comment.user = crud.read_user_by_username(username=node_comment.user, db=db)
@@ -59,7 +59,7 @@ helpers.api_route_create(router, create_node_comment)
 
 
 def get_node_comment(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=NodeComment, db=db)
+    return crud.read(uuid=uuid, db_table=NodeComment, db=db, response_model=NodeCommentRead)
 
 
 # It does not make sense to have a get_all_node_comments route at this point (and certainly not without pagination).
@@ -89,7 +89,7 @@ def update_node_comment(
     db_node_comment.value = node_comment.value
 
     # Modifying the comment counts as modifying the node, so it should receive a new version
-    db_node.version = uuid4()
+    node_versions.bump(db, db_node.uuid)
 
     crud.commit(db)
 
@@ -105,6 +105,13 @@ helpers.api_route_update(router, update_node_comment)
 
 
 def delete_node_comment(uuid: UUID, db: Session = Depends(get_db)):
+    # Read the node comment and its node from the database
+    db_node_comment: NodeComment = crud.read(uuid=uuid, db_table=NodeComment, db=db)
+    db_node = crud.read(uuid=db_node_comment.node_uuid, db_table=Node, db=db)
+
+    # Deleting the comment counts as modifying the node, so it should receive a new version
+    node_versions.bump(db, db_node.uuid)
+
     crud.delete(uuid=uuid, db_table=NodeComment, db=db)
 
 
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.node_directive import (
@@ -9,6 +9,7 @@ from api.models.node_directive import (
     NodeDirectiveUpdate,
 )
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.node_directive import NodeDirective
@@ -44,8 +45,8 @@ helpers.api_route_create(router, create_node_directive)
 #
 
 
-def get_all_node_directives(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=NodeDirective, db=db)
+def get_all_node_directives(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(db, db_table=NodeDirective, response_model=NodeDirectiveRead, if_none_match=if_none_match)
 
 
 def get_node_directive(uuid: UUID, db: Session = Depends(get_db)):
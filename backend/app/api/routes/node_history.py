@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Optional
+from uuid import UUID
+
+from api.models.node_history import NodeHistoryRead
+from api.models.pagination import Page
+from api.routes import helpers
+from db import crud
+from db.database import get_db
+from db.schemas.node import Node
+from db.schemas.node_history import NodeHistory
+from db.schemas.node_history_action import NodeHistoryAction
+
+
+router = APIRouter(
+    prefix="/node",
+    tags=["Node History"],
+)
+
+
+#
+# READ
+#
+
+
+def get_node_history(
+    uuid: UUID,
+    action: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    user: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # Make sure the node exists so that a typo does not look like a node without any history
+    crud.read(uuid=uuid, db_table=Node, db=db)
+
+    # The filters use the foreign keys so that the database can use the composite (node, ..., timestamp, uuid) indices
+    query = select(NodeHistory).where(NodeHistory.node_uuid == uuid)
+
+    if action:
+        query = query.where(
+            NodeHistory.action_uuid == crud.read_by_value(value=action, db_table=NodeHistoryAction, db=db).uuid
+        )
+
+    if user:
+        query = query.where(NodeHistory.action_user_uuid == crud.read_user_by_username(username=user, db=db).uuid)
+
+    query = query.options(*crud.eager_load_options(model=NodeHistoryRead, db_table=NodeHistory))
+
+    # The history is returned in the order it happened
+    items, next_cursor = crud.read_page(
+        statement=query,
+        keys=[NodeHistory.timestamp, NodeHistory.uuid],
+        limit=limit,
+        cursor=cursor,
+        db=db,
+        descending=False,
+    )
+
+    return Page[NodeHistoryRead](items=[NodeHistoryRead.from_orm(h) for h in items], next_cursor=next_cursor)
+
+
+helpers.api_route_read(router, get_node_history, Page[NodeHistoryRead], path="/{uuid}/history")
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.node_history_action import (
@@ -9,6 +9,7 @@ from api.models.node_history_action import (
     NodeHistoryActionUpdate,
 )
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.node_history_action import NodeHistoryAction
@@ -44,8 +45,10 @@ helpers.api_route_create(router, create_node_history_action)
 #
 
 
-def get_all_node_history_actions(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=NodeHistoryAction, db=db)
+def get_all_node_history_actions(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(
+        db, db_table=NodeHistoryAction, response_model=NodeHistoryActionRead, if_none_match=if_none_match
+    )
 
 
 def get_node_history_action(uuid: UUID, db: Session = Depends(get_db)):
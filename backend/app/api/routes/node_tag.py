@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.node_tag import NodeTagCreate, NodeTagRead, NodeTagUpdate
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.node_tag import NodeTag
@@ -40,8 +41,8 @@ helpers.api_route_create(router, create_node_tag)
 #
 
 
-def get_all_node_tags(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=NodeTag, db=db)
+def get_all_node_tags(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(db, db_table=NodeTag, response_model=NodeTagRead, if_none_match=if_none_match)
 
 
 def get_node_tag(uuid: UUID, db: Session = Depends(get_db)):
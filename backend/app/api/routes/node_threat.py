@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.node_threat import NodeThreatCreate, NodeThreatRead, NodeThreatUpdate
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.node_threat import NodeThreat
@@ -39,7 +40,7 @@ def create_node_threat(
 
     # Save the new node threat to the database
     db.add(new_threat)
-    crud.commit(db)
+    crud.commit(db, invalidate=NodeThreat)
 
     response.headers["Content-Location"] = request.url_for("get_node_threat", uuid=new_threat.uuid)
 
@@ -52,12 +53,12 @@ helpers.api_route_create(router, create_node_threat)
 #
 
 
-def get_all_node_threats(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=NodeThreat, db=db)
+def get_all_node_threats(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(db, db_table=NodeThreat, response_model=NodeThreatRead, if_none_match=if_none_match)
 
 
 def get_node_threat(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=NodeThreat, db=db)
+    return crud.read(uuid=uuid, db_table=NodeThreat, db=db, response_model=NodeThreatRead)
 
 
 helpers.api_route_read_all(router, get_all_node_threats, List[NodeThreatRead])
@@ -93,7 +94,7 @@ def update_node_threat(
             values=update_data["types"], db_table=NodeThreatType, db=db
         )
 
-    crud.commit(db)
+    crud.commit(db, invalidate=NodeThreat)
 
     response.headers["Content-Location"] = request.url_for("get_node_threat", uuid=uuid)
 
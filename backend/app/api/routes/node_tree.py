@@ -0,0 +1,390 @@
+from collections import defaultdict
+from fastapi import HTTPException, status
+from sqlalchemy import any_, bindparam, cast, false, literal, null, select, union_all, update as sql_update
+from sqlalchemy.dialects.postgresql import array, UUID as PG_UUID
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.decl_api import DeclarativeMeta
+from sqlalchemy.sql.expression import Select
+from typing import Dict, List, Optional, Set, Tuple, Union
+from uuid import UUID
+
+from api.models.node import NodeCreate
+from api.models.node_tree import (
+    AnalysisTreeCreate,
+    AnalysisTreeRead,
+    AnalysisTreeUUIDs,
+    ObservableInstanceTreeCreate,
+    ObservableInstanceTreeRead,
+    ObservableInstanceTreeUUIDs,
+)
+from db import crud, node_history
+from db.schemas.alert import Alert
+from db.schemas.analysis import Analysis
+from db.schemas.analysis_module_type import AnalysisModuleType
+from db.schemas.analysis_observable_instance_mapping import analysis_observable_instance_mapping
+from db.schemas.node import Node
+from db.schemas.node_directive import NodeDirective
+from db.schemas.node_directive_mapping import node_directive_mapping
+from db.schemas.node_tag import NodeTag
+from db.schemas.node_tag_mapping import node_tag_mapping
+from db.schemas.node_threat import NodeThreat
+from db.schemas.node_threat_actor import NodeThreatActor
+from db.schemas.node_threat_mapping import node_threat_mapping
+from db.schemas.observable_instance import ObservableInstance
+from db.schemas.observable_instance_analysis_mapping import observable_instance_analysis_mapping
+
+
+class NodeTree:
+    """
+    Helper class used to create an entire tree of Nodes (analyses and the observable instances they discovered) inside
+    of a single transaction.
+
+    Rather than adding each Node to the session and letting the ORM flush them one at a time, the rows for every table
+    are collected first. This allows the lookup values (tags, directives, observable types, etc.) to be resolved with a
+    single query per lookup table, and each table is then written with a single multi-row INSERT.
+    """
+
+    # The order in which the tables must be inserted to satisfy their foreign keys
+    tables = [
+        Node,
+        Analysis,
+        Alert,
+        ObservableInstance,
+        analysis_observable_instance_mapping,
+        observable_instance_analysis_mapping,
+        node_directive_mapping,
+        node_tag_mapping,
+        node_threat_mapping,
+    ]
+
+    def __init__(self, alert_uuid: UUID):
+        self.alert_uuid = alert_uuid
+
+        self.rows: Dict[DeclarativeMeta, List[dict]] = {table: [] for table in self.tables}
+
+        # Node rows along with the request data needed to resolve their lookup values
+        self.nodes: List[Tuple[dict, NodeCreate]] = []
+
+        # Observable instance rows along with the (type, value) of the observable they represent
+        self.observable_instances: List[Tuple[dict, Tuple[str, str]]] = []
+
+        # Filled in by the insert method with the UUID of each (type, value) observable
+        self.observable_uuids: Dict[Tuple[str, str], UUID] = {}
+
+        self.redirections: Dict[UUID, UUID] = {}
+
+    def add_row(self, db_table: DeclarativeMeta, row: dict):
+        """Adds a row that is not part of the analysis tree (such as the Alert) to be inserted with the tree."""
+
+        self.rows[db_table].append(row)
+
+    def add_node(self, node_create: NodeCreate, node_type: str):
+        """Adds the row for the base Node table that every Node subclass requires."""
+
+        row = {
+            "uuid": node_create.uuid,
+            "node_type": node_type,
+            "threat_actor_uuid": None,
+            "version": node_create.version,
+        }
+        self.rows[Node].append(row)
+        self.nodes.append((row, node_create))
+
+    def add_analysis(self, analysis: AnalysisTreeCreate, parent_observable_uuid: Optional[UUID] = None):
+        """Adds the analysis and every observable instance it discovered (recursively) to the tree."""
+
+        self.add_node(node_create=analysis, node_type="analysis")
+        self.add_row(
+            Analysis,
+            {
+                "uuid": analysis.uuid,
+                "analysis_module_type_uuid": analysis.analysis_module_type,
+                "details": analysis.details,
+                "error_message": analysis.error_message,
+                "extended_version": None,
+                "stack_trace": analysis.stack_trace,
+                "summary": analysis.summary,
+            },
+        )
+
+        if parent_observable_uuid:
+            self.add_row(
+                observable_instance_analysis_mapping,
+                {"observable_instance_uuid": parent_observable_uuid, "analysis_uuid": analysis.uuid},
+            )
+
+        for observable_instance in analysis.discovered_observables:
+            self.add_observable_instance(observable_instance=observable_instance, parent_analysis_uuid=analysis.uuid)
+
+    def add_observable_instance(self, observable_instance: ObservableInstanceTreeCreate, parent_analysis_uuid: UUID):
+        """Adds the observable instance and every analysis performed on it (recursively) to the tree."""
+
+        self.add_node(node_create=observable_instance, node_type="observable_instance")
+
+        row = {
+            "uuid": observable_instance.uuid,
+            "alert_uuid": self.alert_uuid,
+            "context": observable_instance.context,
+            "observable_uuid": None,
+            "redirection_uuid": None,
+            "time": observable_instance.time,
+        }
+        self.add_row(ObservableInstance, row)
+        self.observable_instances.append((row, (observable_instance.type, observable_instance.value)))
+
+        self.add_row(
+            analysis_observable_instance_mapping,
+            {"analysis_uuid": parent_analysis_uuid, "observable_instance_uuid": observable_instance.uuid},
+        )
+
+        if observable_instance.redirection_uuid:
+            self.redirections[observable_instance.uuid] = observable_instance.redirection_uuid
+
+        for analysis in observable_instance.analyses:
+            self.add_analysis(analysis=analysis, parent_observable_uuid=observable_instance.uuid)
+
+    def insert(self, db: Session):
+        """Resolves all of the lookup values used in the tree and inserts every row. The session is not committed.
+        Designed to be called only by the API since it raises an HTTPException."""
+
+        self._validate_references(db)
+        self._resolve_node_lookups(db)
+
+        self.observable_uuids = crud.read_or_create_observables(
+            observables=[observable for _, observable in self.observable_instances], db=db
+        )
+        for row, observable in self.observable_instances:
+            row["observable_uuid"] = self.observable_uuids[observable]
+
+        # The sighting statistics have to be updated before the observable instances exist
+        crud.update_observable_sightings(
+            [(row["observable_uuid"], row["alert_uuid"], row["time"]) for row, _ in self.observable_instances], db=db
+        )
+
+        for table in self.tables:
+            crud.create_many(rows=self.rows[table], db_table=table, db=db)
+
+        self._record_history(db)
+
+        # The redirections are set after all of the observable instances exist since they can point to each other.
+        if self.redirections:
+            db.execute(
+                sql_update(ObservableInstance.__table__)
+                .where(ObservableInstance.__table__.c.uuid == bindparam("b_uuid"))
+                .values(redirection_uuid=bindparam("b_redirection_uuid")),
+                [{"b_uuid": k, "b_redirection_uuid": v} for k, v in self.redirections.items()],
+            )
+
+    def analysis_uuids(self, analysis: AnalysisTreeCreate) -> AnalysisTreeUUIDs:
+        """Returns the UUIDs assigned to the given analysis and its children. Must be called after the tree is
+        inserted so that the observable UUIDs are known."""
+
+        return AnalysisTreeUUIDs(
+            discovered_observables=[self.observable_instance_uuids(o) for o in analysis.discovered_observables],
+            uuid=analysis.uuid,
+        )
+
+    def observable_instance_uuids(
+        self, observable_instance: ObservableInstanceTreeCreate
+    ) -> ObservableInstanceTreeUUIDs:
+        """Returns the UUIDs assigned to the given observable instance and its children. Must be called after the tree
+        is inserted so that the observable UUIDs are known."""
+
+        return ObservableInstanceTreeUUIDs(
+            analyses=[self.analysis_uuids(a) for a in observable_instance.analyses],
+            observable_uuid=self.observable_uuids[(observable_instance.type, observable_instance.value)],
+            uuid=observable_instance.uuid,
+        )
+
+    def _record_history(self, db: Session):
+        """Records the creation of every Node in the tree. The rows were inserted without the ORM, so the session
+        events that normally record the history do not see them."""
+
+        for table in [Node, Analysis, Alert, ObservableInstance]:
+            for row in self.rows[table]:
+                node_history.record(
+                    db, node_uuid=row["uuid"], action="CREATE", after={k: v for k, v in row.items() if v is not None}
+                )
+
+        for row, node_create in self.nodes:
+            node_history.record(
+                db,
+                node_uuid=row["uuid"],
+                action="CREATE",
+                after={
+                    k: getattr(node_create, k)
+                    for k in ["directives", "tags", "threat_actor", "threats"]
+                    if getattr(node_create, k)
+                },
+            )
+
+    def _validate_references(self, db: Session):
+        """Makes sure that the analysis module types and redirection targets that are not part of the tree exist. The
+        analyses also record the extended versions of their analysis module types."""
+
+        module_types = crud.read_by_uuids(
+            uuids=[r["analysis_module_type_uuid"] for r in self.rows[Analysis] if r["analysis_module_type_uuid"]],
+            db_table=AnalysisModuleType,
+            db=db,
+        )
+        extended_versions = {m.uuid: m.extended_version for m in module_types}
+        for row in self.rows[Analysis]:
+            row["extended_version"] = extended_versions.get(row["analysis_module_type_uuid"])
+
+        tree_uuids = {r["uuid"] for r in self.rows[ObservableInstance]}
+        crud.read_by_uuids(
+            uuids=[u for u in self.redirections.values() if u not in tree_uuids],
+            db_table=ObservableInstance,
+            db=db,
+        )
+
+    def _resolve_node_lookups(self, db: Session):
+        """Reads every directive, tag, threat, and threat actor used by the tree with a single query per table and
+        builds the rows for the node mapping tables."""
+
+        directives = self._read_lookup_uuids([n.directives for _, n in self.nodes], NodeDirective, db)
+        tags = self._read_lookup_uuids([n.tags for _, n in self.nodes], NodeTag, db)
+        threats = self._read_lookup_uuids([n.threats for _, n in self.nodes], NodeThreat, db)
+        threat_actors = self._read_lookup_uuids([[n.threat_actor] for _, n in self.nodes], NodeThreatActor, db)
+
+        for row, node in self.nodes:
+            row["threat_actor_uuid"] = threat_actors.get(node.threat_actor)
+
+            for value in set(node.directives):
+                self.add_row(node_directive_mapping, {"node_uuid": node.uuid, "directive_uuid": directives[value]})
+
+            for value in set(node.tags):
+                self.add_row(node_tag_mapping, {"node_uuid": node.uuid, "tag_uuid": tags[value]})
+
+            for value in set(node.threats):
+                self.add_row(node_threat_mapping, {"node_uuid": node.uuid, "threat_uuid": threats[value]})
+
+    @staticmethod
+    def _read_lookup_uuids(values: List[List[str]], db_table: DeclarativeMeta, db: Session) -> Dict[str, UUID]:
+        """Returns a dictionary that maps each of the given lookup values to its UUID."""
+
+        unique_values = {value for node_values in values for value in node_values if value}
+        return {r.value: r.uuid for r in crud.read_by_values(values=list(unique_values), db_table=db_table, db=db)}
+
+
+def read_analysis_tree(uuid: UUID, max_depth: Optional[int], db: Session) -> AnalysisTreeRead:
+    """Reads the analysis with the given UUID along with every observable instance and analysis beneath it. If a
+    maximum depth is given, the tree is cut off after that many levels (the analysis itself is at depth 0, the
+    observable instances it discovered are at depth 1, and so on).
+
+    The structure of the tree is read with a single recursive query over the two mapping tables. The nodes are then
+    read with one query per node type, and their parent/child relationships are filled in from the tree so that
+    building the response does not lazy-load each level one node at a time.
+
+    Designed to be called only by the API since it raises an HTTPException."""
+
+    rows = db.execute(_analysis_tree_query(uuid=uuid, max_depth=max_depth)).all()
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"UUID {uuid} does not exist.")
+
+    # The tree alternates between analyses and observable instances, so the depth gives the type of each node.
+    nodes: Dict[UUID, Union[Analysis, ObservableInstance]] = {
+        **_read_tree_nodes([r.uuid for r in rows if r.depth % 2 == 0], Analysis, db),
+        **_read_tree_nodes([r.uuid for r in rows if r.depth % 2 == 1], ObservableInstance, db),
+    }
+
+    children = defaultdict(list)
+    for row in rows:
+        if row.parent_uuid:
+            children[row.parent_uuid].append(nodes[row.uuid])
+
+    # The query returns one extra level beyond the maximum depth so that the nodes at the maximum depth still list the
+    # UUIDs of their children. The nodes on that extra level are not part of the response. The rows that close a cycle
+    # only exist to list the child UUIDs of their parent.
+    for row in rows:
+        if not row.cycle and (max_depth is None or row.depth <= max_depth):
+            node = nodes[row.uuid]
+            parent = nodes.get(row.parent_uuid)
+            if isinstance(node, Analysis):
+                set_committed_value(node, "discovered_observables", children[row.uuid])
+                set_committed_value(node, "parent_observable", parent)
+            else:
+                set_committed_value(node, "performed_analyses", children[row.uuid])
+                set_committed_value(node, "parent_analysis", parent)
+
+    def build(node: Union[Analysis, ObservableInstance], depth: int, ancestors: Set[UUID]):
+        model = AnalysisTreeRead if isinstance(node, Analysis) else ObservableInstanceTreeRead
+        tree = model.from_orm(node)
+        if max_depth is None or depth < max_depth:
+            tree.children = [
+                build(child, depth + 1, ancestors | {node.uuid})
+                for child in children[node.uuid]
+                if child.uuid not in ancestors and child.uuid != node.uuid
+            ]
+        return tree
+
+    return build(nodes[uuid], 0, set())
+
+
+def _analysis_tree_query(uuid: UUID, max_depth: Optional[int]) -> Select:
+    """Builds the recursive query that returns the (uuid, parent_uuid, depth, cycle) of every node beneath the analysis
+    with the given UUID, including one level beyond the maximum depth (if given)."""
+
+    aoim = analysis_observable_instance_mapping
+    oiam = observable_instance_analysis_mapping
+
+    # Both mapping tables are combined into a single set of parent -> child edges
+    edges = union_all(
+        select(aoim.c.analysis_uuid.label("parent_uuid"), aoim.c.observable_instance_uuid.label("child_uuid")),
+        select(oiam.c.observable_instance_uuid.label("parent_uuid"), oiam.c.analysis_uuid.label("child_uuid")),
+    ).subquery("edges")
+
+    analysis = Analysis.__table__
+    tree = (
+        select(
+            analysis.c.uuid,
+            cast(null(), PG_UUID(as_uuid=True)).label("parent_uuid"),
+            literal(0).label("depth"),
+            array([analysis.c.uuid]).label("path"),
+            false().label("cycle"),
+        )
+        .where(analysis.c.uuid == uuid)
+        .cte("tree", recursive=True)
+    )
+
+    # The path of UUIDs leading to each node prevents the query from looping forever if an analysis was added as a
+    # performed analysis of one of its own descendants. The row that closes the cycle is returned but not followed.
+    recursive = (
+        select(
+            edges.c.child_uuid,
+            edges.c.parent_uuid,
+            tree.c.depth + 1,
+            tree.c.path + array([edges.c.child_uuid]),
+            edges.c.child_uuid == any_(tree.c.path),
+        )
+        .join_from(tree, edges, edges.c.parent_uuid == tree.c.uuid)
+        .where(~tree.c.cycle)
+    )
+    if max_depth is not None:
+        recursive = recursive.where(tree.c.depth <= max_depth)
+
+    tree = tree.union_all(recursive)
+    return select(tree.c.uuid, tree.c.parent_uuid, tree.c.depth, tree.c.cycle).order_by(tree.c.depth)
+
+
+def _read_tree_nodes(uuids: List[UUID], db_table: DeclarativeMeta, db: Session) -> Dict[UUID, DeclarativeMeta]:
+    """Reads the given nodes along with the relationships used by their read models. The relationships that link the
+    nodes to each other are filled in from the tree instead."""
+
+    if not uuids:
+        return {}
+
+    if db_table is Analysis:
+        model = AnalysisTreeRead
+        exclude = frozenset({"discovered_observable_uuids", "parent_observable_uuid"})
+    else:
+        model = ObservableInstanceTreeRead
+        exclude = frozenset({"parent_analysis_uuid", "performed_analysis_uuids"})
+
+    query = (
+        select(db_table)
+        .where(db_table.uuid.in_(uuids))
+        .options(*crud.eager_load_options(model=model, db_table=db_table, exclude=exclude))
+    )
+    return {n.uuid: n for n in db.execute(query).scalars()}
@@ -1,20 +1,33 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import cast, func, select
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 from uuid import UUID
 
+from api.models.alert import AlertCount, AlertRead, ObservableAlertsRead
 from api.models.observable import (
     ObservableCreate,
     ObservableRead,
+    ObservableSort,
     ObservableUpdate,
 )
+from api.models.pagination import Page
 from api.routes import helpers
 from db import crud
 from db.database import get_db
+from db.schemas.alert import Alert
+from db.schemas.alert_disposition import AlertDisposition
+from db.schemas.alert_queue import AlertQueue
 from db.schemas.observable import Observable
+from db.schemas.observable_instance import ObservableInstance
 from db.schemas.observable_type import ObservableType
 
 
+NDJSON = "application/x-ndjson"
+
+
 router = APIRouter(
     prefix="/observable",
     tags=["Observable"],
@@ -53,16 +66,128 @@ helpers.api_route_create(router, create_observable)
 #
 
 
-def get_all_observables(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=Observable, db=db)
+def get_all_observables(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    sort: Optional[ObservableSort] = Query(
+        None,
+        description="""Lists the observables by one of their sighting statistics instead of by UUID. Sorting by
+            first_seen or last_seen only includes the observables that have been seen in an alert.""",
+    ),
+    db: Session = Depends(get_db),
+):
+    # Clients that need every observable (such as the detection exports) can ask for newline delimited JSON, which is
+    # streamed from a server-side cursor instead of building the entire list in memory.
+    if NDJSON in request.headers.get("accept", ""):
+        observables = crud.stream_all(db_table=Observable, db=db, response_model=ObservableRead)
+        return StreamingResponse(
+            (f"{ObservableRead.from_orm(o).json()}\n" for o in observables), media_type=NDJSON
+        )
+
+    if sort:
+        # The statistics are stored on the observables, so each sort uses its own (statistic, uuid) index
+        sort_column = getattr(Observable, sort.value)
+        query = select(Observable).options(*crud.eager_load_options(model=ObservableRead, db_table=Observable))
+        if sort in (ObservableSort.first_seen, ObservableSort.last_seen):
+            query = query.where(sort_column.isnot(None))
+
+        items, next_cursor = crud.read_page(
+            statement=query, keys=[sort_column, Observable.uuid], limit=limit, cursor=cursor, db=db
+        )
+    else:
+        items, next_cursor = crud.read_all_page(
+            db_table=Observable, db=db, limit=limit, cursor=cursor, response_model=ObservableRead
+        )
+
+    return Page[ObservableRead](items=[ObservableRead.from_orm(o) for o in items], next_cursor=next_cursor)
 
 
 def get_observable(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=Observable, db=db)
+    return crud.read(uuid=uuid, db_table=Observable, db=db, response_model=ObservableRead)
+
+
+def search_observables(
+    q: str = Query(
+        ...,
+        min_length=3,
+        description="""The text to search for anywhere in the observable values (case insensitive). It must be at least
+            three characters long so that the search can use the trigram index.""",
+    ),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    type: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # Escape the LIKE wildcards so that the text is matched literally. The ILIKE is satisfied by the trigram index.
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    query = select(Observable).where(Observable.value.ilike(f"%{escaped}%", escape="\\"))
 
+    if type:
+        query = query.where(Observable.type_uuid == crud.read_by_value(value=type, db_table=ObservableType, db=db).uuid)
 
-helpers.api_route_read_all(router, get_all_observables, List[ObservableRead])
+    query = query.options(*crud.eager_load_options(model=ObservableRead, db_table=Observable))
+
+    # The closest matches come first. The similarity is cast to double precision so that the value stored in the
+    # cursor compares exactly equal to the one computed by the database for the next page.
+    rank = cast(func.similarity(Observable.value, q), DOUBLE_PRECISION)
+    items, next_cursor = crud.read_page(
+        statement=query, keys=[rank, Observable.uuid], limit=limit, cursor=cursor, db=db
+    )
+
+    return Page[ObservableRead](items=[ObservableRead.from_orm(o) for o in items], next_cursor=next_cursor)
+
+
+def get_observable_alerts(
+    uuid: UUID,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    crud.read(uuid=uuid, db_table=Observable, db=db)
+
+    # The alerts are found using the (observable_uuid, alert_uuid) index on the observable instances
+    alert_uuids = select(ObservableInstance.alert_uuid).where(ObservableInstance.observable_uuid == uuid)
+
+    query = (
+        select(Alert)
+        .where(Alert.uuid.in_(alert_uuids))
+        .options(*crud.eager_load_options(model=AlertRead, db_table=Alert))
+    )
+    items, next_cursor = crud.read_page(
+        statement=query, keys=[Alert.insert_time, Alert.uuid], limit=limit, cursor=cursor, db=db
+    )
+
+    # The counts include every alert containing the observable, not just the ones on this page
+    dispositions = db.execute(
+        select(AlertDisposition.value, func.count())
+        .select_from(Alert)
+        .outerjoin(AlertDisposition, Alert.disposition_uuid == AlertDisposition.uuid)
+        .where(Alert.uuid.in_(alert_uuids))
+        .group_by(AlertDisposition.value)
+    ).all()
+
+    queues = db.execute(
+        select(AlertQueue.value, func.count())
+        .select_from(Alert)
+        .join(AlertQueue, Alert.queue_uuid == AlertQueue.uuid)
+        .where(Alert.uuid.in_(alert_uuids))
+        .group_by(AlertQueue.value)
+    ).all()
+
+    return ObservableAlertsRead(
+        items=[AlertRead.from_orm(a) for a in items],
+        next_cursor=next_cursor,
+        dispositions=[AlertCount(value=value, count=count) for value, count in dispositions],
+        queues=[AlertCount(value=value, count=count) for value, count in queues],
+    )
+
+
+helpers.api_route_read_all(router, get_all_observables, Page[ObservableRead])
+# The search must be registered before get_observable so that "search" is not treated as a UUID
+helpers.api_route_read_all(router, search_observables, Page[ObservableRead], path="/search")
 helpers.api_route_read(router, get_observable, ObservableRead)
+helpers.api_route_read(router, get_observable_alerts, ObservableAlertsRead, path="/{uuid}/alerts")
 
 
 #
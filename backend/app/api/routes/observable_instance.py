@@ -1,17 +1,19 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from uuid import UUID, uuid4
+from typing import Optional
+from uuid import UUID
 
 from api.models.observable_instance import ObservableInstanceCreate, ObservableInstanceRead, ObservableInstanceUpdate
 from api.routes import helpers
-from api.routes.node import create_node, update_node
-from db import crud
-from db.database import get_db
+from api.routes.node import create_node, read_node, update_node
+from db import crud, node_versions
+from db.database import get_async_db, get_db
 from db.schemas.alert import Alert
 from db.schemas.analysis import Analysis
 from db.schemas.observable import Observable
 from db.schemas.observable_instance import ObservableInstance
-from db.schemas.observable_type import ObservableType
 
 
 router = APIRouter(
@@ -25,12 +27,18 @@ router = APIRouter(
 #
 
 
-def create_observable_instance(
+async def create_observable_instance(
     observable_instance: ObservableInstanceCreate,
     request: Request,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    await db.run_sync(_create_observable_instance, observable_instance)
+
+    response.headers["Content-Location"] = request.url_for("get_observable_instance", uuid=observable_instance.uuid)
+
+
+def _create_observable_instance(db: Session, observable_instance: ObservableInstanceCreate):
     # Create the new observable instance Node using the data from the request
     new_observable_instance: ObservableInstance = create_node(
         node_create=observable_instance,
@@ -39,6 +47,16 @@ def create_observable_instance(
         exclude={"parent_analysis_uuid", "performed_analysis_uuids", "type", "value"},
     )
 
+    # Associate the observable instance with the Observable it represents. This creates the Observable if it does not
+    # already exist. Its sighting statistics are updated before the instance is added to the session so that this
+    # alert is only counted if it is the first time the observable appears in it.
+    new_observable_instance.observable_uuid = crud.read_or_create_observable(
+        type=observable_instance.type, value=observable_instance.value, db=db
+    )
+    crud.update_observable_sightings(
+        [(new_observable_instance.observable_uuid, observable_instance.alert_uuid, observable_instance.time)], db=db
+    )
+
     # Read the required fields from the database to use with the new observable instance
     new_observable_instance.alert = crud.read(uuid=observable_instance.alert_uuid, db_table=Alert, db=db)
     new_observable_instance.parent_analysis = crud.read(
@@ -46,8 +64,7 @@ def create_observable_instance(
     )
 
     # Adding an observable instance counts as modifying the alert and the analysis, so they should both get new versions
-    new_observable_instance.alert.version = uuid4()
-    new_observable_instance.parent_analysis.version = uuid4()
+    node_versions.bump(db, new_observable_instance.alert.uuid, new_observable_instance.parent_analysis.uuid)
 
     # Set any performed analyses that were given
     for performed_analysis_uuid in observable_instance.performed_analysis_uuids:
@@ -55,7 +72,7 @@ def create_observable_instance(
         new_observable_instance.performed_analyses.append(db_analysis)
 
         # This counts as editing the analysis, so it should receive an updated version
-        db_analysis.version = uuid4()
+        node_versions.bump(db, db_analysis.uuid)
 
     # Set the redirection observable instance if one was given
     if observable_instance.redirection_uuid:
@@ -65,21 +82,10 @@ def create_observable_instance(
             db=db,
         )
 
-    # Lastly, check if the Observable represented by this instance already exists. Create it if it does not.
-    db_observable = crud.read_observable(type=observable_instance.type, value=observable_instance.value, db=db)
-    if not db_observable:
-        db_observable_type = crud.read_by_value(value=observable_instance.type, db_table=ObservableType, db=db)
-        db_observable = Observable(type=db_observable_type, value=observable_instance.value)
-
-    # Associate the observable instance with its observable
-    new_observable_instance.observable = db_observable
-
     # Save the new analysis to the database
     db.add(new_observable_instance)
     crud.commit(db)
 
-    response.headers["Content-Location"] = request.url_for("get_observable_instance", uuid=new_observable_instance.uuid)
-
 
 helpers.api_route_create(router, create_observable_instance)
 
@@ -93,8 +99,24 @@ helpers.api_route_create(router, create_observable_instance)
 #     return crud.read_all(db_table=ObservableInstance, db=db)
 
 
-def get_observable_instance(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=ObservableInstance, db=db)
+async def get_observable_instance(
+    uuid: UUID, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+):
+    # The observable does not have a version and its sighting statistics change whenever it appears in a new alert, so
+    # all of its columns are part of the ETag
+    versions = (
+        select(ObservableInstance.version, Observable.__table__)
+        .join(Observable, ObservableInstance.observable_uuid == Observable.uuid)
+        .where(ObservableInstance.uuid == uuid)
+    )
+    return await db.run_sync(
+        read_node,
+        uuid=uuid,
+        db_table=ObservableInstance,
+        response_model=ObservableInstanceRead,
+        if_none_match=if_none_match,
+        versions=versions,
+    )
 
 
 # It does not make sense to have a get_all_observable_instances route at this point (and not without pagination).
@@ -114,42 +136,34 @@ def update_observable_instance(
     response: Response,
     db: Session = Depends(get_db),
 ):
-    # Update the Node attributes
-    db_observable_instance: ObservableInstance = update_node(
-        node_update=observable_instance,
-        uuid=uuid,
-        db_table=ObservableInstance,
-        db=db,
-    )
-
-    # Get the data that was given in the request and use it to update the database object
+    # Get the data that was given in the request and use it to build the new column values
     update_data = observable_instance.dict(exclude_unset=True)
+    values = {}
+
+    for field in ["context", "time"]:
+        if field in update_data:
+            values[field] = update_data[field]
+
+    if "redirection_uuid" in update_data:
+        values["redirection_uuid"] = crud.read(
+            uuid=update_data["redirection_uuid"],
+            db_table=ObservableInstance,
+            db=db,
+        ).uuid
 
-    if "context" in update_data:
-        db_observable_instance.context = update_data["context"]
+    # Check the version and update the observable instance using a single statement
+    update_node(node_update=observable_instance, uuid=uuid, db_table=ObservableInstance, db=db, values=values)
 
     # Any UUIDs given in this list add to the existing ones and do not replace them
     if "performed_analysis_uuids" in update_data:
+        db_observable_instance: ObservableInstance = crud.read(uuid=uuid, db_table=ObservableInstance, db=db)
+
         for performed_analysis_uuid in update_data["performed_analysis_uuids"]:
             db_analysis = crud.read(uuid=performed_analysis_uuid, db_table=Analysis, db=db)
             db_observable_instance.performed_analyses.append(db_analysis)
 
             # This counts as editing the analysis, so it should receive an updated version
-            db_analysis.version = uuid4()
-
-    if "redirection_uuid" in update_data:
-        db_observable_instance.redirection = crud.read(
-            uuid=update_data["redirection_uuid"],
-            db_table=ObservableInstance,
-            db=db
-        )
-
-        # TODO: Figure out why setting the redirection field above does not set the redirection_uuid
-        # the same way it does in the create endpoint.
-        db_observable_instance.redirection_uuid = update_data["redirection_uuid"]
-
-    if "time" in update_data:
-        db_observable_instance.time = update_data["time"]
+            node_versions.bump(db, db_analysis.uuid)
 
     crud.commit(db)
 
@@ -63,11 +63,11 @@ helpers.api_route_create(router, create_user)
 
 
 def get_all_users(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=User, db=db)
+    return crud.read_all(db_table=User, db=db, response_model=UserRead)
 
 
 def get_user(uuid: UUID, db: Session = Depends(get_db)):
-    return crud.read(uuid=uuid, db_table=User, db=db)
+    return crud.read(uuid=uuid, db_table=User, db=db, response_model=UserRead)
 
 
 helpers.api_route_read_all(router, get_all_users, List[UserRead])
@@ -120,7 +120,7 @@ def update_user(
     if "username" in update_data:
         db_user.username = update_data["username"]
 
-    crud.commit(db)
+    crud.commit(db, invalidate=User)
 
     response.headers["Content-Location"] = request.url_for("get_user", uuid=uuid)
 
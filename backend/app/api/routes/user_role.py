@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.models.user_role import UserRoleCreate, UserRoleRead, UserRoleUpdate
 from api.routes import helpers
+from api.routes.lookup import read_all_lookups
 from db import crud
 from db.database import get_db
 from db.schemas.user_role import UserRole
@@ -40,8 +41,8 @@ helpers.api_route_create(router, create_user_role)
 #
 
 
-def get_all_user_roles(db: Session = Depends(get_db)):
-    return crud.read_all(db_table=UserRole, db=db)
+def get_all_user_roles(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return read_all_lookups(db, db_table=UserRole, response_model=UserRoleRead, if_none_match=if_none_match)
 
 
 def get_user_role(uuid: UUID, db: Session = Depends(get_db)):
@@ -5,6 +5,44 @@ from pydantic import BaseSettings, PostgresDsn
 class Settings(BaseSettings):
     database_url: PostgresDsn
 
+    # Connection pool settings used by both the sync and async database engines. The defaults match SQLAlchemy's.
+    database_max_overflow: int = 10
+    database_pool_pre_ping: bool = False
+    database_pool_recycle: int = -1
+    database_pool_size: int = 5
+    database_pool_timeout: float = 30
+
+    # The number of milliseconds a single statement may run before the database cancels it. 0 disables the timeout.
+    database_statement_timeout: int = 0
+
+    # The maximum number of statements built for the alert searches to cache by the shape of their filters. 0 disables
+    # the cache.
+    alert_search_cache_size: int = 1000
+
+    # The number of seconds between the keepalive comments sent on an idle alert stream so that proxies do not close it
+    alert_stream_keepalive: float = 15
+
+    # The number of seconds a previous analysis result stays fresh enough to be reused for the same observable and
+    # analysis module type instead of analyzing it again. 0 disables reusing results.
+    analysis_result_max_age: int = 86400
+
+    # The number of seconds rows from the lookup tables (alert queues, node tags, etc.) are cached. 0 disables caching.
+    lookup_cache_ttl: int = 300
+
+    # The max-age (in seconds) of the Cache-Control header sent with the lookup table lists. 0 makes browsers and
+    # proxies revalidate their copies on every request, which is answered from an in-memory snapshot.
+    lookup_list_max_age: int = 0
+
+    # The maximum number of serialized Node responses to cache and the number of seconds they are cached. Either one
+    # can be set to 0 to disable the cache.
+    node_cache_size: int = 10000
+    node_cache_ttl: int = 300
+
+    # The node history records are written in the background using batches of up to this many records. A batch is
+    # written once it is full or once its oldest record has waited for the flush interval (in seconds).
+    node_history_batch_size: int = 500
+    node_history_flush_interval: float = 1.0
+
 
 @lru_cache()
 def get_settings():
@@ -0,0 +1,216 @@
+import asyncio
+import asyncpg
+import json
+import logging
+
+from collections import defaultdict
+from sqlalchemy import cast, column, func, literal, select, String, Text, values
+from sqlalchemy.dialects.postgresql import JSON, UUID as PG_UUID
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from db.database import database_url
+from db.schemas.alert import Alert
+from db.schemas.alert_queue import AlertQueue
+from db.schemas.node import Node
+
+
+logger = logging.getLogger(__name__)
+
+# The PostgreSQL channel the alert changes are sent on
+CHANNEL = "alert_changes"
+
+# Put in a subscriber's queue instead of the changes it missed, either because it fell too far behind or because the
+# connection listening for the changes was lost. The subscriber has to read the alerts again to catch up.
+RESET = "reset"
+
+
+def notify_alert_changes(changes: List[Tuple[UUID, str, List[str], Optional[UUID]]], db: Session) -> List[str]:
+    """Sends a notification for each of the given (alert_uuid, action, changed_fields, previous_queue_uuid) changes
+    using a single statement and returns the payloads. The previous queue is only given when the alert was moved to a
+    different queue, so that the subscribers of both queues are told about it.
+
+    The payloads are built from the alerts' current rows, so the alerts must already be flushed. PostgreSQL only
+    delivers the notifications if the transaction commits."""
+
+    if not changes:
+        return []
+
+    alert, node, queue = Alert.__table__, Node.__table__, AlertQueue.__table__
+    previous_queue = queue.alias("previous_queue")
+
+    change = values(
+        column("uuid", PG_UUID(as_uuid=True)),
+        column("action", String),
+        column("changed", String),
+        column("previous_queue_uuid", PG_UUID(as_uuid=True)),
+        name="change",
+    ).data([(uuid, action, json.dumps(changed), previous) for uuid, action, changed, previous in changes])
+
+    # The keys are cast since asyncpg has to know the type of every parameter and json_build_object accepts any type
+    fields = {
+        "action": change.c.action,
+        "changed": cast(change.c.changed, JSON),
+        "previous_queue": previous_queue.c.value,
+        "queue": queue.c.value,
+        "uuid": node.c.uuid,
+        "version": node.c.version,
+    }
+    arguments = [argument for key, value in fields.items() for argument in (cast(literal(key), Text), value)]
+
+    payloads = (
+        select(cast(func.json_strip_nulls(func.json_build_object(*arguments)), Text).label("payload"))
+        .select_from(
+            change.join(node, node.c.uuid == change.c.uuid)
+            .join(alert, alert.c.uuid == node.c.uuid)
+            .join(queue, queue.c.uuid == alert.c.queue_uuid)
+            .outerjoin(previous_queue, previous_queue.c.uuid == cast(change.c.previous_queue_uuid, PG_UUID))
+        )
+        .subquery("payloads")
+    )
+
+    rows = db.execute(select(payloads.c.payload, func.pg_notify(CHANNEL, payloads.c.payload))).all()
+    return [row.payload for row in rows]
+
+
+class AlertStream:
+    """
+    Fans out the alert change notifications to the clients streaming them.
+
+    Each process holds a single connection that LISTENs on the channel, which is opened when the first client
+    subscribes. Every notification is put in the queue of each subscriber of the alert's queue (and its previous queue)
+    as well as the subscribers of every queue. A subscriber that falls too far behind has its queue replaced with a
+    RESET instead of holding on to an unbounded number of changes.
+
+    If the listening connection is lost, every subscriber is reset and the connection is reopened in the background,
+    waiting twice as long after each failed attempt up to the maximum delay. The subscribers are reset again once it is
+    back since any changes made while it was down were missed.
+    """
+
+    def __init__(self, dsn: str, queue_size: int = 1000, reconnect_delay: float = 1, max_reconnect_delay: float = 60):
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        # Maps the alert queue value (or None for every alert queue) to the queues of its subscribers
+        self._subscribers: Dict[Optional[str], Set[asyncio.Queue]] = defaultdict(set)
+
+        self._connection: Optional[asyncpg.Connection] = None
+        self._connecting: Optional[asyncio.Future] = None
+        self._reconnecting: Optional[asyncio.Future] = None
+
+    async def listen(self):
+        """Opens the connection that listens for the alert changes if it is not already open."""
+
+        if self._connection is not None and not self._connection.is_closed():
+            return
+
+        # Concurrent callers wait on the same connection attempt
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+
+        try:
+            await asyncio.shield(self._connecting)
+        finally:
+            if self._connecting is not None and self._connecting.done():
+                self._connecting = None
+
+    async def stop(self):
+        """Closes the listening connection."""
+
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+            self._reconnecting = None
+
+        if self._connection is not None and not self._connection.is_closed():
+            # Closing the connection on purpose does not need to reset the subscribers or reconnect
+            self._connection.remove_termination_listener(self._on_termination)
+            await self._connection.close()
+
+        self._connection = None
+
+    def subscribe(self, queue: Optional[str] = None) -> asyncio.Queue:
+        """Returns a new queue that receives the changes to the alerts in the given alert queue (or every alert queue
+        if None)."""
+
+        subscription: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[queue].add(subscription)
+        return subscription
+
+    def unsubscribe(self, queue: Optional[str], subscription: asyncio.Queue):
+        """Stops sending changes to the given subscription."""
+
+        self._subscribers[queue].discard(subscription)
+        if not self._subscribers[queue]:
+            del self._subscribers[queue]
+
+    def publish(self, payload: str):
+        """Puts the given change in the queue of every matching subscriber."""
+
+        change = json.loads(payload)
+        for queue in {None, change.get("queue"), change.get("previous_queue")}:
+            for subscription in self._subscribers.get(queue, ()):
+                try:
+                    subscription.put_nowait(payload)
+                except asyncio.QueueFull:
+                    self._reset(subscription)
+
+    def stats(self) -> dict:
+        """Returns the number of subscribers and whether or not the listening connection is open."""
+
+        return {
+            "listening": self._connection is not None and not self._connection.is_closed(),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+    async def _connect(self):
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(CHANNEL, self._on_notification)
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str):
+        self.publish(payload)
+
+    def _on_termination(self, connection: asyncpg.Connection):
+        # Any changes made while the connection was down are lost, so every subscriber has to catch up
+        logger.warning("The connection listening for alert changes was closed")
+        self._connection = None
+        self._reset_subscribers()
+
+        if self._reconnecting is None:
+            self._reconnecting = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        # There is no need to keep trying once every client is gone since the next one to subscribe opens the connection
+        delay = self.reconnect_delay
+        try:
+            while self._subscribers:
+                await asyncio.sleep(delay)
+                try:
+                    await self.listen()
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+                    logger.warning("Unable to reconnect to listen for alert changes: %s", e)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+                else:
+                    self._reset_subscribers()
+                    return
+        finally:
+            self._reconnecting = None
+
+    def _reset_subscribers(self):
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                self._reset(subscription)
+
+    @staticmethod
+    def _reset(subscription: asyncio.Queue):
+        while not subscription.empty():
+            subscription.get_nowait()
+
+        subscription.put_nowait(RESET)
+
+
+alert_stream = AlertStream(dsn=database_url)
@@ -1,13 +1,32 @@
+import base64
+import binascii
+import json
+
 from fastapi import HTTPException, status
-from pydantic import BaseModel
-from sqlalchemy import delete as sql_delete, select, update as sql_update
+from pydantic import BaseModel, parse_obj_as, ValidationError
+from sqlalchemy import bindparam, delete as sql_delete, insert, select, Table, tuple_, update as sql_update
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as PG_UUID
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.decl_api import DeclarativeMeta
 from sqlalchemy.orm.exc import NoResultFound
-from typing import List, Union
+from sqlalchemy.sql.expression import ColumnElement, Select
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
 from uuid import UUID
 
+from db.crud.alert_dedup import read_duplicate_alert  # noqa: F401
+from db.crud.analysis_claims import claim_observable_instances, delete_analysis_claim  # noqa: F401
+from db.crud.analysis_results import read_reusable_analysis_uuid  # noqa: F401
+from db.crud.eager_load import eager_load_options
+from db.crud.lookup_cache import lookup_cache
+from db.crud.lookup_snapshots import lookup_snapshots
+from db.crud.node_cache import node_cache
+from db.crud.observable_stats import (  # noqa: F401
+    refresh_observable_malicious_counts,
+    update_observable_dispositions,
+    update_observable_sightings,
+)
+from db.schemas.analysis_module_type import AnalysisModuleType
 from db.schemas.observable import Observable
 from db.schemas.observable_type import ObservableType
 from db.schemas.user import User
@@ -24,26 +43,222 @@ def create(obj: BaseModel, db_table: DeclarativeMeta, db: Session) -> UUID:
 
     new_obj = db_table(**obj.dict())
     db.add(new_obj)
-    commit(db)
+    commit(db, invalidate=db_table)
     return new_obj.uuid
 
 
+def create_many(rows: List[dict], db_table: Union[DeclarativeMeta, Table], db: Session):
+    """Inserts the given rows into the given database table (or mapping table) using a single multi-row INSERT.
+    The session is not committed. Designed to be called only by the API since it raises an HTTPException."""
+
+    # Return without performing a database query if there are no rows to insert
+    if not rows:
+        return
+
+    # Mapped classes need to use their underlying table so that the INSERT bypasses the ORM unit of work.
+    table = getattr(db_table, "__table__", db_table)
+
+    # The rows are rendered into the VALUES clause of the statement itself. Passing them as a list of parameters would
+    # cause an executemany instead, which both drivers send to the database one row at a time. Only very large lists
+    # are split into several statements since PostgreSQL allows at most 32767 bound parameters per statement.
+    batch_size = max(32767 // len(rows[0]), 1)
+    try:
+        for i in range(0, len(rows), batch_size):
+            db.execute(insert(table).values(rows[i:i + batch_size]))
+    except IntegrityError as e:
+        rollback(db)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Got an IntegrityError while inserting into the {table} table: {e}",
+        )
+
+
+def read_or_create_observable(type: str, value: str, db: Session) -> UUID:
+    """Returns the UUID of the Observable with the given type and value, creating it if it does not exist.
+    Designed to be called only by the API since it raises an HTTPException."""
+
+    return read_or_create_observables(observables=[(type, value)], db=db)[(type, value)]
+
+
+def read_or_create_observables(observables: List[Tuple[str, str]], db: Session) -> Dict[Tuple[str, str], UUID]:
+    """Returns a dictionary that maps each of the given (type, value) pairs to the UUID of its Observable. Any of the
+    observables that do not already exist are created. Designed to be called only by the API since it raises
+    an HTTPException.
+
+    Rather than reading the observables and then creating the missing ones (which races with any other request that
+    creates the same observable in between), the observables are upserted with INSERT ... ON CONFLICT DO NOTHING on
+    the type/value unique constraint. The rows that were inserted are combined with the ones that already existed in
+    the same statement."""
+
+    # Return without performing a database query if the list of observables is empty
+    if not observables:
+        return {}
+
+    # Only search the database for unique observables. They are also sorted so that concurrent requests inserting
+    # some of the same observables lock their unique index entries in the same order instead of deadlocking.
+    observables = sorted(set(observables))
+
+    # Make sure all of the observable types actually exist
+    db_types = read_by_values(values=[o[0] for o in observables], db_table=ObservableType, db=db)
+    type_uuids = {t.value: t.uuid for t in db_types}
+    type_values = {t.uuid: t.value for t in db_types}
+
+    table = Observable.__table__
+    pairs = [(type_uuids[t], v) for t, v in observables]
+    columns = [table.c.uuid, table.c.type_uuid, table.c.value]
+
+    inserted = (
+        pg_insert(table)
+        .values([{"type_uuid": t, "value": v} for t, v in pairs])
+        .on_conflict_do_nothing(constraint="type_value_uc")
+        .returning(*columns)
+        .cte("inserted")
+    )
+    existing = select(*columns).where(tuple_(table.c.type_uuid, table.c.value).in_(pairs))
+
+    rows = db.execute(select(inserted.c.uuid, inserted.c.type_uuid, inserted.c.value).union_all(existing)).all()
+    results = {(type_values[t], v): uuid for uuid, t, v in rows}
+
+    # An observable that another transaction committed after this statement started is neither inserted nor visible
+    # to it, so any that are missing are read again with a new statement that can see them.
+    missing = [(type_uuids[t], v) for t, v in observables if (t, v) not in results]
+    if missing:
+        rows = db.execute(select(*columns).where(tuple_(table.c.type_uuid, table.c.value).in_(missing))).all()
+        results.update({(type_values[t], v): uuid for uuid, t, v in rows})
+
+    return results
+
+
 #
 # READ
 #
 
 
-def read_all(db_table: DeclarativeMeta, db: Session) -> List:
-    """Returns all objects from the given database table."""
+def read_all(db_table: DeclarativeMeta, db: Session, response_model: Optional[Type[BaseModel]] = None) -> List:
+    """Returns all objects from the given database table. If a response model is given, the relationships it uses
+    are eagerly loaded."""
 
-    return db.execute(select(db_table)).scalars().all()
+    query = select(db_table)
+    if response_model:
+        query = query.options(*eager_load_options(model=response_model, db_table=db_table))
 
+    return db.execute(query).scalars().all()
 
-def read(uuid: UUID, db_table: DeclarativeMeta, db: Session):
-    """Returns the single object with the given UUID if it exists, otherwise returns None.
+
+def read_all_page(
+    db_table: DeclarativeMeta,
+    db: Session,
+    limit: int,
+    cursor: Optional[str],
+    response_model: Optional[Type[BaseModel]] = None,
+) -> Tuple[List, Optional[str]]:
+    """Returns a page of objects from the given database table ordered by their UUIDs along with the cursor that points
+    to the next page. If a response model is given, the relationships it uses are eagerly loaded.
     Designed to be called only by the API since it raises an HTTPException."""
 
-    result = db.execute(select(db_table).where(db_table.uuid == uuid)).scalars().one_or_none()
+    query = select(db_table)
+    if response_model:
+        query = query.options(*eager_load_options(model=response_model, db_table=db_table))
+
+    return read_page(statement=query, keys=[db_table.uuid], limit=limit, cursor=cursor, db=db, descending=False)
+
+
+def stream_all(
+    db_table: DeclarativeMeta,
+    db: Session,
+    response_model: Optional[Type[BaseModel]] = None,
+    batch_size: int = 1000,
+) -> Iterator:
+    """Yields every object from the given database table. The rows are read through a server-side cursor batch_size
+    rows at a time, so the memory used does not grow with the size of the table. If a response model is given, the
+    relationships it uses are eagerly loaded for each batch."""
+
+    query = select(db_table).order_by(db_table.uuid).execution_options(yield_per=batch_size)
+    if response_model:
+        query = query.options(*eager_load_options(model=response_model, db_table=db_table))
+
+    yield from db.execute(query).scalars()
+
+
+def read_page(
+    statement: Select,
+    keys: List[ColumnElement],
+    limit: int,
+    cursor: Optional[str],
+    db: Session,
+    descending: bool = True,
+) -> Tuple[List, Optional[str]]:
+    """Returns a page of objects from the given statement using keyset (cursor) pagination along with the cursor that
+    points to the next page (or None if this is the last page).
+
+    The keys are the non-NULL columns used to order the results. The last key must be unique (such as the UUID) so that
+    every row has a distinct position. Instead of using an OFFSET, which needs to scan and discard every row before the
+    page, the cursor holds the keys of the last row on the previous page. This lets the database seek directly to the
+    next page using an index on the keys, so fetching any page costs the same no matter how deep it is.
+
+    Designed to be called only by the API since it raises an HTTPException."""
+
+    if cursor:
+        values = _decode_cursor(cursor, len(keys))
+        after = tuple_(*[bindparam(None, _cursor_value(v, k, cursor), type_=k.type) for k, v in zip(keys, values)])
+        statement = statement.where(tuple_(*keys) < after if descending else tuple_(*keys) > after)
+
+    # Select one extra row to know whether or not there is another page after this one. The keys are added to the
+    # selected columns so that the cursor can be built even when a key is an expression instead of a column.
+    statement = statement.add_columns(*keys).order_by(*[k.desc() if descending else k.asc() for k in keys])
+    rows = db.execute(statement.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(list(rows[-1][1:]))
+
+    return [row[0] for row in rows], next_cursor
+
+
+def _encode_cursor(values: list) -> str:
+    """Encodes the given key values into an opaque cursor string."""
+
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, length: int) -> list:
+    """Decodes the given cursor string into its key values. Designed to be called only by the API since it
+    raises an HTTPException."""
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != length:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"The cursor {cursor} is invalid")
+
+    return values
+
+
+def _cursor_value(value, key: ColumnElement, cursor: str):
+    """Converts a value decoded from a cursor into the Python type of its key. The cursor only holds JSON strings and
+    numbers, and unlike psycopg2, asyncpg does not accept strings for timestamp or UUID parameters. Designed to be
+    called only by the API since it raises an HTTPException."""
+
+    try:
+        python_type = UUID if isinstance(key.type, PG_UUID) else key.type.python_type
+        return parse_obj_as(python_type, value)
+    except (NotImplementedError, ValidationError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"The cursor {cursor} is invalid")
+
+
+def read(uuid: UUID, db_table: DeclarativeMeta, db: Session, response_model: Optional[Type[BaseModel]] = None):
+    """Returns the single object with the given UUID if it exists, otherwise returns None. If a response model is
+    given, the relationships it uses are eagerly loaded.
+    Designed to be called only by the API since it raises an HTTPException."""
+
+    query = select(db_table).where(db_table.uuid == uuid)
+    if response_model:
+        query = query.options(*eager_load_options(model=response_model, db_table=db_table))
+
+    result = db.execute(query).scalars().one_or_none()
 
     if result is None:
         raise HTTPException(status_code=404, detail=f"UUID {uuid} does not exist.")
@@ -74,6 +289,21 @@ def read_by_uuids(uuids: List[UUID], db_table: DeclarativeMeta, db: Session):
     return resources
 
 
+def read_analysis_module_type(value: str, version: str, db: Session) -> AnalysisModuleType:
+    """Returns the AnalysisModuleType with the given value and version if it exists. Designed to be called only
+    by the API since it raises an HTTPException."""
+
+    try:
+        return db.execute(
+            select(AnalysisModuleType).where(AnalysisModuleType.value == value, AnalysisModuleType.version == version)
+        ).scalars().one()
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"The analysis module type {value} version {version} does not exist",
+        )
+
+
 def read_observable(type: str, value: str, db: Session) -> Union[Observable, None]:
     """Returns the Observable with the given type and value if it exists."""
 
@@ -103,29 +333,29 @@ def read_by_value(value: str, db_table: DeclarativeMeta, db: Session):
     if not value:
         return None
 
-    try:
-        return db.execute(select(db_table).where(db_table.value == value)).scalars().one()
-    # MultipleResultsFound exception is not caught since each database table that has a
-    # value column should be configured to have that column be unique.
-    except NoResultFound:
-        raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"The {value} {db_table} does not exist",
-            )
+    return read_by_values(values=[value], db_table=db_table, db=db)[0]
 
 
 def read_by_values(values: List[str], db_table: DeclarativeMeta, db: Session):
-    """Returns a list of objects from the given database table with the given values.
+    """Returns a list of objects from the given database table with the given values. The objects are read from the
+    lookup cache if possible, and only the values that are not cached are read from the database.
     Designed to be called only by the API since it raises an HTTPException."""
 
     # Return without performing a database query if the list of values is empty or None
     if not values:
         return []
 
-    # Only search the database for unique values
+    # Only search the cache and database for unique values
     values = list(set(values))
 
-    resources = db.execute(select(db_table).where(db_table.value.in_(values))).scalars().all()
+    resources, missing = lookup_cache.get_many(values=values, db_table=db_table, db=db)
+
+    if missing:
+        # MultipleResultsFound is not a concern since each database table that has a value column
+        # should be configured to have that column be unique.
+        db_resources = db.execute(select(db_table).where(db_table.value.in_(missing))).scalars().all()
+        lookup_cache.set_many(objs=db_resources, db_table=db_table)
+        resources += db_resources
 
     for value in values:
         if not any(value == r.value for r in resources):
@@ -162,11 +392,11 @@ def update(uuid: UUID, obj: BaseModel, db_table: DeclarativeMeta, db: Session):
         if result.rowcount != 1:
             raise HTTPException(status_code=404, detail=f"UUID {uuid} does not exist.")
 
-        commit(db)
+        commit(db, invalidate=db_table)
 
     # An IntegrityError will happen if value already exists or was set to None
     except IntegrityError:
-        db.rollback()
+        rollback(db)
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Got an IntegrityError while updating UUID {uuid}.",
@@ -198,7 +428,7 @@ def delete(uuid: UUID, db_table: DeclarativeMeta, db: Session):
             detail=f"Unable to delete {db_table} UUID {uuid} due to a foreign key constraint.",
         )
 
-    commit(db)
+    commit(db, invalidate=db_table)
 
 
 #
@@ -206,12 +436,51 @@ def delete(uuid: UUID, db_table: DeclarativeMeta, db: Session):
 #
 
 
-def commit(db: Session):
+def commit(db: Session, invalidate: Optional[DeclarativeMeta] = None):
+    """Commits the database session. If a table is given, its cached rows are invalidated once the commit succeeds,
+    which any route that changes the rows of a cached table has to do. Designed to be called only by the API since it
+    raises an HTTPException."""
+
     try:
         db.commit()
     except IntegrityError as e:
-        db.rollback()
+        rollback(db)
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Got an IntegrityError while committing the database session: {e}",
         )
+
+    if invalidate is not None:
+        invalidate_caches(invalidate)
+
+
+def flush(db: Session):
+    """Writes the pending changes of the database session without committing them. Designed to be called only by the API
+    since it raises an HTTPException."""
+
+    try:
+        db.flush()
+    except IntegrityError as e:
+        rollback(db)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Got an IntegrityError while flushing the database session: {e}",
+        )
+
+
+def invalidate_caches(db_table: DeclarativeMeta):
+    """Removes the cached rows of the given table from the lookup cache. The lookup list snapshots and the cached Node
+    responses are cleared as well since they could contain the rows that changed, such as an alert's queue or owner."""
+
+    lookup_cache.invalidate(db_table)
+    lookup_snapshots.clear()
+    node_cache.clear()
+
+
+def rollback(db: Session):
+    """Rolls back the database session. The lookup cache and snapshots are cleared since they could contain rows that
+    were read inside of the transaction that was rolled back."""
+
+    db.rollback()
+    lookup_cache.clear()
+    lookup_snapshots.clear()
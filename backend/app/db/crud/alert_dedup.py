@@ -0,0 +1,39 @@
+from datetime import timedelta
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from typing import Optional
+from uuid import UUID
+
+from db.schemas.alert import Alert
+
+
+def read_duplicate_alert(
+    fingerprint: str, type_uuid: UUID, tool_uuid: Optional[UUID], window: int, db: Session
+) -> Optional[Row]:
+    """Returns the (uuid, analysis_uuid) of the most recent open alert with the given fingerprint, type, and tool that
+    was created within the last window seconds, if there is one. Alerts that were already dispositioned are never
+    returned so that new activity is not hidden inside of an alert the analysts are done with.
+
+    A transaction-level advisory lock on the fingerprint is taken first so that concurrent requests creating the same
+    alert wait on each other instead of both creating a new alert. The lock is held until the caller commits, so the
+    caller must commit (or roll back) as soon as it has created or merged the alert."""
+
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtext(fingerprint))))
+
+    alert = Alert.__table__
+
+    # The creation times are compared to the statement time instead of now() since now() is frozen at the start of the
+    # transaction, which could be well before the lock was acquired.
+    return db.execute(
+        select(alert.c.uuid, alert.c.analysis_uuid)
+        .where(
+            alert.c.fingerprint == fingerprint,
+            alert.c.insert_time >= func.statement_timestamp() - timedelta(seconds=window),
+            alert.c.type_uuid == type_uuid,
+            alert.c.tool_uuid.isnot_distinct_from(tool_uuid),
+            alert.c.disposition_uuid.is_(None),
+        )
+        .order_by(alert.c.insert_time.desc())
+        .limit(1)
+    ).one_or_none()
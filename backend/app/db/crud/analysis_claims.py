@@ -0,0 +1,123 @@
+from datetime import timedelta
+from sqlalchemy import delete, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from typing import List
+from uuid import UUID
+
+from db.schemas.analysis import Analysis
+from db.schemas.analysis_claim import AnalysisClaim
+from db.schemas.analysis_module_type import AnalysisModuleType
+from db.schemas.node_directive_mapping import node_directive_mapping
+from db.schemas.node_tag_mapping import node_tag_mapping
+from db.schemas.observable import Observable
+from db.schemas.observable_instance import ObservableInstance
+from db.schemas.observable_instance_analysis_mapping import observable_instance_analysis_mapping
+from db.schemas.observable_type import ObservableType
+
+
+def claim_observable_instances(
+    analysis_module_type: AnalysisModuleType, limit: int, lease_seconds: int, db: Session
+) -> List[Row]:
+    """Claims up to the given number of observable instances that the analysis module type can analyze but has not yet
+    analyzed, and that no other worker holds an unexpired claim on. Returns the (observable_instance_uuid, alert_uuid,
+    type, value, expires_on) rows of the claimed observable instances, oldest first.
+
+    The candidates are locked with SKIP LOCKED so that concurrent workers never wait on each other and never claim the
+    same observable instance. The claims must be committed by the caller."""
+
+    claim, instance, observable = AnalysisClaim.__table__, ObservableInstance.__table__, Observable.__table__
+
+    candidates = select(instance.c.uuid).select_from(instance.join(observable))
+
+    # An empty list of observable types means the analysis module type can analyze every type
+    if analysis_module_type.observable_types:
+        candidates = candidates.where(
+            observable.c.type_uuid.in_([t.uuid for t in analysis_module_type.observable_types])
+        )
+
+    for directive in analysis_module_type.required_directives:
+        candidates = candidates.where(
+            exists().where(
+                (node_directive_mapping.c.node_uuid == instance.c.uuid)
+                & (node_directive_mapping.c.directive_uuid == directive.uuid)
+            )
+        )
+
+    for tag in analysis_module_type.required_tags:
+        candidates = candidates.where(
+            exists().where(
+                (node_tag_mapping.c.node_uuid == instance.c.uuid) & (node_tag_mapping.c.tag_uuid == tag.uuid)
+            )
+        )
+
+    # Skip the observable instances the analysis module type already analyzed or another worker is analyzing. The
+    # leases are compared to the statement time instead of now() since now() is frozen at the start of the transaction.
+    analyzed = (
+        select(literal(1))
+        .select_from(observable_instance_analysis_mapping.join(Analysis.__table__))
+        .where(
+            (observable_instance_analysis_mapping.c.observable_instance_uuid == instance.c.uuid)
+            & (Analysis.__table__.c.analysis_module_type_uuid == analysis_module_type.uuid)
+        )
+        .exists()
+    )
+    claimed = exists().where(
+        (claim.c.observable_instance_uuid == instance.c.uuid)
+        & (claim.c.analysis_module_type_uuid == analysis_module_type.uuid)
+        & (claim.c.expires_on > func.statement_timestamp())
+    )
+
+    # FOR NO KEY UPDATE is enough to keep other workers from claiming the same rows, and unlike FOR UPDATE it does not
+    # block inserting rows that reference the observable instances (such as the claims themselves).
+    candidates = (
+        candidates.where(~analyzed & ~claimed)
+        .order_by(instance.c.time, instance.c.uuid)
+        .limit(limit)
+        .with_for_update(skip_locked=True, key_share=True, of=instance)
+        .cte("candidate")
+    )
+
+    # A claim row left behind by an expired lease is taken over. The WHERE clause keeps a claim that another worker
+    # committed after this statement started from being taken over before it expires.
+    insert = pg_insert(claim).from_select(
+        ["observable_instance_uuid", "analysis_module_type_uuid", "expires_on"],
+        select(
+            candidates.c.uuid,
+            literal(analysis_module_type.uuid, claim.c.analysis_module_type_uuid.type),
+            func.statement_timestamp() + timedelta(seconds=lease_seconds),
+        ),
+    )
+    inserted = insert.on_conflict_do_update(
+        index_elements=[claim.c.observable_instance_uuid, claim.c.analysis_module_type_uuid],
+        set_={"expires_on": insert.excluded.expires_on},
+        where=claim.c.expires_on <= func.statement_timestamp(),
+    ).returning(claim.c.observable_instance_uuid, claim.c.expires_on).cte("inserted")
+
+    return db.execute(
+        select(
+            inserted.c.observable_instance_uuid,
+            instance.c.alert_uuid,
+            ObservableType.__table__.c.value.label("type"),
+            observable.c.value,
+            inserted.c.expires_on,
+        )
+        .select_from(
+            inserted.join(instance, instance.c.uuid == inserted.c.observable_instance_uuid)
+            .join(observable)
+            .join(ObservableType.__table__)
+        )
+        .order_by(instance.c.time, instance.c.uuid)
+    ).all()
+
+
+def delete_analysis_claim(observable_instance_uuid: UUID, analysis_module_type_uuid: UUID, db: Session):
+    """Releases the claim on the observable instance for the analysis module type if there is one."""
+
+    db.execute(
+        delete(AnalysisClaim).where(
+            AnalysisClaim.observable_instance_uuid == observable_instance_uuid,
+            AnalysisClaim.analysis_module_type_uuid == analysis_module_type_uuid,
+        )
+    )
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Optional
+from uuid import UUID
+
+from db.schemas.analysis import Analysis
+from db.schemas.analysis_module_type import AnalysisModuleType
+from db.schemas.observable_instance import ObservableInstance
+from db.schemas.observable_instance_analysis_mapping import observable_instance_analysis_mapping
+
+
+def read_reusable_analysis_uuid(
+    observable_uuid: UUID, analysis_module_type_uuid: UUID, max_age: int, db: Session
+) -> Optional[UUID]:
+    """Returns the UUID of the most recent analysis the analysis module type performed on any instance of the
+    observable within the last max_age seconds, if there is one that can be reused.
+
+    An analysis is only reused if it did not fail and the analysis module type still has the extended version it had
+    when the analysis was performed. A different version of the analysis module type is a different row, so results
+    from other versions are never reused."""
+
+    if max_age <= 0:
+        return None
+
+    analysis, instance, module_type = Analysis.__table__, ObservableInstance.__table__, AnalysisModuleType.__table__
+
+    return db.execute(
+        select(analysis.c.uuid)
+        .select_from(
+            analysis.join(
+                observable_instance_analysis_mapping,
+                observable_instance_analysis_mapping.c.analysis_uuid == analysis.c.uuid,
+            )
+            .join(instance, instance.c.uuid == observable_instance_analysis_mapping.c.observable_instance_uuid)
+            .join(module_type, module_type.c.uuid == analysis.c.analysis_module_type_uuid)
+        )
+        .where(
+            instance.c.observable_uuid == observable_uuid,
+            analysis.c.analysis_module_type_uuid == analysis_module_type_uuid,
+            analysis.c.error_message.is_(None),
+            analysis.c.extended_version.isnot_distinct_from(module_type.c.extended_version),
+            analysis.c.insert_time >= func.statement_timestamp() - timedelta(seconds=max_age),
+        )
+        .order_by(analysis.c.insert_time.desc())
+        .limit(1)
+    ).scalar()
@@ -0,0 +1,55 @@
+from functools import lru_cache
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.ext.associationproxy import AssociationProxy
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.decl_api import DeclarativeMeta
+from typing import FrozenSet, Optional, Tuple, Type
+
+
+@lru_cache()
+def eager_load_options(
+    model: Type[BaseModel], db_table: DeclarativeMeta, exclude: FrozenSet[str] = frozenset()
+) -> Tuple:
+    """Returns the loader options needed to read every relationship used by the given Pydantic model (and the models
+    nested inside of it) from the given database table without any lazy loads.
+
+    Each field of the model that matches a relationship is loaded with a selectinload if it is a list (one extra query
+    per relationship no matter how many objects are read) or a joinedload if it is a single object. Fields that match
+    an association proxy (such as the various *_uuids fields) load the relationship behind the proxy. The options are
+    cached since the models and database tables never change at runtime. Any field names given in exclude are skipped
+    at the top level, such as relationships the caller fills in on its own."""
+
+    return tuple(_options(model=model, db_table=db_table, exclude=exclude, parent=None))
+
+
+def _options(model: Type[BaseModel], db_table: DeclarativeMeta, exclude: FrozenSet[str], parent: Optional[object]):
+    mapper = inspect(db_table)
+    descriptors = mapper.all_orm_descriptors
+
+    for name, field in model.__fields__.items():
+        if name in exclude:
+            continue
+
+        # Association proxies only need the relationship behind them to be loaded
+        nested_model = field.type_ if isinstance(field.type_, type) and issubclass(field.type_, BaseModel) else None
+        if name in descriptors and isinstance(descriptors[name], AssociationProxy):
+            name = descriptors[name].target_collection
+            nested_model = None
+
+        if name not in mapper.relationships:
+            continue
+
+        relationship = mapper.relationships[name]
+        attribute = getattr(db_table, name)
+        if parent is None:
+            option = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        else:
+            option = parent.selectinload(attribute) if relationship.uselist else parent.joinedload(attribute)
+
+        yield option
+
+        if nested_model:
+            yield from _options(
+                model=nested_model, db_table=relationship.mapper.class_, exclude=frozenset(), parent=option
+            )
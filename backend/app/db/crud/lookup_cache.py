@@ -0,0 +1,97 @@
+import threading
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.decl_api import DeclarativeMeta
+from sqlalchemy.orm.session import make_transient_to_detached
+from typing import Dict, Iterable, List, Tuple
+
+from core.config import get_settings
+
+
+class LookupCache:
+    """
+    A process-local cache of the rows in the lookup tables (alert queues, node tags, observable types, etc.) keyed by
+    their value.
+
+    The lookup tables are tiny and rarely change, but nearly every create and update route needs to read several of
+    them. Only the column values of each row are cached (never the ORM objects themselves) so that a cached row can be
+    safely attached to whichever session asks for it without emitting a SELECT.
+
+    Entries expire after the TTL so that changes made by other processes are eventually picked up. Changes made by
+    this process invalidate the table right away. A TTL of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # Maps (table name, value) to (expiration time, column values)
+        self._entries: Dict[Tuple[str, str], Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, values: Iterable[str], db_table: DeclarativeMeta, db: Session) -> Tuple[List, List[str]]:
+        """Returns the cached objects (attached to the given session) for the given values along with a list of the
+        values that were not in the cache."""
+
+        found = []
+        missing = []
+        now = time.monotonic()
+
+        with self._lock:
+            for value in values:
+                entry = self._entries.get((db_table.__tablename__, value))
+                if entry and entry[0] > now:
+                    self.hits += 1
+                    found.append(entry[1])
+                else:
+                    self.misses += 1
+                    missing.append(value)
+
+        return [self._attach(columns, db_table, db) for columns in found], missing
+
+    def set_many(self, objs: Iterable, db_table: DeclarativeMeta):
+        """Adds the given objects that were read from the given database table to the cache."""
+
+        if self.ttl <= 0:
+            return
+
+        keys = [attr.key for attr in inspect(db_table).column_attrs]
+        expiration = time.monotonic() + self.ttl
+
+        with self._lock:
+            for obj in objs:
+                self._entries[(db_table.__tablename__, obj.value)] = (expiration, {k: getattr(obj, k) for k in keys})
+
+    def invalidate(self, db_table: DeclarativeMeta):
+        """Removes every cached row from the given database table."""
+
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == db_table.__tablename__]:
+                del self._entries[key]
+
+    def clear(self):
+        """Removes every cached row."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the number of cached rows."""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    @staticmethod
+    def _attach(columns: dict, db_table: DeclarativeMeta, db: Session):
+        """Builds an object from the cached column values and merges it into the session as if it had been loaded from
+        the database. If the session already contains the object, that instance is returned instead."""
+
+        obj = db_table(**columns)
+        make_transient_to_detached(obj)
+        return db.merge(obj, load=False)
+
+
+lookup_cache = LookupCache(ttl=get_settings().lookup_cache_ttl)
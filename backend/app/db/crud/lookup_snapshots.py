@@ -0,0 +1,77 @@
+import hashlib
+import threading
+import time
+
+from sqlalchemy.orm.decl_api import DeclarativeMeta
+from typing import Dict, Optional, Tuple
+
+from core.config import get_settings
+
+
+class LookupSnapshots:
+    """
+    A process-local cache of the serialized JSON responses of the lookup table list routes (alert queues, node tags,
+    observable types, etc.) along with their ETags.
+
+    The GUI reads every lookup list when it starts and on many page loads, but they only change when an administrator
+    edits them. The ETag is a hash of the response, so it is the same no matter which process built the snapshot and
+    browsers or proxies can revalidate their copies against any of them.
+
+    Any change to a lookup table made by this process clears every snapshot (a list can include rows from other lookup
+    tables, such as the observable types of an analysis module type). Snapshots expire after the TTL so that changes
+    made by other processes are eventually picked up. A TTL of 0 disables the snapshots.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # Incremented every time the snapshots are cleared so that a snapshot built from rows that were read before a
+        # change is not stored after the change cleared the snapshots
+        self.generation = 0
+
+        # Maps the table name to (expiration time, ETag, serialized response)
+        self._entries: Dict[str, Tuple[float, str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db_table: DeclarativeMeta) -> Optional[Tuple[str, bytes]]:
+        """Returns the ETag and serialized response of the given table's snapshot if there is one that has not
+        expired."""
+
+        with self._lock:
+            entry = self._entries.get(db_table.__tablename__)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1], entry[2]
+
+            self.misses += 1
+            return None
+
+    def set(self, db_table: DeclarativeMeta, body: bytes, generation: int) -> Tuple[str, bytes]:
+        """Stores the serialized response as the given table's snapshot unless the snapshots were cleared since the
+        given generation. Returns the ETag and serialized response."""
+
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+        with self._lock:
+            if self.ttl > 0 and generation == self.generation:
+                self._entries[db_table.__tablename__] = (time.monotonic() + self.ttl, etag, body)
+
+        return etag, body
+
+    def clear(self):
+        """Removes every snapshot."""
+
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the number of snapshots."""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+lookup_snapshots = LookupSnapshots(ttl=get_settings().lookup_cache_ttl)
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from core.config import get_settings
+
+
+class NodeCache:
+    """
+    A process-local LRU cache of the serialized JSON responses of the Node read routes.
+
+    Every change to a Node gives it a new version, so a response is cached using the Node's UUID and the versions it
+    depends on as the key. A cached response can never be returned for a newer version of the Node, and old versions
+    simply age out of the cache once it reaches its maximum size.
+
+    The responses also contain related objects that do not have a version, such as the alert queue or the owner. The
+    entries expire after the TTL so that changes made to those by other processes are eventually picked up (the same
+    as the lookup cache). Changes made by this process clear the cache right away. A size or TTL of 0 disables the
+    cache.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # Maps the key to (expiration time, serialized response) from the least to the most recently used
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Returns the cached response for the given key if there is one that has not expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, body: bytes):
+        """Adds the given response to the cache and evicts the least recently used one if the cache is full."""
+
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes every cached response."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the number of cached responses."""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+settings = get_settings()
+node_cache = NodeCache(max_size=settings.node_cache_size, ttl=settings.node_cache_ttl)
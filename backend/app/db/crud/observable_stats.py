@@ -0,0 +1,172 @@
+from datetime import datetime
+from sqlalchemy import cast, column, DateTime, distinct, exists, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from db.schemas.alert import Alert
+from db.schemas.alert_disposition import AlertDisposition
+from db.schemas.observable import Observable
+from db.schemas.observable_instance import ObservableInstance
+
+
+def update_observable_sightings(sightings: List[Tuple[UUID, Optional[UUID], datetime]], db: Session):
+    """Updates the sighting statistics of the observables for the given (observable_uuid, alert_uuid, time) sightings
+    using a single statement. Must be called before the observable instances for the sightings are inserted, since an
+    alert only counts towards an observable's alert counts the first time the observable appears in it."""
+
+    if not sightings:
+        return
+
+    alert, disposition, instance, observable = (
+        Alert.__table__,
+        AlertDisposition.__table__,
+        ObservableInstance.__table__,
+        Observable.__table__,
+    )
+
+    sighting_values = values(
+        column("observable_uuid", PG_UUID(as_uuid=True)),
+        column("alert_uuid", PG_UUID(as_uuid=True)),
+        column("time", DateTime(timezone=True)),
+        name="sighting_values",
+    ).data(sightings)
+
+    # PostgreSQL types a VALUES column that only contains NULLs as text, which happens when none of the sightings
+    # belong to an alert, so the alert column is cast before it is compared to the observable instances
+    sighting = select(
+        sighting_values.c.observable_uuid,
+        cast(sighting_values.c.alert_uuid, PG_UUID(as_uuid=True)).label("alert_uuid"),
+        sighting_values.c.time,
+    ).subquery("sighting")
+
+    # Collapse the sightings into one row per (observable, alert) and flag the alerts the observable is new to
+    pairs = (
+        select(
+            sighting.c.observable_uuid,
+            sighting.c.alert_uuid,
+            func.min(sighting.c.time).label("first_seen"),
+            func.max(sighting.c.time).label("last_seen"),
+            (
+                sighting.c.alert_uuid.isnot(None)
+                & ~exists().where(
+                    (instance.c.observable_uuid == sighting.c.observable_uuid)
+                    & (instance.c.alert_uuid == sighting.c.alert_uuid)
+                )
+            ).label("new_alert"),
+        )
+        .group_by(sighting.c.observable_uuid, sighting.c.alert_uuid)
+        .subquery("pairs")
+    )
+
+    # The alert is usually brand new and has no disposition, but an observable can also be added to an existing alert
+    totals = (
+        select(
+            pairs.c.observable_uuid,
+            func.min(pairs.c.first_seen).label("first_seen"),
+            func.max(pairs.c.last_seen).label("last_seen"),
+            func.count().filter(pairs.c.new_alert).label("alert_count"),
+            func.count().filter(pairs.c.new_alert & disposition.c.malicious).label("malicious_alert_count"),
+        )
+        .select_from(
+            pairs.outerjoin(alert, alert.c.uuid == pairs.c.alert_uuid).outerjoin(
+                disposition, disposition.c.uuid == alert.c.disposition_uuid
+            )
+        )
+        .group_by(pairs.c.observable_uuid)
+        .subquery("totals")
+    )
+
+    # LEAST and GREATEST ignore NULLs, so this also works for observables that have never been seen before
+    db.execute(
+        update(observable)
+        .where(observable.c.uuid == totals.c.observable_uuid)
+        .values(
+            alert_count=observable.c.alert_count + totals.c.alert_count,
+            first_seen=func.least(observable.c.first_seen, totals.c.first_seen),
+            last_seen=func.greatest(observable.c.last_seen, totals.c.last_seen),
+            malicious_alert_count=observable.c.malicious_alert_count + totals.c.malicious_alert_count,
+        )
+    )
+
+
+def update_observable_dispositions(changes: List[Tuple[UUID, Optional[UUID], Optional[UUID]]], db: Session):
+    """Updates the malicious alert counts of the observables in the alerts whose dispositions changed. Each change is
+    an (alert_uuid, previous disposition_uuid, new disposition_uuid) tuple."""
+
+    malicious = {}
+    disposition_uuids = {d for _, old, new in changes for d in (old, new) if d}
+    if disposition_uuids:
+        malicious = dict(
+            db.execute(
+                select(AlertDisposition.uuid, AlertDisposition.malicious).where(
+                    AlertDisposition.uuid.in_(disposition_uuids)
+                )
+            ).all()
+        )
+
+    # Only the alerts that became malicious or stopped being malicious change the counts
+    added = [a for a, old, new in changes if malicious.get(new, False) and not malicious.get(old, False)]
+    removed = [a for a, old, new in changes if malicious.get(old, False) and not malicious.get(new, False)]
+    if not added and not removed:
+        return
+
+    instance, observable = ObservableInstance.__table__, Observable.__table__
+    deltas = (
+        select(
+            instance.c.observable_uuid,
+            (
+                func.count(distinct(instance.c.alert_uuid)).filter(instance.c.alert_uuid.in_(added))
+                - func.count(distinct(instance.c.alert_uuid)).filter(instance.c.alert_uuid.in_(removed))
+            ).label("delta"),
+        )
+        .where(instance.c.alert_uuid.in_(added + removed))
+        .group_by(instance.c.observable_uuid)
+        .subquery("deltas")
+    )
+
+    db.execute(
+        update(observable)
+        .where(observable.c.uuid == deltas.c.observable_uuid)
+        .values(malicious_alert_count=observable.c.malicious_alert_count + deltas.c.delta)
+    )
+
+
+def refresh_observable_malicious_counts(disposition_uuid: UUID, db: Session):
+    """Recounts the malicious alerts of every observable in an alert with the given disposition. Used when whether or
+    not the disposition is malicious changes, which is rare enough that recounting is simpler than a delta."""
+
+    alert, disposition, instance, observable = (
+        Alert.__table__,
+        AlertDisposition.__table__,
+        ObservableInstance.__table__,
+        Observable.__table__,
+    )
+
+    affected = (
+        select(instance.c.observable_uuid)
+        .join(alert, alert.c.uuid == instance.c.alert_uuid)
+        .where(alert.c.disposition_uuid == disposition_uuid)
+    )
+
+    counts = (
+        select(
+            instance.c.observable_uuid,
+            func.count(distinct(instance.c.alert_uuid)).filter(disposition.c.malicious).label("malicious_alert_count"),
+        )
+        .select_from(
+            instance.join(alert, alert.c.uuid == instance.c.alert_uuid).outerjoin(
+                disposition, disposition.c.uuid == alert.c.disposition_uuid
+            )
+        )
+        .where(instance.c.observable_uuid.in_(affected))
+        .group_by(instance.c.observable_uuid)
+        .subquery("counts")
+    )
+
+    db.execute(
+        update(observable)
+        .where(observable.c.uuid == counts.c.observable_uuid)
+        .values(malicious_alert_count=counts.c.malicious_alert_count)
+    )
@@ -1,18 +1,58 @@
 import os
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from core.config import get_settings
+from db.pool_metrics import PoolMetrics
 
-database_url = get_settings().database_url
+settings = get_settings()
+
+database_url = settings.database_url
 if "TESTING" in os.environ and os.environ["TESTING"]:
     database_url = f"{database_url}_test"
 
-engine = create_engine(database_url)
+pool_options = {
+    "max_overflow": settings.database_max_overflow,
+    "pool_pre_ping": settings.database_pool_pre_ping,
+    "pool_recycle": settings.database_pool_recycle,
+    "pool_size": settings.database_pool_size,
+    "pool_timeout": settings.database_pool_timeout,
+}
+
+# The statement timeout is set on every new connection. Each driver has its own way of passing server settings.
+connect_args = {}
+async_connect_args = {}
+if settings.database_statement_timeout:
+    connect_args["options"] = f"-c statement_timeout={settings.database_statement_timeout}"
+    async_connect_args["server_settings"] = {"statement_timeout": str(settings.database_statement_timeout)}
+
+pool_metrics = PoolMetrics()
+engine = create_engine(
+    database_url,
+    connect_args=connect_args,
+    poolclass=pool_metrics.instrument_pool_class(QueuePool),
+    **pool_options,
+)
+pool_metrics.listen(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async engine connects to the same database using the asyncpg driver. Routes that use it wait on the database
+# inside of the event loop instead of tying up a threadpool thread for the entire request.
+async_pool_metrics = PoolMetrics()
+async_engine = create_async_engine(
+    make_url(database_url).set(drivername="postgresql+asyncpg"),
+    connect_args=async_connect_args,
+    poolclass=async_pool_metrics.instrument_pool_class(AsyncAdaptedQueuePool),
+    **pool_options,
+)
+async_pool_metrics.listen(async_engine.sync_engine)
+AsyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession)
+
 Base = declarative_base()
 
 
@@ -22,3 +62,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,295 @@
+import logging
+import queue
+import threading
+import time
+
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+from typing import Dict, List, Optional, Union
+from uuid import UUID
+
+from core.config import get_settings
+from db.database import Base, engine
+from db.schemas.node import Node
+from db.schemas.node_history import NodeHistory
+from db.schemas.node_history_action import NodeHistoryAction
+
+
+logger = logging.getLogger(__name__)
+
+
+class NodeHistoryWriter:
+    """
+    Writes the NodeHistory records created by committed transactions to the database from a background thread.
+
+    The records are queued when a transaction commits and are written using one multi-row INSERT per batch, so
+    auditing a change does not add any database work to the request that made it. A batch is written once it is full
+    or once its oldest record has waited for the flush interval.
+
+    The writer only runs in the background when it is bound to an Engine. When it is bound to a single Connection
+    (such as the one used by the tests), the queued records are only written when the flush method is called.
+    """
+
+    def __init__(self, bind: Union[Connection, Engine], batch_size: int, flush_interval: float):
+        self.bind = bind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.failed = 0
+        self.written = 0
+
+        # Maps the value of each NodeHistoryAction to its UUID
+        self._action_uuids: Dict[str, UUID] = {}
+        self._queue: "queue.Queue[dict]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+
+    def enqueue(self, records: List[dict]):
+        """Adds the given records to the queue to be written."""
+
+        for record in records:
+            self._queue.put(record)
+
+    def start(self):
+        """Starts the background thread if the writer is bound to an Engine and it is not already running."""
+
+        if isinstance(self.bind, Connection) or (self._thread and self._thread.is_alive()):
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="node-history-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background thread and writes any records that are still queued."""
+
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+        self.flush()
+
+    def flush(self):
+        """Writes every queued record on the calling thread."""
+
+        while True:
+            batch = self._take(self.batch_size)
+            if not batch:
+                return
+
+            self._write(batch)
+
+    def clear(self):
+        """Discards every queued record along with the cached NodeHistoryAction UUIDs."""
+
+        self._take(self._queue.qsize())
+        self._action_uuids.clear()
+
+    def stats(self) -> dict:
+        """Returns the number of records that are queued, written, and that failed to be written."""
+
+        return {"queued": self._queue.qsize(), "written": self.written, "failed": self.failed}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            # Give the batch until the flush interval to fill up so that busy periods are written in fewer INSERTs
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stop.is_set():
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("Unable to write %d node history records", len(batch))
+
+    def _take(self, count: int) -> List[dict]:
+        records = []
+        while len(records) < count:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return records
+
+    def _write(self, records: List[dict]):
+        with self._write_lock:
+            try:
+                if isinstance(self.bind, Connection):
+                    self._insert(self.bind, records)
+                else:
+                    with self.bind.begin() as connection:
+                        self._insert(connection, records)
+            except Exception:
+                # A cached action could have been deleted, so they are looked up again by the next batch
+                self._action_uuids.clear()
+                self.failed += len(records)
+                raise
+
+            self.written += len(records)
+
+    def _insert(self, connection: Connection, records: List[dict]):
+        action_table = NodeHistoryAction.__table__
+
+        # The actions are created the first time they are used
+        missing = {r["action"] for r in records} - set(self._action_uuids)
+        if missing:
+            connection.execute(
+                pg_insert(action_table)
+                .values([{"value": value} for value in sorted(missing)])
+                .on_conflict_do_nothing(index_elements=[action_table.c.value])
+            )
+            self._action_uuids.update(
+                connection.execute(
+                    select(action_table.c.value, action_table.c.uuid).where(action_table.c.value.in_(missing))
+                ).all()
+            )
+
+        connection.execute(
+            insert(NodeHistory.__table__),
+            [
+                {
+                    "action_uuid": self._action_uuids[r["action"]],
+                    "action_user_uuid": r["action_user_uuid"],
+                    "after": r["after"] or None,
+                    "before": r["before"] or None,
+                    "node_uuid": r["node_uuid"],
+                    "timestamp": r["timestamp"],
+                }
+                for r in records
+            ],
+        )
+
+
+settings = get_settings()
+node_history_writer = NodeHistoryWriter(
+    bind=engine,
+    batch_size=settings.node_history_batch_size,
+    flush_interval=settings.node_history_flush_interval,
+)
+
+
+def record(
+    db: Session,
+    node_uuid: UUID,
+    action: str,
+    before: Optional[dict] = None,
+    after: Optional[dict] = None,
+):
+    """Records a change made to a Node in the current transaction. The record is only written if the transaction
+    commits. Changes to the same Node with the same action are combined into a single record that keeps the earliest
+    "before" value and the latest "after" value of each field, so only the fields that changed are stored."""
+
+    pending: Dict[tuple, dict] = db.info.setdefault("node_history", {})
+
+    entry = pending.get((node_uuid, action))
+    if entry is None:
+        entry = pending[(node_uuid, action)] = {
+            "action": action,
+            "action_user_uuid": None,
+            "after": {},
+            "before": {},
+            "node_uuid": node_uuid,
+            "timestamp": datetime.utcnow(),
+        }
+
+    for key, value in jsonable_encoder(before or {}).items():
+        entry["before"].setdefault(key, value)
+
+    entry["after"].update(jsonable_encoder(after or {}))
+
+
+def _serialize(value):
+    """Converts related objects into the compact form stored in the history (their value, username, or UUID)."""
+
+    if isinstance(value, (list, tuple)):
+        return [_serialize(v) for v in value]
+
+    if isinstance(value, Base):
+        for attribute in ["value", "username", "uuid"]:
+            if hasattr(value, attribute):
+                return getattr(value, attribute)
+
+    return value
+
+
+def _loaded_values(obj: Node) -> dict:
+    """Returns the fields of a new Node that were given a value, skipping the foreign keys of its relationships."""
+
+    state = inspect(obj)
+    relationships = state.mapper.relationships
+
+    values = {}
+    for attr in state.attrs:
+        if attr.key.endswith("_uuid") and attr.key[: -len("_uuid")] in relationships:
+            continue
+
+        value = attr.loaded_value
+        if value is not NO_VALUE and value is not None and value != []:
+            values[attr.key] = _serialize(value)
+
+    return values
+
+
+def _changed_values(obj: Node):
+    """Returns the before and after values of the fields of a Node that were changed."""
+
+    state = inspect(obj)
+    relationships = state.mapper.relationships
+
+    before, after = {}, {}
+    for attr in state.attrs:
+        history = attr.history
+        if not history.has_changes():
+            continue
+
+        if attr.key in relationships and relationships[attr.key].uselist:
+            before[attr.key] = _serialize(list(history.unchanged) + list(history.deleted))
+            after[attr.key] = _serialize(list(history.unchanged) + list(history.added))
+        else:
+            before[attr.key] = _serialize(history.deleted[0]) if history.deleted else None
+            after[attr.key] = _serialize(history.added[0]) if history.added else None
+
+    return before, after
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_nodes(session: Session, flush_context):
+    # The attribute history still shows the changes made by the flush at this point
+    for obj in session.new:
+        if isinstance(obj, Node):
+            record(session, node_uuid=obj.uuid, action="CREATE", after=_loaded_values(obj))
+
+    for obj in session.dirty:
+        if isinstance(obj, Node) and session.is_modified(obj):
+            before, after = _changed_values(obj)
+            if after:
+                record(session, node_uuid=obj.uuid, action="UPDATE", before=before, after=after)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_records(session: Session):
+    pending = session.info.pop("node_history", None)
+    if pending:
+        node_history_writer.enqueue(list(pending.values()))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_records(session: Session, transaction):
+    # Anything still pending when the transaction ends without committing was rolled back
+    if transaction.parent is None:
+        session.info.pop("node_history", None)
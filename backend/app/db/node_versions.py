@@ -0,0 +1,62 @@
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+from typing import Optional, Set
+from uuid import UUID
+
+from db import node_history
+from db.schemas.node import Node
+
+
+def bump(db: Session, *node_uuids: Optional[UUID]):
+    """Gives the Nodes with the given UUIDs new versions when the current transaction commits. Any None values are
+    ignored.
+
+    Adding a child to a Node (such as an observable instance to an alert) counts as editing the Node, but updating its
+    version right away would hold the lock on its row until the end of the transaction. Every request adding children
+    to the same alert would then wait on the one before it. Instead, the Nodes are collected and each one receives a
+    single new version from one UPDATE statement that runs just before the transaction commits."""
+
+    pending: Set[UUID] = db.info.setdefault("node_version_bumps", set())
+    pending.update(u for u in node_uuids if u is not None)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_bumps(session: Session):
+    pending = session.info.pop("node_version_bumps", None)
+    if not pending:
+        return
+
+    # Flush first so that the ORM does not overwrite the new versions with changes it has not written yet
+    session.flush()
+
+    # The rows are locked in a consistent order so that two transactions bumping the same Nodes cannot deadlock
+    node = Node.__table__
+    locked = (
+        select(node.c.uuid, node.c.version)
+        .where(node.c.uuid.in_(pending))
+        .order_by(node.c.uuid)
+        .with_for_update(key_share=True)
+        .subquery("locked")
+    )
+    rows = session.execute(
+        update(node)
+        .where(node.c.uuid == locked.c.uuid)
+        .values(version=func.gen_random_uuid())
+        .returning(node.c.uuid, locked.c.version.label("old_version"), node.c.version)
+    ).all()
+
+    for row in rows:
+        node_history.record(
+            session,
+            node_uuid=row.uuid,
+            action="UPDATE",
+            before={"version": row.old_version},
+            after={"version": row.version},
+        )
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_bumps(session: Session, transaction):
+    # Anything still pending when the transaction ends without committing was rolled back
+    if transaction.parent is None:
+        session.info.pop("node_version_bumps", None)
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import Pool
+from typing import Type
+
+
+class PoolMetrics:
+    """
+    Collects metrics about a database engine's connection pool so that pool saturation can be seen before requests
+    start timing out.
+
+    The in-use count and connection ages are tracked with the SQLAlchemy pool events. The pool does not have an event
+    that fires before a checkout begins, so the time spent waiting for a connection is measured by the pool class
+    returned by the instrument_pool_class method.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_max = 0.0
+        self.checkout_wait_total = 0.0
+        self.connections_created = 0
+        self.in_use = 0
+
+        # Maps the id of each open connection record to the time its connection was created
+        self._connected_at = {}
+        self._lock = threading.Lock()
+
+    def instrument_pool_class(self, pool_class: Type[Pool]) -> Type[Pool]:
+        """Returns a subclass of the given pool class that records how long each checkout waits for a connection. The
+        metrics are stored on the class (rather than passed to the pool) so that they survive the pool being recreated
+        when the engine is disposed."""
+
+        metrics = self
+
+        class InstrumentedPool(pool_class):
+            def _do_get(self):
+                start = time.monotonic()
+                try:
+                    return super()._do_get()
+                except TimeoutError:
+                    metrics._record_timeout()
+                    raise
+                finally:
+                    metrics._record_wait(time.monotonic() - start)
+
+        return InstrumentedPool
+
+    def listen(self, engine: Engine):
+        """Registers the pool event listeners on the given engine."""
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "detach", self._on_close)
+
+    def snapshot(self, pool: Pool) -> dict:
+        """Returns the current metrics combined with the state reported by the given pool."""
+
+        now = time.monotonic()
+
+        with self._lock:
+            return {
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "in_use": self.in_use,
+                # The pool reports a negative overflow when it has not yet created all of the connections it can hold
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait_max_seconds": self.checkout_wait_max,
+                "checkout_wait_total_seconds": self.checkout_wait_total,
+                "connections_created": self.connections_created,
+                "oldest_connection_age_seconds": now - min(self._connected_at.values(), default=now),
+            }
+
+    def _record_timeout(self):
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def _record_wait(self, seconds: float):
+        with self._lock:
+            self.checkout_wait_total += seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, seconds)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connections_created += 1
+            self._connected_at[id(connection_record)] = time.monotonic()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.in_use -= 1
+
+    def _on_close(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._connected_at.pop(id(connection_record), None)
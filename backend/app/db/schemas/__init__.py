@@ -1,4 +1,5 @@
 from db.schemas.analysis import Analysis
+from db.schemas.analysis_claim import AnalysisClaim
 from db.schemas.analysis_module_type_directive_mapping import analysis_module_type_directive_mapping
 from db.schemas.analysis_module_type_observable_type_mapping import analysis_module_type_observable_type_mapping
 from db.schemas.analysis_observable_instance_mapping import analysis_observable_instance_mapping
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Index, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -27,12 +27,16 @@ class Alert(Node):
 
     disposition_user = relationship("User", foreign_keys=[disposition_user_uuid])
 
+    duplicate_count = Column(Integer, server_default="0", nullable=False)
+
     event_time = Column(DateTime(timezone=True), server_default=utcnow(), nullable=False, index=True)
 
     event_uuid = Column(UUID(as_uuid=True), ForeignKey("event.uuid"), index=True)
 
     event = relationship("Event", foreign_keys=[event_uuid])
 
+    fingerprint = Column(String)
+
     insert_time = Column(DateTime(timezone=True), server_default=utcnow(), nullable=False, index=True)
 
     instructions = Column(String)
@@ -63,8 +67,19 @@ class Alert(Node):
         "polymorphic_identity": "alert",
     }
 
-    # TODO: We need a lot more indices here for when we introduce searching API endpoints.
+    # The composite indices end with (sort column, uuid) so that the keyset pagination used when listing alerts can
+    # be satisfied by an index scan whether or not one of the filter columns is also given.
     __table_args__ = (
+        Index("alert_event_time_uuid", event_time, uuid),
+        Index("alert_insert_time_uuid", insert_time, uuid),
+        Index("alert_disposition_insert_time_uuid", disposition_uuid, insert_time, uuid),
+        Index("alert_fingerprint_insert_time", fingerprint, insert_time),
+        Index("alert_owner_insert_time_uuid", owner_uuid, insert_time, uuid),
+        Index("alert_queue_event_time_uuid", queue_uuid, event_time, uuid),
+        Index("alert_queue_insert_time_uuid", queue_uuid, insert_time, uuid),
+        Index("alert_tool_insert_time_uuid", tool_uuid, insert_time, uuid),
+        Index("alert_tool_instance_insert_time_uuid", tool_instance_uuid, insert_time, uuid),
+        Index("alert_type_insert_time_uuid", type_uuid, insert_time, uuid),
         Index(
             "name_trgm",
             name,
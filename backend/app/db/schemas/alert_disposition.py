@@ -1,4 +1,4 @@
-from sqlalchemy import func, Column, Integer, String
+from sqlalchemy import func, Boolean, Column, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.database import Base
@@ -11,6 +11,8 @@ class AlertDisposition(Base):
 
     description = Column(String)
 
+    malicious = Column(Boolean, default=False, server_default="false", nullable=False)
+
     rank = Column(Integer, nullable=False, unique=True)
 
     value = Column(String, nullable=False, unique=True, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import func, Column, String
+from sqlalchemy import func, Column, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.database import Base
@@ -9,6 +9,8 @@ class AlertTool(Base):
 
     uuid = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
 
+    dedup_window = Column(Integer)
+
     description = Column(String)
 
     value = Column(String, nullable=False, unique=True, index=True)
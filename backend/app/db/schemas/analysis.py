@@ -1,11 +1,11 @@
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
 
 from db.schemas.analysis_observable_instance_mapping import analysis_observable_instance_mapping
 from db.schemas.observable_instance_analysis_mapping import observable_instance_analysis_mapping
-
+from db.schemas.helpers import utcnow
 from db.schemas.node import Node
 
 
@@ -26,6 +26,12 @@ class Analysis(Node):
 
     error_message = Column(String)
 
+    # The extended version of the analysis module type when the analysis was performed. The result can only be reused
+    # while the analysis module type still has the same extended version.
+    extended_version = Column(JSONB)
+
+    insert_time = Column(DateTime(timezone=True), server_default=utcnow(), nullable=False)
+
     # Commenting this out until this functionality is fleshed out
     # event_summary = Column(JSONB)
 
@@ -68,3 +74,6 @@ class Analysis(Node):
     __mapper_args__ = {
         "polymorphic_identity": "analysis",
     }
+
+    # Finding the recent results of an analysis module type only needs to read this index
+    __table_args__ = (Index("analysis_module_type_insert_time", analysis_module_type_uuid, insert_time),)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from db.database import Base
+
+
+class AnalysisClaim(Base):
+    """
+    A lease an analysis worker holds on an observable instance while it analyzes it with an analysis module type.
+
+    An observable instance can only have one claim per analysis module type. Once the lease expires, the claim row is
+    reused by the next worker that claims the observable instance. The claim is deleted when the analysis is created.
+    """
+
+    __tablename__ = "analysis_claim"
+
+    observable_instance_uuid = Column(
+        UUID(as_uuid=True), ForeignKey("observable_instance.uuid", ondelete="CASCADE"), primary_key=True
+    )
+
+    analysis_module_type_uuid = Column(
+        UUID(as_uuid=True), ForeignKey("analysis_module_type.uuid", ondelete="CASCADE"), primary_key=True
+    )
+
+    expires_on = Column(DateTime(timezone=True), nullable=False)
+
+    # Finding the claims of an analysis module type (such as the ones that expired) only needs to read this index
+    __table_args__ = (Index("analysis_claim_module_type_expires_on", analysis_module_type_uuid, expires_on),)
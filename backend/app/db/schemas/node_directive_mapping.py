@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.database import Base
@@ -20,4 +20,5 @@ node_directive_mapping = Table(
         ForeignKey("node_directive.uuid"),
         primary_key=True,
     ),
+    Index("node_directive_mapping_directive_uuid_node_uuid", "directive_uuid", "node_uuid"),
 )
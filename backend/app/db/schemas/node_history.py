@@ -1,4 +1,4 @@
-from sqlalchemy import func, Column, DateTime, ForeignKey
+from sqlalchemy import func, Column, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
@@ -19,12 +19,20 @@ class NodeHistory(Base):
 
     action_user = relationship("User", foreign_keys=[action_user_uuid])
 
-    after = Column(JSONB)
+    # Only the fields that changed are stored. A Node that was just created has no "before" value.
+    after = Column(JSONB(none_as_null=True))
 
-    before = Column(JSONB)
+    before = Column(JSONB(none_as_null=True))
 
     node_uuid = Column(UUID(as_uuid=True), ForeignKey("node.uuid"))
 
     node = relationship("Node", foreign_keys=[node_uuid])
 
     timestamp = Column(DateTime, server_default=utcnow())
+
+    # The composite indices end with (timestamp, uuid) so that the keyset pagination used when reading a node's history
+    # can be satisfied by an index scan whether or not it is also filtered by action.
+    __table_args__ = (
+        Index("node_history_node_timestamp_uuid", node_uuid, timestamp, uuid),
+        Index("node_history_node_action_timestamp_uuid", node_uuid, action_uuid, timestamp, uuid),
+    )
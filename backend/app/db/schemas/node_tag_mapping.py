@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.database import Base
@@ -15,4 +15,5 @@ node_tag_mapping = Table(
         primary_key=True,
     ),
     Column("tag_uuid", UUID(as_uuid=True), ForeignKey("node_tag.uuid"), primary_key=True),
+    Index("node_tag_mapping_tag_uuid_node_uuid", "tag_uuid", "node_uuid"),
 )
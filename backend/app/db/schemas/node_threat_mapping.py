@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.database import Base
@@ -20,4 +20,5 @@ node_threat_mapping = Table(
         ForeignKey("node_threat.uuid"),
         primary_key=True,
     ),
+    Index("node_threat_mapping_threat_uuid_node_uuid", "threat_uuid", "node_uuid"),
 )
@@ -5,6 +5,7 @@ from sqlalchemy import (
     ForeignKey,
     func,
     Index,
+    Integer,
     String,
     UniqueConstraint,
 )
@@ -19,12 +20,22 @@ class Observable(Base):
 
     uuid = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
 
+    # The sighting statistics are kept up to date as observable instances are created and alerts are dispositioned
+    # (see db/crud/observable_stats.py) so that they can be displayed and sorted on without any aggregate queries.
+    alert_count = Column(Integer, default=0, server_default="0", nullable=False)
+
     # Using timezone=True causes PostgreSQL to store the datetime as UTC. Datetimes without timezone
     # information will be assumed to be UTC, whereas datetimes with timezone data will be converted to UTC.
     expires_on = Column(DateTime(timezone=True))
 
+    first_seen = Column(DateTime(timezone=True))
+
     for_detection = Column(Boolean, default=False, nullable=False)
 
+    last_seen = Column(DateTime(timezone=True))
+
+    malicious_alert_count = Column(Integer, default=0, server_default="0", nullable=False)
+
     type = relationship("ObservableType")
 
     type_uuid = Column(UUID(as_uuid=True), ForeignKey("observable_type.uuid"), nullable=False)
@@ -32,6 +43,10 @@ class Observable(Base):
     value = Column(String, nullable=False)
 
     __table_args__ = (
+        Index("observable_alert_count_uuid", alert_count, uuid),
+        Index("observable_first_seen_uuid", first_seen, uuid),
+        Index("observable_last_seen_uuid", last_seen, uuid),
+        Index("observable_malicious_alert_count_uuid", malicious_alert_count, uuid),
         Index(
             "observable_value_trgm",
             value,
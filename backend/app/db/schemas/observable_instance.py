@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
@@ -14,7 +14,7 @@ class ObservableInstance(Node):
 
     uuid = Column(UUID(as_uuid=True), ForeignKey("node.uuid"), primary_key=True)
 
-    alert_uuid = Column(UUID(as_uuid=True), ForeignKey("alert.uuid"))
+    alert_uuid = Column(UUID(as_uuid=True), ForeignKey("alert.uuid"), index=True)
 
     alert = relationship("Alert", foreign_keys=[alert_uuid])
 
@@ -41,3 +41,6 @@ class ObservableInstance(Node):
     __mapper_args__ = {
         "polymorphic_identity": "observable_instance",
     }
+
+    # Finding the alerts that contain an observable only needs to read this index
+    __table_args__ = (Index("observable_instance_observable_alert", observable_uuid, alert_uuid),)
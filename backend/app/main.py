@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.routes import router as api_router
+from db.alert_stream import alert_stream
+from db.node_history import node_history_writer
 
 
 def get_application():
@@ -17,6 +19,13 @@ def get_application():
 
     app.include_router(api_router, prefix="/api")
 
+    # The node history is written by a background thread that flushes whatever is left when the app shuts down
+    app.add_event_handler("startup", node_history_writer.start)
+    app.add_event_handler("shutdown", node_history_writer.stop)
+
+    # The connection listening for alert changes is opened by the first client to stream them
+    app.add_event_handler("shutdown", alert_stream.stop)
+
     return app
 
 
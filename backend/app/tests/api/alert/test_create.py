@@ -27,6 +27,8 @@ from tests.api.node import (
         ("event_time", ""),
         ("event_time", "Monday"),
         ("event_time", "2022-01-01"),
+        ("fingerprint", 123),
+        ("fingerprint", ""),
         ("instructions", 123),
         ("instructions", ""),
         ("name", 123),
@@ -169,6 +171,8 @@ def test_create_nonexistent_node_fields(client, key, value):
         ("event_time", "2022-01-01 00:00:00"),
         ("event_time", "2022-01-01 00:00:00.000000"),
         ("event_time", "2021-12-31 19:00:00-05:00"),
+        ("fingerprint", None),
+        ("fingerprint", "test"),
         ("instructions", None),
         ("instructions", "test"),
         ("name", None),
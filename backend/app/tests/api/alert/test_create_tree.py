@@ -0,0 +1,275 @@
+import json
+import pytest
+import uuid
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+
+def create_lookups(client: TestClient):
+    """
+    Helper function to create the lookup values used by the alert trees in these tests.
+    """
+
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/observable/type/", json={"value": "test_type"})
+
+
+#
+# INVALID TESTS
+#
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("queue", None),
+        ("queue", ""),
+        ("type", None),
+        ("type", ""),
+        ("uuid", "abc"),
+        ("analysis", "abc"),
+        ("analysis", {"discovered_observables": "abc"}),
+        ("analysis", {"discovered_observables": [{"value": "test"}]}),
+        ("analysis", {"discovered_observables": [{"type": "test_type"}]}),
+        ("analysis", {"discovered_observables": [{"type": "test_type", "value": ""}]}),
+        ("analysis", {"discovered_observables": [{"type": "test_type", "value": "test", "analyses": "abc"}]}),
+        ("analysis", {"details": {"not": "a string"}}),
+    ],
+)
+def test_create_tree_invalid_fields(client, key, value):
+    create_json = {"queue": "test_queue", "type": "test_type"}
+    create_json[key] = value
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_create_tree_duplicate_uuid(client):
+    create_lookups(client)
+
+    # Use the same UUID for two observable instances in the tree
+    observable_instance_uuid = str(uuid.uuid4())
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {
+            "discovered_observables": [
+                {"type": "test_type", "uuid": observable_instance_uuid, "value": "test1"},
+                {"type": "test_type", "uuid": observable_instance_uuid, "value": "test2"},
+            ]
+        },
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_409_CONFLICT
+
+
+def test_create_tree_nonexistent_analysis_module_type(client):
+    create_lookups(client)
+
+    analysis_module_type_uuid = str(uuid.uuid4())
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {
+            "discovered_observables": [
+                {
+                    "type": "test_type",
+                    "value": "test",
+                    "analyses": [{"analysis_module_type": analysis_module_type_uuid}],
+                }
+            ]
+        },
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_404_NOT_FOUND
+    assert analysis_module_type_uuid in create.text
+
+
+def test_create_tree_nonexistent_observable_type(client):
+    create_lookups(client)
+
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{"type": "abc", "value": "test"}]},
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_404_NOT_FOUND
+    assert "abc" in create.text
+
+
+def test_create_tree_nonexistent_queue(client):
+    client.post("/api/alert/type/", json={"value": "test_type"})
+
+    create = client.post("/api/alert/tree", json={"queue": "test_queue", "type": "test_type"})
+    assert create.status_code == status.HTTP_404_NOT_FOUND
+    assert "alert_queue" in create.text
+
+
+def test_create_tree_nonexistent_redirection(client):
+    create_lookups(client)
+
+    redirection_uuid = str(uuid.uuid4())
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {
+            "discovered_observables": [{"redirection_uuid": redirection_uuid, "type": "test_type", "value": "test"}]
+        },
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_404_NOT_FOUND
+    assert redirection_uuid in create.text
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("directives", ["abc"]),
+        ("tags", ["abc"]),
+        ("threat_actor", "abc"),
+        ("threats", ["abc"]),
+    ],
+)
+def test_create_tree_nonexistent_node_fields(client, key, value):
+    create_lookups(client)
+
+    # Use the nonexistent value on an observable instance deep inside of the tree
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{key: value, "type": "test_type", "value": "test"}]},
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_404_NOT_FOUND
+
+
+#
+# VALID TESTS
+#
+
+
+def test_create_tree_valid_required_fields(client):
+    create_lookups(client)
+
+    # Create the alert tree
+    create = client.post("/api/alert/tree", json={"queue": "test_queue", "type": "test_type"})
+    assert create.status_code == status.HTTP_201_CREATED
+    assert create.json()["analysis"]["discovered_observables"] == []
+
+    # Read it back
+    get = client.get(create.headers["Content-Location"])
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["uuid"] == create.json()["uuid"]
+    assert get.json()["analysis"]["uuid"] == create.json()["analysis"]["uuid"]
+    assert get.json()["queue"]["value"] == "test_queue"
+    assert get.json()["type"]["value"] == "test_type"
+
+
+def test_create_tree_valid_nested(client):
+    create_lookups(client)
+    client.post("/api/node/tag/", json={"value": "test_tag"})
+    module_type_uuid = str(uuid.uuid4())
+    client.post("/api/analysis/module_type/", json={"uuid": module_type_uuid, "value": "test", "version": "1.0.0"})
+
+    # Create an alert tree that is three levels deep and that uses the same observable twice
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "tags": ["test_tag"],
+        "analysis": {
+            "discovered_observables": [
+                {
+                    "type": "test_type",
+                    "value": "test1",
+                    "tags": ["test_tag"],
+                    "analyses": [
+                        {
+                            "analysis_module_type": module_type_uuid,
+                            "details": json.dumps({"foo": "bar"}),
+                            "summary": "test summary",
+                            "discovered_observables": [{"type": "test_type", "value": "test2"}],
+                        }
+                    ],
+                },
+                {"type": "test_type", "value": "test2"},
+            ]
+        },
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_201_CREATED
+
+    uuids = create.json()
+    root_observables = uuids["analysis"]["discovered_observables"]
+    child_analysis = root_observables[0]["analyses"][0]
+    grandchild_observable = child_analysis["discovered_observables"][0]
+
+    # Both instances of the "test2" observable should point to the same observable
+    assert grandchild_observable["observable_uuid"] == root_observables[1]["observable_uuid"]
+    assert root_observables[0]["observable_uuid"] != root_observables[1]["observable_uuid"]
+
+    # Read back the alert
+    get_alert = client.get(create.headers["Content-Location"])
+    assert [t["value"] for t in get_alert.json()["tags"]] == ["test_tag"]
+    assert sorted(get_alert.json()["analysis"]["discovered_observable_uuids"]) == sorted(
+        [o["uuid"] for o in root_observables]
+    )
+
+    # Read back the first observable instance
+    get_observable_instance = client.get(f"/api/observable/instance/{root_observables[0]['uuid']}")
+    assert get_observable_instance.json()["alert_uuid"] == uuids["uuid"]
+    assert get_observable_instance.json()["parent_analysis_uuid"] == uuids["analysis"]["uuid"]
+    assert get_observable_instance.json()["performed_analysis_uuids"] == [child_analysis["uuid"]]
+    assert get_observable_instance.json()["observable"]["value"] == "test1"
+    assert [t["value"] for t in get_observable_instance.json()["tags"]] == ["test_tag"]
+
+    # Read back the child analysis
+    get_analysis = client.get(f"/api/analysis/{child_analysis['uuid']}")
+    assert get_analysis.json()["analysis_module_type"]["uuid"] == module_type_uuid
+    assert get_analysis.json()["details"] == {"foo": "bar"}
+    assert get_analysis.json()["summary"] == "test summary"
+    assert get_analysis.json()["parent_observable_uuid"] == root_observables[0]["uuid"]
+    assert get_analysis.json()["discovered_observable_uuids"] == [grandchild_observable["uuid"]]
+
+
+def test_create_tree_valid_existing_observable(client):
+    create_lookups(client)
+
+    # Create an observable ahead of time
+    create_observable = client.post("/api/observable/", json={"type": "test_type", "value": "test"})
+    get_observable = client.get(create_observable.headers["Content-Location"])
+
+    # Create an alert tree that uses the existing observable
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{"type": "test_type", "value": "test"}]},
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_201_CREATED
+    assert create.json()["analysis"]["discovered_observables"][0]["observable_uuid"] == get_observable.json()["uuid"]
+
+
+def test_create_tree_valid_redirection(client):
+    create_lookups(client)
+
+    # Create an alert tree where one observable instance redirects to another one in the same tree
+    target_uuid = str(uuid.uuid4())
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {
+            "discovered_observables": [
+                {"redirection_uuid": target_uuid, "type": "test_type", "value": "test1"},
+                {"type": "test_type", "uuid": target_uuid, "value": "test2"},
+            ]
+        },
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_201_CREATED
+
+    # Read back the observable instance that redirects
+    redirect_uuid = create.json()["analysis"]["discovered_observables"][0]["uuid"]
+    get = client.get(f"/api/observable/instance/{redirect_uuid}")
+    assert get.json()["redirection_uuid"] == target_uuid
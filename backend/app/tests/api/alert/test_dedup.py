@@ -0,0 +1,161 @@
+import pytest
+import time
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from typing import Optional
+
+
+def create_lookups(client: TestClient, type_window: Optional[int] = 300, tool_window: Optional[int] = None):
+    """
+    Helper function to create the lookup values used by the alerts in these tests.
+    """
+
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type", "dedup_window": type_window})
+    client.post("/api/alert/tool/", json={"value": "test_tool", "dedup_window": tool_window})
+    client.post("/api/alert/tool/", json={"value": "other_tool"})
+    client.post("/api/observable/type/", json={"value": "ipv4"})
+
+
+def create_alert_tree(client: TestClient, values: list, **kwargs):
+    create_json = {
+        "fingerprint": "abc123",
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{"type": "ipv4", "value": v} for v in values]},
+        **kwargs,
+    }
+    return client.post("/api/alert/tree", json=create_json)
+
+
+def observable_values(client: TestClient, alert_uuid: str) -> list:
+    tree = client.get(f"/api/alert/{alert_uuid}/tree").json()
+    return sorted(o["observable"]["value"] for o in tree["analysis"]["children"])
+
+
+#
+# VALID TESTS
+#
+
+
+def test_merge_tree(client):
+    create_lookups(client)
+
+    create1 = create_alert_tree(client, ["127.0.0.1", "127.0.0.2"])
+    assert create1.status_code == status.HTTP_201_CREATED
+    alert = client.get(create1.headers["Content-Location"]).json()
+    assert alert["duplicate_count"] == 0
+    assert alert["fingerprint"] == "abc123"
+
+    # The duplicate is merged into the first alert and only the observable it does not already contain is added
+    create2 = create_alert_tree(client, ["127.0.0.2", "127.0.0.3"])
+    assert create2.status_code == status.HTTP_200_OK
+    assert create2.headers["Content-Location"] == create1.headers["Content-Location"]
+    assert create2.json()["uuid"] == create1.json()["uuid"]
+    assert create2.json()["analysis"]["uuid"] == create1.json()["analysis"]["uuid"]
+    assert len(create2.json()["analysis"]["discovered_observables"]) == 1
+
+    merged = client.get(create1.headers["Content-Location"]).json()
+    assert merged["duplicate_count"] == 1
+    assert merged["version"] != alert["version"]
+    assert observable_values(client, create1.json()["uuid"]) == ["127.0.0.1", "127.0.0.2", "127.0.0.3"]
+
+    # Only one alert was created
+    assert len(client.get("/api/alert/").json()["items"]) == 1
+
+
+def test_merge_analysis_version(client):
+    create_lookups(client)
+
+    create1 = create_alert_tree(client, ["127.0.0.1"])
+    analysis_url = f"/api/analysis/{create1.json()['analysis']['uuid']}"
+    analysis = client.get(analysis_url)
+
+    # Merging new observables beneath the analysis counts as editing it
+    create_alert_tree(client, ["127.0.0.2"])
+    merged = client.get(analysis_url)
+    assert merged.json()["version"] != analysis.json()["version"]
+    assert merged.headers["ETag"] != analysis.headers["ETag"]
+
+    # The analysis is left alone when there was nothing new to merge
+    create_alert_tree(client, ["127.0.0.1", "127.0.0.2"])
+    assert client.get(analysis_url).json()["version"] == merged.json()["version"]
+
+
+def test_merge_alert(client):
+    create_lookups(client)
+
+    create1 = client.post("/api/alert/", json={"fingerprint": "abc123", "queue": "test_queue", "type": "test_type"})
+    assert create1.status_code == status.HTTP_201_CREATED
+
+    create2 = client.post("/api/alert/", json={"fingerprint": "abc123", "queue": "test_queue", "type": "test_type"})
+    assert create2.status_code == status.HTTP_200_OK
+    assert create2.headers["Content-Location"] == create1.headers["Content-Location"]
+
+    assert client.get(create1.headers["Content-Location"]).json()["duplicate_count"] == 1
+    assert len(client.get("/api/alert/").json()["items"]) == 1
+
+
+def test_merge_tool_window(client):
+    # The tool's window is used even though the type does not have one
+    create_lookups(client, type_window=None, tool_window=300)
+
+    create1 = create_alert_tree(client, ["127.0.0.1"], tool="test_tool")
+    create2 = create_alert_tree(client, ["127.0.0.1"], tool="test_tool")
+    assert create2.status_code == status.HTTP_200_OK
+    assert create2.json()["uuid"] == create1.json()["uuid"]
+    assert create2.json()["analysis"]["discovered_observables"] == []
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        ({"fingerprint": None}),
+        ({"fingerprint": "def456"}),
+        ({"tool": "test_tool"}),
+    ],
+)
+def test_no_merge_different_alert(client, kwargs):
+    create_lookups(client)
+
+    create1 = create_alert_tree(client, ["127.0.0.1"])
+    create2 = create_alert_tree(client, ["127.0.0.1"], **kwargs)
+    assert create2.status_code == status.HTTP_201_CREATED
+    assert create2.json()["uuid"] != create1.json()["uuid"]
+
+
+def test_no_merge_without_window(client):
+    create_lookups(client, type_window=None)
+
+    create1 = create_alert_tree(client, ["127.0.0.1"])
+    create2 = create_alert_tree(client, ["127.0.0.1"])
+    assert create2.status_code == status.HTTP_201_CREATED
+    assert create2.json()["uuid"] != create1.json()["uuid"]
+
+
+def test_no_merge_tool_window_override(client):
+    # The tool's window takes precedence over the type's, so only alerts created within the last second are merged
+    create_lookups(client, type_window=300, tool_window=1)
+
+    create1 = create_alert_tree(client, ["127.0.0.1"], tool="test_tool")
+    time.sleep(1.5)
+    create2 = create_alert_tree(client, ["127.0.0.1"], tool="test_tool")
+    assert create2.status_code == status.HTTP_201_CREATED
+    assert create2.json()["uuid"] != create1.json()["uuid"]
+
+
+def test_no_merge_dispositioned(client):
+    create_lookups(client)
+    client.post("/api/alert/disposition/", json={"value": "FALSE_POSITIVE", "rank": 1})
+
+    create1 = create_alert_tree(client, ["127.0.0.1"])
+    alert = client.get(create1.headers["Content-Location"]).json()
+    client.patch(
+        create1.headers["Content-Location"], json={"disposition": "FALSE_POSITIVE", "version": alert["version"]}
+    )
+
+    # New activity is not hidden inside of an alert the analysts are already done with
+    create2 = create_alert_tree(client, ["127.0.0.1"])
+    assert create2.status_code == status.HTTP_201_CREATED
+    assert create2.json()["uuid"] != create1.json()["uuid"]
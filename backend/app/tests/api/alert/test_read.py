@@ -1,6 +1,35 @@
+import pytest
 import uuid
 
 from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from db.database import engine
+
+
+def create_lookups(client: TestClient):
+    """
+    Helper function to create the alert queue and type used by the alerts in these tests.
+    """
+
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+
+
+def create_alerts(client: TestClient, count: int, **kwargs) -> list:
+    """
+    Helper function to create alerts and return their UUIDs in the order they were created. Any extra keyword
+    arguments are added to the JSON used to create each alert.
+    """
+
+    uuids = []
+    for _ in range(count):
+        alert_uuid = str(uuid.uuid4())
+        client.post("/api/alert/", json={"queue": "test_queue", "type": "test_type", "uuid": alert_uuid, **kwargs})
+        uuids.append(alert_uuid)
+
+    return uuids
 
 
 #
@@ -18,24 +47,229 @@ def test_get_nonexistent_uuid(client):
     assert get.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        ("abc"),
+        ("W10="),  # An empty JSON list
+        ("eyJmb28iOiAiYmFyIn0="),  # A JSON object instead of a list
+    ],
+)
+def test_get_all_invalid_cursor(client, cursor):
+    get = client.get(f"/api/alert/?cursor={cursor}")
+    assert get.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("limit", 0),
+        ("limit", 1001),
+        ("limit", "abc"),
+        ("sort", "abc"),
+    ],
+)
+def test_get_all_invalid_parameters(client, key, value):
+    get = client.get(f"/api/alert/?{key}={value}")
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        ("disposition"),
+        ("owner"),
+        ("queue"),
+        ("tool"),
+        ("tool_instance"),
+        ("type"),
+    ],
+)
+def test_get_all_nonexistent_filter(client, key):
+    get = client.get(f"/api/alert/?{key}=abc")
+    assert get.status_code == status.HTTP_404_NOT_FOUND
+
+
 #
 # VALID TESTS
 #
 
 
-# There is currently no get_all endpoint for alerts
-# def test_get_all(client):
-#     # Create some objects
-#     client.post("/api/alert/", json={})
-#     client.post("/api/alert/", json={})
+def test_get_etag(client):
+    create_lookups(client)
+    alert_uuid = create_alerts(client, 1)[0]
+
+    get = client.get(f"/api/alert/{alert_uuid}")
+    assert get.status_code == status.HTTP_200_OK
+    assert get.headers["Cache-Control"] == "no-cache"
+    etag = get.headers["ETag"]
+
+    # A client that already has the current version does not receive the alert again
+    get = client.get(f"/api/alert/{alert_uuid}", headers={"If-None-Match": etag})
+    assert get.status_code == status.HTTP_304_NOT_MODIFIED
+    assert get.headers["ETag"] == etag
+    assert get.content == b""
+
+    # Updating the alert changes the ETag
+    version = client.get(f"/api/alert/{alert_uuid}").json()["version"]
+    client.patch(f"/api/alert/{alert_uuid}", json={"name": "test", "version": version})
+    get = client.get(f"/api/alert/{alert_uuid}", headers={"If-None-Match": etag})
+    assert get.status_code == status.HTTP_200_OK
+    assert get.headers["ETag"] != etag
+    assert get.json()["name"] == "test"
+
+    # Updating the alert's analysis also changes the ETag
+    etag = get.headers["ETag"]
+    analysis = get.json()["analysis"]
+    update_json = {"details": '{"a": 1}', "version": analysis["version"]}
+    update = client.patch(f"/api/analysis/{analysis['uuid']}", json=update_json)
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+    get = client.get(f"/api/alert/{alert_uuid}", headers={"If-None-Match": etag})
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["analysis"]["details"] == {"a": 1}
+
+
+def test_get_cached_query_count(client):
+    create_lookups(client)
+    alert_uuid = create_alerts(client, 1)[0]
+    first = client.get(f"/api/alert/{alert_uuid}")
+
+    queries = []
+    listener = lambda *args: queries.append(args)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    second = client.get(f"/api/alert/{alert_uuid}")
+    event.remove(engine, "before_cursor_execute", listener)
+
+    # The cached response is used after only reading the versions
+    assert len(queries) == 1
+    assert second.json() == first.json()
+
+
+def test_get_cache_cleared_by_lookup_update(client):
+    create_lookups(client)
+    alert_uuid = create_alerts(client, 1)[0]
+    get = client.get(f"/api/alert/{alert_uuid}")
+
+    # Renaming the alert's queue does not change the alert's version, but the cached response is not used anymore
+    client.patch(f"/api/alert/queue/{get.json()['queue']['uuid']}", json={"value": "renamed_queue"})
+    get = client.get(f"/api/alert/{alert_uuid}", headers={"If-None-Match": get.headers["ETag"]})
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["queue"]["value"] == "renamed_queue"
+
+
+def test_get_all(client):
+    # Create some objects
+    create_lookups(client)
+    create_alerts(client, 2)
+
+    # Read them back
+    get = client.get("/api/alert/")
+    assert get.status_code == status.HTTP_200_OK
+    assert len(get.json()["items"]) == 2
+    assert get.json()["next_cursor"] is None
+
+
+def test_get_all_empty(client):
+    get = client.get("/api/alert/")
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json() == {"items": [], "next_cursor": None}
+
+
+def test_get_all_pagination(client):
+    create_lookups(client)
+    uuids = create_alerts(client, 5)
+
+    # Follow the cursors until there are no more pages
+    pages = []
+    get = client.get("/api/alert/?limit=2")
+    pages.append(get.json()["items"])
+    while get.json()["next_cursor"]:
+        get = client.get(f"/api/alert/?limit=2&cursor={get.json()['next_cursor']}")
+        assert get.status_code == status.HTTP_200_OK
+        pages.append(get.json()["items"])
+
+    # Every alert should appear exactly once across the pages
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert sorted(a["uuid"] for p in pages for a in p) == sorted(uuids)
+
+
+def test_get_all_sort_event_time(client):
+    create_lookups(client)
+    create_alerts(client, 1, event_time="2021-01-01T00:00:00+00:00")
+    newest = create_alerts(client, 1, event_time="2021-01-03T00:00:00+00:00")
+    middle = create_alerts(client, 1, event_time="2021-01-02T00:00:00+00:00")
+
+    # The alerts should be listed newest first, and the cursor should continue after the last alert on the page
+    get = client.get("/api/alert/?sort=event_time&limit=2")
+    assert [a["uuid"] for a in get.json()["items"]] == newest + middle
+
+    get = client.get(f"/api/alert/?sort=event_time&limit=2&cursor={get.json()['next_cursor']}")
+    assert get.json()["items"][0]["event_time"] == "2021-01-01T00:00:00+00:00"
+    assert get.json()["next_cursor"] is None
+
+
+@pytest.mark.parametrize(
+    "key,value,lookup_path",
+    [
+        ("tool", "test_tool", "/api/alert/tool/"),
+        ("tool_instance", "test_tool_instance", "/api/alert/tool/instance/"),
+    ],
+)
+def test_get_all_filter(client, key, value, lookup_path):
+    create_lookups(client)
+    client.post(lookup_path, json={"value": value})
+    create_alerts(client, 2)
+    matching = create_alerts(client, 1, **{key: value})
+
+    get = client.get(f"/api/alert/?{key}={value}")
+    assert get.status_code == status.HTTP_200_OK
+    assert [a["uuid"] for a in get.json()["items"]] == matching
+
+
+def test_get_all_filter_disposition(client):
+    create_lookups(client)
+    client.post("/api/alert/disposition/", json={"rank": 1, "value": "test_disposition"})
+    version = str(uuid.uuid4())
+    uuids = create_alerts(client, 2, version=version)
+    client.patch(f"/api/alert/{uuids[0]}", json={"disposition": "test_disposition", "version": version})
+
+    get = client.get("/api/alert/?disposition=test_disposition")
+    assert [a["uuid"] for a in get.json()["items"]] == [uuids[0]]
+
+
+def test_get_all_filter_owner(client):
+    create_lookups(client)
+    client.post("/api/user/role/", json={"value": "test_role"})
+    create_json = {
+        "default_alert_queue": "test_queue",
+        "display_name": "John Doe",
+        "email": "john@test.com",
+        "password": "abcd1234",
+        "roles": ["test_role"],
+        "username": "johndoe",
+    }
+    client.post("/api/user/", json=create_json)
+    create_alerts(client, 1)
+    matching = create_alerts(client, 1, owner="johndoe")
+
+    get = client.get("/api/alert/?owner=johndoe")
+    assert [a["uuid"] for a in get.json()["items"]] == matching
+
 
-#     # Read them back
-#     get = client.get("/api/alert/")
-#     assert get.status_code == status.HTTP_200_OK
-#     assert len(get.json()) == 2
+def test_get_all_query_count(client):
+    create_lookups(client)
+    client.post("/api/node/tag/", json={"value": "test_tag"})
 
+    def count_queries() -> int:
+        queries = []
+        listener = lambda *args: queries.append(args)  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        client.get("/api/alert/")
+        event.remove(engine, "before_cursor_execute", listener)
+        return len(queries)
 
-# def test_get_all_empty(client):
-#     get = client.get("/api/alert/module_type/")
-#     assert get.status_code == status.HTTP_200_OK
-#     assert get.json() == []
+    # The relationships of every alert on the page are loaded together, so more alerts do not need more queries
+    create_alerts(client, 1, tags=["test_tag"])
+    single = count_queries()
+    create_alerts(client, 4, tags=["test_tag"])
+    assert count_queries() == single
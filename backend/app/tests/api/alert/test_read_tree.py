@@ -0,0 +1,173 @@
+import pytest
+import uuid
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from db.database import engine
+
+
+def create_lookups(client: TestClient):
+    """
+    Helper function to create the lookup values used by the alert trees in these tests.
+    """
+
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    client.post("/api/node/tag/", json={"value": "test_tag"})
+
+
+def create_alert_tree(client: TestClient, observable_count: int = 1) -> dict:
+    """
+    Helper function to create an alert whose analysis discovered the given number of observable instances. The first
+    observable instance has an analysis performed on it, which discovered one more observable instance. Returns the
+    UUIDs assigned to the tree.
+    """
+
+    discovered_observables = [{"type": "test_type", "value": f"test{i}"} for i in range(observable_count)]
+    discovered_observables[0]["tags"] = ["test_tag"]
+    discovered_observables[0]["analyses"] = [
+        {"summary": "child", "discovered_observables": [{"type": "test_type", "value": "grandchild"}]}
+    ]
+
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": discovered_observables},
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    assert create.status_code == status.HTTP_201_CREATED
+    return create.json()
+
+
+#
+# INVALID TESTS
+#
+
+
+def test_get_tree_invalid_uuid(client):
+    get = client.get("/api/alert/1/tree")
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        (-1),
+        ("abc"),
+    ],
+)
+def test_get_tree_invalid_max_depth(client, value):
+    get = client.get(f"/api/alert/{uuid.uuid4()}/tree?max_depth={value}")
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_tree_nonexistent_uuid(client):
+    get = client.get(f"/api/alert/{uuid.uuid4()}/tree")
+    assert get.status_code == status.HTTP_404_NOT_FOUND
+
+
+#
+# VALID TESTS
+#
+
+
+def test_get_tree(client):
+    create_lookups(client)
+    uuids = create_alert_tree(client)
+
+    get = client.get(f"/api/alert/{uuids['uuid']}/tree")
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["uuid"] == uuids["uuid"]
+    assert get.json()["queue"]["value"] == "test_queue"
+
+    # Walk down the tree
+    analysis = get.json()["analysis"]
+    assert analysis["uuid"] == uuids["analysis"]["uuid"]
+    assert analysis["parent_observable_uuid"] is None
+    assert analysis["discovered_observable_uuids"] == [o["uuid"] for o in analysis["children"]]
+
+    observable_instance = analysis["children"][0]
+    assert observable_instance["observable"]["value"] == "test0"
+    assert observable_instance["parent_analysis_uuid"] == analysis["uuid"]
+    assert [t["value"] for t in observable_instance["tags"]] == ["test_tag"]
+
+    child_analysis = observable_instance["children"][0]
+    assert observable_instance["performed_analysis_uuids"] == [child_analysis["uuid"]]
+    assert child_analysis["summary"] == "child"
+    assert child_analysis["parent_observable_uuid"] == observable_instance["uuid"]
+
+    grandchild = child_analysis["children"][0]
+    assert grandchild["observable"]["value"] == "grandchild"
+    assert grandchild["children"] == []
+    assert grandchild["performed_analysis_uuids"] == []
+
+
+@pytest.mark.parametrize(
+    "max_depth",
+    [
+        (0),
+        (1),
+        (2),
+    ],
+)
+def test_get_tree_max_depth(client, max_depth):
+    create_lookups(client)
+    uuids = create_alert_tree(client)
+
+    get = client.get(f"/api/alert/{uuids['uuid']}/tree?max_depth={max_depth}")
+    assert get.status_code == status.HTTP_200_OK
+
+    # Follow the first child down to the deepest node that was returned
+    node = get.json()["analysis"]
+    for _ in range(max_depth):
+        node = node["children"][0]
+
+    # The tree is cut off at the maximum depth, but the node still lists the UUIDs of its children
+    assert node["children"] == []
+    if max_depth % 2 == 0:
+        assert len(node["discovered_observable_uuids"]) == 1
+    else:
+        assert len(node["performed_analysis_uuids"]) == 1
+
+
+def test_get_tree_cycle(client):
+    create_lookups(client)
+    uuids = create_alert_tree(client)
+    grandchild_uuid = uuids["analysis"]["discovered_observables"][0]["analyses"][0]["discovered_observables"][0]["uuid"]
+
+    # Add the alert's analysis as an analysis performed on an observable instance deep inside of its own tree
+    get = client.get(f"/api/observable/instance/{grandchild_uuid}")
+    update = client.patch(
+        f"/api/observable/instance/{grandchild_uuid}",
+        json={"performed_analysis_uuids": [uuids["analysis"]["uuid"]], "version": get.json()["version"]},
+    )
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+
+    # The tree stops at the observable instance instead of looping forever
+    get = client.get(f"/api/alert/{uuids['uuid']}/tree")
+    assert get.status_code == status.HTTP_200_OK
+    grandchild = get.json()["analysis"]["children"][0]["children"][0]["children"][0]
+    assert grandchild["performed_analysis_uuids"] == [uuids["analysis"]["uuid"]]
+    assert grandchild["children"] == []
+
+
+def test_get_tree_query_count(client):
+    create_lookups(client)
+
+    def count_queries(observable_count: int) -> int:
+        uuids = create_alert_tree(client, observable_count=observable_count)
+
+        queries = []
+        listener = lambda *args: queries.append(args)  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        get = client.get(f"/api/alert/{uuids['uuid']}/tree")
+        event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(get.json()["analysis"]["children"]) == observable_count
+        return len(queries)
+
+    # Reading a tree with many more observable instances does not take any more queries
+    assert count_queries(observable_count=1) == count_queries(observable_count=10)
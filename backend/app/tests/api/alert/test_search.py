@@ -0,0 +1,323 @@
+import pytest
+import uuid
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from api.routes.alert_search import alert_search_statements
+from db.database import engine
+
+
+def create_lookups(client: TestClient):
+    """
+    Helper function to create the lookup values used by the alerts in these tests.
+    """
+
+    client.post("/api/alert/disposition/", json={"value": "FALSE_POSITIVE", "rank": 1})
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/queue/", json={"value": "other_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/node/tag/", json={"value": "phish"})
+    client.post("/api/node/tag/", json={"value": "malware"})
+    client.post("/api/observable/type/", json={"value": "ipv4"})
+    client.post("/api/observable/type/", json={"value": "fqdn"})
+    client.post("/api/user/role/", json={"value": "test_role"})
+    client.post(
+        "/api/user/",
+        json={
+            "default_alert_queue": "test_queue",
+            "display_name": "John Doe",
+            "email": "john@test.com",
+            "password": "abcd1234",
+            "roles": ["test_role"],
+            "username": "johndoe",
+        },
+    )
+
+
+def create_alert(client: TestClient, name: str, observables: list, **kwargs) -> str:
+    create_json = {
+        "name": name,
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{"type": t, "value": v} for t, v in observables]},
+        **kwargs,
+    }
+    return client.post("/api/alert/tree", json=create_json).json()["uuid"]
+
+
+def create_alerts(client: TestClient) -> dict:
+    create_lookups(client)
+
+    alerts = {
+        "phish": create_alert(client, "Phishing email", [("fqdn", "evil.example.com")], tags=["phish"]),
+        "malware": create_alert(
+            client, "Malware download", [("ipv4", "10.0.0.1"), ("fqdn", "cdn.example.com")], tags=["malware"]
+        ),
+        "owned": create_alert(client, "Owned scan", [("ipv4", "10.0.0.2")], owner="johndoe"),
+        "other": create_alert(client, "Other queue", [("ipv4", "10.0.0.1")], queue="other_queue"),
+    }
+
+    # Disposition the owned alert
+    get = client.get(f"/api/alert/{alerts['owned']}").json()
+    client.patch(f"/api/alert/{alerts['owned']}", json={"disposition": "FALSE_POSITIVE", "version": get["version"]})
+
+    return alerts
+
+
+def search(client: TestClient, filter: dict, **kwargs):
+    return client.post("/api/alert/search", json={"filter": filter, **kwargs})
+
+
+def names(response) -> list:
+    return sorted(a["name"] for a in response.json()["items"])
+
+
+#
+# INVALID TESTS
+#
+
+
+@pytest.mark.parametrize(
+    "filter",
+    [
+        ({}),
+        ({"and": []}),
+        ({"or": "abc"}),
+        ({"not": [{"field": "tag", "op": "eq", "value": "phish"}]}),
+        ({"and": [{"field": "tag", "op": "eq", "value": "phish"}], "or": []}),
+        ({"field": "abc", "op": "eq", "value": "phish"}),
+        ({"field": "tag", "op": "abc", "value": "phish"}),
+        ({"field": "tag", "op": "eq"}),
+        ({"field": "tag", "op": "eq", "value": ["phish"]}),
+        ({"field": "tag", "op": "in", "value": "phish"}),
+        ({"field": "tag", "op": "in", "value": []}),
+        ({"field": "tag", "op": "eq", "type": "ipv4", "value": "phish"}),
+        ({"field": "disposition", "op": "is_null", "value": "FALSE_POSITIVE"}),
+        ({"field": "observable", "op": "eq", "value": "10.0.0.1"}),
+        ({"field": "name", "op": "contains", "value": ""}),
+    ],
+)
+def test_search_invalid_filter(client, filter):
+    assert search(client, filter).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("cursor", "abc"),
+        ("limit", 0),
+        ("limit", 1001),
+        ("sort", "abc"),
+    ],
+)
+def test_search_invalid_fields(client, key, value):
+    create_lookups(client)
+    response = search(client, {"field": "queue", "op": "eq", "value": "test_queue"}, **{key: value})
+    assert response.status_code in (status.HTTP_400_BAD_REQUEST, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+@pytest.mark.parametrize(
+    "filter",
+    [
+        # Operators that cannot use an index for the field
+        ({"field": "insert_time", "op": "eq", "value": "2022-01-01T00:00:00Z"}),
+        ({"field": "name", "op": "eq", "value": "Phishing email"}),
+        ({"field": "queue", "op": "is_null"}),
+        ({"field": "tag", "op": "contains", "value": "phish"}),
+        # Trigram indices need at least three characters
+        ({"field": "name", "op": "contains", "value": "ph"}),
+        ({"field": "observable", "op": "contains", "type": "ipv4", "value": "10"}),
+        # Filters that would have to read every alert
+        ({"not": {"field": "tag", "op": "eq", "value": "phish"}}),
+        ({"and": [{"not": {"field": "tag", "op": "eq", "value": "phish"}}]}),
+        (
+            {
+                "or": [
+                    {"field": "tag", "op": "eq", "value": "phish"},
+                    {"not": {"field": "queue", "op": "eq", "value": "test_queue"}},
+                ]
+            }
+        ),
+        # Values that cannot be parsed
+        ({"field": "insert_time", "op": "gt", "value": "Monday"}),
+        ({"field": "event_uuid", "op": "eq", "value": "abc"}),
+    ],
+)
+def test_search_refused_filter(client, filter):
+    create_lookups(client)
+    assert search(client, filter).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "filter",
+    [
+        ({"field": "disposition", "op": "eq", "value": "abc"}),
+        ({"field": "observable", "op": "eq", "type": "abc", "value": "10.0.0.1"}),
+        ({"field": "owner", "op": "eq", "value": "abc"}),
+        ({"field": "tag", "op": "in", "value": ["phish", "abc"]}),
+    ],
+)
+def test_search_nonexistent_values(client, filter):
+    create_lookups(client)
+    assert search(client, filter).status_code == status.HTTP_404_NOT_FOUND
+
+
+#
+# VALID TESTS
+#
+
+
+@pytest.mark.parametrize(
+    "filter,expected",
+    [
+        ({"field": "queue", "op": "eq", "value": "test_queue"}, ["Malware download", "Owned scan", "Phishing email"]),
+        ({"field": "queue", "op": "in", "value": ["test_queue", "other_queue"]}, 4),
+        ({"field": "tag", "op": "eq", "value": "phish"}, ["Phishing email"]),
+        ({"field": "tag", "op": "in", "value": ["phish", "malware"]}, ["Malware download", "Phishing email"]),
+        ({"field": "disposition", "op": "eq", "value": "FALSE_POSITIVE"}, ["Owned scan"]),
+        ({"field": "disposition", "op": "is_null"}, ["Malware download", "Other queue", "Phishing email"]),
+        ({"field": "owner", "op": "eq", "value": "johndoe"}, ["Owned scan"]),
+        ({"field": "name", "op": "contains", "value": "SCAN"}, ["Owned scan"]),
+        ({"field": "name", "op": "contains", "value": "%_%"}, []),
+        ({"field": "insert_time", "op": "gt", "value": "2000-01-01T00:00:00Z"}, 4),
+        ({"field": "insert_time", "op": "lt", "value": "2000-01-01T00:00:00Z"}, []),
+        ({"field": "observable", "op": "eq", "type": "ipv4", "value": "10.0.0.1"}, ["Malware download", "Other queue"]),
+        ({"field": "observable", "op": "eq", "type": "fqdn", "value": "10.0.0.1"}, []),
+        (
+            {"field": "observable", "op": "contains", "type": "fqdn", "value": "example.com"},
+            ["Malware download", "Phishing email"],
+        ),
+        (
+            {"field": "observable", "op": "in", "type": "ipv4", "value": ["10.0.0.2", "10.0.0.3"]},
+            ["Owned scan"],
+        ),
+        (
+            {
+                "and": [
+                    {"field": "insert_time", "op": "gte", "value": "2000-01-01T00:00:00Z"},
+                    {"field": "disposition", "op": "is_null"},
+                    {"field": "observable", "op": "eq", "type": "ipv4", "value": "10.0.0.1"},
+                    {"not": {"field": "queue", "op": "eq", "value": "other_queue"}},
+                ]
+            },
+            ["Malware download"],
+        ),
+        (
+            {
+                "or": [
+                    {"field": "tag", "op": "eq", "value": "phish"},
+                    {"field": "owner", "op": "eq", "value": "johndoe"},
+                ]
+            },
+            ["Owned scan", "Phishing email"],
+        ),
+        (
+            {
+                "and": [
+                    {"field": "queue", "op": "eq", "value": "test_queue"},
+                    {
+                        "not": {
+                            "or": [
+                                {"field": "tag", "op": "eq", "value": "phish"},
+                                {"field": "owner", "op": "is_null"},
+                            ]
+                        }
+                    },
+                ]
+            },
+            ["Owned scan"],
+        ),
+    ],
+)
+def test_search(client, filter, expected):
+    create_alerts(client)
+
+    response = search(client, filter)
+    assert response.status_code == status.HTTP_200_OK
+    if isinstance(expected, int):
+        assert len(response.json()["items"]) == expected
+    else:
+        assert names(response) == expected
+
+
+def test_search_pagination(client):
+    create_alerts(client)
+    filter = {"field": "queue", "op": "in", "value": ["test_queue", "other_queue"]}
+
+    page1 = search(client, filter, limit=3)
+    assert len(page1.json()["items"]) == 3
+    assert page1.json()["next_cursor"]
+
+    page2 = search(client, filter, limit=3, cursor=page1.json()["next_cursor"])
+    assert len(page2.json()["items"]) == 1
+    assert page2.json()["next_cursor"] is None
+
+    uuids = [a["uuid"] for a in page1.json()["items"] + page2.json()["items"]]
+    assert len(set(uuids)) == 4
+
+
+def test_search_after_failed_read(client):
+    # Binding the search values used to clone the entire ORM statement. After a read like this one, the clone selected
+    # the alert's tables twice.
+    assert client.get(f"/api/alert/{uuid.uuid4()}/tree").status_code == status.HTTP_404_NOT_FOUND
+    create_alerts(client)
+
+    response = search(client, {"field": "queue", "op": "eq", "value": "other_queue"})
+    assert response.status_code == status.HTTP_200_OK
+    assert names(response) == ["Other queue"]
+
+
+def test_search_statement_cache(client):
+    create_alerts(client)
+
+    # Searches with the same shape share a statement no matter what values they search for
+    search(client, {"field": "tag", "op": "in", "value": ["phish"]})
+    before = alert_search_statements.stats()
+
+    response = search(client, {"field": "tag", "op": "in", "value": ["phish", "malware"]})
+    assert names(response) == ["Malware download", "Phishing email"]
+    assert alert_search_statements.stats()["hits"] == before["hits"] + 1
+
+    # A different shape builds a new statement
+    search(
+        client,
+        {
+            "or": [
+                {"field": "tag", "op": "in", "value": ["phish"]},
+                {"field": "fingerprint", "op": "in", "value": ["abc", "def"]},
+            ]
+        },
+    )
+    assert alert_search_statements.stats()["misses"] == before["misses"] + 1
+
+
+def test_search_query_count(client):
+    create_alerts(client)
+    filter = {
+        "and": [
+            {"field": "tag", "op": "eq", "value": "phish"},
+            {"field": "observable", "op": "contains", "type": "fqdn", "value": "example.com"},
+        ]
+    }
+
+    # Warm up the lookup cache
+    search(client, filter)
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # The alerts are matched with a single statement using EXISTS subqueries
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = search(client, filter)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert names(response) == ["Phishing email"]
+    matching = [s for s in statements if "node_tag_mapping" in s and "observable_instance" in s]
+    assert len(matching) == 1
+    assert matching[0].count("EXISTS") == 2
@@ -2,6 +2,9 @@ import pytest
 import uuid
 
 from fastapi import status
+from sqlalchemy import event
+
+from db.database import engine
 
 from tests.api.node import (
     INVALID_UPDATE_FIELDS,
@@ -126,11 +129,80 @@ def test_update_nonexistent_uuid(client):
     assert update.status_code == status.HTTP_404_NOT_FOUND
 
 
+def test_update_version_mismatch(client):
+    # Create an alert queue and type
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/queue/", json={"value": "other_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+
+    # Create an alert
+    version = str(uuid.uuid4())
+    create = client.post("/api/alert/", json={"version": version, "queue": "test_queue", "type": "test_type"})
+
+    # Two updates using the same version should not both succeed
+    update = client.patch(create.headers["Content-Location"], json={"name": "first", "version": version})
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+
+    update = client.patch(create.headers["Content-Location"], json={"queue": "other_queue", "version": version})
+    assert update.status_code == status.HTTP_409_CONFLICT
+
+    # The alert should only have the changes from the first update
+    get = client.get(create.headers["Content-Location"])
+    assert get.json()["name"] == "first"
+    assert get.json()["queue"]["value"] == "test_queue"
+
+
+def test_update_wrong_node_type(client):
+    # Create an alert queue and type
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+
+    # Create an alert
+    version = str(uuid.uuid4())
+    create = client.post("/api/alert/", json={"version": version, "queue": "test_queue", "type": "test_type"})
+
+    # The alert's analysis cannot be updated using the alert endpoint
+    analysis = client.get(create.headers["Content-Location"]).json()["analysis"]
+    update = client.patch(f"/api/alert/{analysis['uuid']}", json={"name": "test", "version": analysis["version"]})
+    assert update.status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(f"/api/analysis/{analysis['uuid']}").json()["version"] == analysis["version"]
+
+
 #
 # VALID TESTS
 #
 
 
+def test_update_query_count(client):
+    # Create an alert queue and type
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/queue/", json={"value": "other_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+
+    # Create an alert
+    version = str(uuid.uuid4())
+    create = client.post("/api/alert/", json={"version": version, "queue": "test_queue", "type": "test_type"})
+
+    # Create a second alert so that the other alert queue is cached
+    client.post("/api/alert/", json={"queue": "other_queue", "type": "test_type"})
+
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # The alert queue is already cached, so the update only needs the single UPDATE statement and the statement that
+    # notifies the alert stream
+    event.listen(engine, "before_cursor_execute", listener)
+    update = client.patch(create.headers["Content-Location"], json={"queue": "other_queue", "version": version})
+    event.remove(engine, "before_cursor_execute", listener)
+
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+    statements = [s for s in statements if not s.lstrip().upper().startswith(("SAVEPOINT", "RELEASE"))]
+    assert len(statements) == 2
+    assert "pg_notify" in statements[1]
+
+
 def test_update_disposition(client):
     # Create an alert queue and type
     client.post("/api/alert/queue/", json={"value": "test_queue"})
@@ -206,6 +278,19 @@ def test_update_event_uuid(client):
     # Additionally, adding the alert to the event should trigger the event to have a new version.
     assert get_event.json()["version"] != initial_event_version
 
+    # Moving the alert to another event counts as modifying the event it was removed from as well
+    other_event = client.post("/api/event/", json={"name": "other", "status": "OPEN"})
+    other_event_uuid = client.get(other_event.headers["Content-Location"]).json()["uuid"]
+    update = client.patch(
+        create.headers["Content-Location"],
+        json={"event_uuid": other_event_uuid, "version": get.json()["version"]}
+    )
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+
+    get_event_after = client.get(event_create.headers["Content-Location"])
+    assert get_event_after.json()["alert_uuids"] == []
+    assert get_event_after.json()["version"] != get_event.json()["version"]
+
 
 def test_update_owner(client):
     # Create an alert queue and type
@@ -363,6 +448,83 @@ def test_update_type(client):
     assert get.json()["version"] != version
 
 
+@pytest.mark.parametrize(
+    "key,create_path,create_json,value",
+    [
+        ("disposition", "/api/alert/disposition/", {"rank": 1, "value": "test"}, "test"),
+        ("owner", None, None, "johndoe"),
+        ("tool", "/api/alert/tool/", {"value": "test"}, "test"),
+        ("tool_instance", "/api/alert/tool/instance/", {"value": "test"}, "test"),
+    ],
+)
+def test_update_clear(client, key, create_path, create_json, value):
+    # Create an alert queue and type
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+
+    # Create the value the field is set to
+    if create_path:
+        client.post(create_path, json=create_json)
+    else:
+        client.post("/api/user/role/", json={"value": "test_role"})
+        client.post(
+            "/api/user/",
+            json={
+                "default_alert_queue": "test_queue",
+                "display_name": "John Doe",
+                "email": "john@test.com",
+                "password": "abcd1234",
+                "roles": ["test_role"],
+                "username": "johndoe",
+            },
+        )
+
+    # Create an alert and set the field
+    version = str(uuid.uuid4())
+    create = client.post("/api/alert/", json={"version": version, "queue": "test_queue", "type": "test_type"})
+    client.patch(create.headers["Content-Location"], json={key: value, "version": version})
+    get = client.get(create.headers["Content-Location"])
+    assert get.json()[key] is not None
+
+    # Clear the field
+    update = client.patch(create.headers["Content-Location"], json={key: None, "version": get.json()["version"]})
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+
+    # Read it back
+    cleared = client.get(create.headers["Content-Location"])
+    assert cleared.json()[key] is None
+    assert cleared.json()["version"] != get.json()["version"]
+
+
+def test_update_clear_event_uuid(client):
+    # Create an alert queue and type and an event status
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/event/status/", json={"value": "OPEN"})
+
+    # Create an alert in an event
+    event_create = client.post("/api/event/", json={"name": "test", "status": "OPEN"})
+    event = client.get(event_create.headers["Content-Location"]).json()
+    version = str(uuid.uuid4())
+    create = client.post("/api/alert/", json={"version": version, "queue": "test_queue", "type": "test_type"})
+    client.patch(create.headers["Content-Location"], json={"event_uuid": event["uuid"], "version": version})
+    get = client.get(create.headers["Content-Location"])
+    event = client.get(event_create.headers["Content-Location"]).json()
+    assert event["alert_uuids"] == [get.json()["uuid"]]
+
+    # Remove the alert from the event
+    update = client.patch(
+        create.headers["Content-Location"], json={"event_uuid": None, "version": get.json()["version"]}
+    )
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+
+    # Read it back. Removing the alert counts as editing the event as well.
+    assert client.get(create.headers["Content-Location"]).json()["event_uuid"] is None
+    get_event = client.get(event_create.headers["Content-Location"])
+    assert get_event.json()["alert_uuids"] == []
+    assert get_event.json()["version"] != event["version"]
+
+
 @pytest.mark.parametrize(
     "values",
     VALID_DIRECTIVES,
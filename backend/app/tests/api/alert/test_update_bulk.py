@@ -0,0 +1,203 @@
+import pytest
+import uuid
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from db.database import engine
+
+
+def create_lookups(client: TestClient):
+    """
+    Helper function to create the lookup values used by the alerts in these tests.
+    """
+
+    client.post("/api/alert/disposition/", json={"rank": 1, "value": "FALSE_POSITIVE"})
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/queue/", json={"value": "other_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/user/role/", json={"value": "test_role"})
+    client.post(
+        "/api/user/",
+        json={
+            "default_alert_queue": "test_queue",
+            "display_name": "John Doe",
+            "email": "john@test.com",
+            "password": "abcd1234",
+            "roles": ["test_role"],
+            "username": "johndoe",
+        },
+    )
+
+
+def create_alerts(client: TestClient, count: int) -> list:
+    """
+    Helper function to create alerts and return their (uuid, version) pairs.
+    """
+
+    alerts = []
+    for _ in range(count):
+        alert = {"uuid": str(uuid.uuid4()), "version": str(uuid.uuid4())}
+        client.post("/api/alert/", json={**alert, "queue": "test_queue", "type": "test_type"})
+        alerts.append(alert)
+
+    return alerts
+
+
+#
+# INVALID TESTS
+#
+
+
+@pytest.mark.parametrize(
+    "update_json",
+    [
+        {"disposition": "FALSE_POSITIVE"},
+        {"alerts": [], "disposition": "FALSE_POSITIVE"},
+        {"alerts": [{"uuid": "abc", "version": str(uuid.uuid4())}], "disposition": "FALSE_POSITIVE"},
+        {"alerts": [{"uuid": str(uuid.uuid4())}], "disposition": "FALSE_POSITIVE"},
+        {"alerts": [{"uuid": str(uuid.uuid4()), "version": str(uuid.uuid4())}]},
+        {"alerts": [{"uuid": str(uuid.uuid4()), "version": str(uuid.uuid4())}], "disposition": ""},
+        {"alerts": [{"uuid": str(uuid.uuid4()), "version": str(uuid.uuid4())}], "event_uuid": "abc"},
+        {"alerts": [{"uuid": str(uuid.uuid4()), "version": str(uuid.uuid4())}], "owner": ""},
+        {"alerts": [{"uuid": str(uuid.uuid4()), "version": str(uuid.uuid4())}], "queue": None},
+    ],
+)
+def test_update_bulk_invalid_fields(client, update_json):
+    update = client.patch("/api/alert/bulk", json=update_json)
+    assert update.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("disposition", "abc"),
+        ("event_uuid", str(uuid.uuid4())),
+        ("owner", "janedoe"),
+        ("queue", "abc"),
+    ],
+)
+def test_update_bulk_nonexistent_fields(client, key, value):
+    create_lookups(client)
+    alerts = create_alerts(client, 1)
+
+    update = client.patch("/api/alert/bulk", json={"alerts": alerts, key: value})
+    assert update.status_code == status.HTTP_404_NOT_FOUND
+
+    # The alert should not have been changed
+    get = client.get(f"/api/alert/{alerts[0]['uuid']}")
+    assert get.json()["version"] == alerts[0]["version"]
+
+
+#
+# VALID TESTS
+#
+
+
+def test_update_bulk_disposition(client):
+    create_lookups(client)
+    alerts = create_alerts(client, 3)
+
+    update = client.patch("/api/alert/bulk", json={"alerts": alerts, "disposition": "FALSE_POSITIVE"})
+    assert update.status_code == status.HTTP_200_OK
+    assert update.json()["conflicts"] == []
+    assert update.json()["not_found"] == []
+    assert sorted(a["uuid"] for a in update.json()["updated"]) == sorted(a["uuid"] for a in alerts)
+
+    # Every alert should have the disposition and the new version that was reported for it
+    for updated in update.json()["updated"]:
+        get = client.get(f"/api/alert/{updated['uuid']}")
+        assert get.json()["disposition"]["value"] == "FALSE_POSITIVE"
+        assert get.json()["version"] == updated["version"]
+        assert get.json()["version"] not in [a["version"] for a in alerts]
+
+    # The disposition can be cleared using the new versions
+    update = client.patch("/api/alert/bulk", json={"alerts": update.json()["updated"], "disposition": None})
+    assert len(update.json()["updated"]) == 3
+    for alert in alerts:
+        assert client.get(f"/api/alert/{alert['uuid']}").json()["disposition"] is None
+
+
+def test_update_bulk_owner_and_queue(client):
+    create_lookups(client)
+    alerts = create_alerts(client, 2)
+
+    update = client.patch("/api/alert/bulk", json={"alerts": alerts, "owner": "johndoe", "queue": "other_queue"})
+    assert len(update.json()["updated"]) == 2
+
+    for alert in alerts:
+        get = client.get(f"/api/alert/{alert['uuid']}")
+        assert get.json()["owner"]["username"] == "johndoe"
+        assert get.json()["queue"]["value"] == "other_queue"
+
+    # The owner can be cleared
+    update = client.patch("/api/alert/bulk", json={"alerts": update.json()["updated"], "owner": None})
+    for alert in alerts:
+        get = client.get(f"/api/alert/{alert['uuid']}")
+        assert get.json()["owner"] is None
+        assert get.json()["queue"]["value"] == "other_queue"
+
+
+def test_update_bulk_event_uuid(client):
+    create_lookups(client)
+    client.post("/api/event/status/", json={"value": "OPEN"})
+    alerts = create_alerts(client, 2)
+
+    event_uuid = str(uuid.uuid4())
+    event_version = str(uuid.uuid4())
+    client.post("/api/event/", json={"name": "test", "status": "OPEN", "uuid": event_uuid, "version": event_version})
+
+    update = client.patch("/api/alert/bulk", json={"alerts": alerts, "event_uuid": event_uuid})
+    assert len(update.json()["updated"]) == 2
+
+    for alert in alerts:
+        assert client.get(f"/api/alert/{alert['uuid']}").json()["event_uuid"] == event_uuid
+
+    # Adding alerts to the event counts as editing the event
+    assert client.get(f"/api/event/{event_uuid}").json()["version"] != event_version
+
+
+def test_update_bulk_conflicts(client):
+    create_lookups(client)
+    alerts = create_alerts(client, 3)
+
+    # Change the version of one of the alerts and include an alert that does not exist
+    stale = {"uuid": alerts[0]["uuid"], "version": str(uuid.uuid4())}
+    nonexistent = {"uuid": str(uuid.uuid4()), "version": str(uuid.uuid4())}
+    update = client.patch(
+        "/api/alert/bulk",
+        json={"alerts": [stale, alerts[1], alerts[2], nonexistent], "disposition": "FALSE_POSITIVE"},
+    )
+    assert update.status_code == status.HTTP_200_OK
+    assert sorted(a["uuid"] for a in update.json()["updated"]) == sorted([alerts[1]["uuid"], alerts[2]["uuid"]])
+    assert update.json()["conflicts"] == [stale["uuid"]]
+    assert update.json()["not_found"] == [nonexistent["uuid"]]
+
+    # The conflicting alert should not have been changed
+    get = client.get(f"/api/alert/{stale['uuid']}")
+    assert get.json()["disposition"] is None
+    assert get.json()["version"] == alerts[0]["version"]
+
+    # Repeating the request reports every alert as a conflict since they all have new versions now
+    update = client.patch("/api/alert/bulk", json={"alerts": alerts[1:], "disposition": "FALSE_POSITIVE"})
+    assert update.json()["updated"] == []
+    assert sorted(update.json()["conflicts"]) == sorted([alerts[1]["uuid"], alerts[2]["uuid"]])
+
+
+def test_update_bulk_query_count(client):
+    create_lookups(client)
+    alerts = create_alerts(client, 50)
+
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    update = client.patch("/api/alert/bulk", json={"alerts": alerts, "disposition": "FALSE_POSITIVE"})
+    event.remove(engine, "before_cursor_execute", listener)
+
+    # Every alert is updated with a single statement no matter how many alerts there are
+    assert len(update.json()["updated"]) == 50
+    assert len([s for s in statements if s.lstrip().upper().startswith(("UPDATE", "WITH"))]) == 1
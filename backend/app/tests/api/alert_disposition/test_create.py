@@ -14,6 +14,8 @@ from fastapi import status
     [
         ("description", 123),
         ("description", ""),
+        ("malicious", 1),
+        ("malicious", None),
         ("rank", 1.234),
         ("rank", "123"),
         ("rank", None),
@@ -79,6 +81,7 @@ def test_create_missing_required_fields(client, key):
     [
         ("description", None),
         ("description", "test"),
+        ("malicious", True),
         ("uuid", str(uuid.uuid4()))
     ],
 )
@@ -14,6 +14,8 @@ from fastapi import status
     [
         ("description", 123),
         ("description", ""),
+        ("malicious", 1),
+        ("malicious", None),
         ("rank", 1.234),
         ("rank", "123"),
         ("rank", None),
@@ -67,6 +69,8 @@ def test_update_nonexistent_uuid(client):
     [
         ("description", None, "test"),
         ("description", "test", "test"),
+        ("malicious", False, True),
+        ("malicious", True, True),
         ("rank", 1, 2),
         ("rank", 1, 1),
         ("value", "test", "test2"),
@@ -1,6 +1,9 @@
 import uuid
 
 from fastapi import status
+from sqlalchemy import event
+
+from db.database import engine
 
 
 #
@@ -38,3 +41,38 @@ def test_get_all_empty(client):
     get = client.get("/api/alert/queue/")
     assert get.status_code == status.HTTP_200_OK
     assert get.json() == []
+
+
+def test_get_all_snapshot(client):
+    create = client.post("/api/alert/queue/", json={"value": "test"})
+    get = client.get("/api/alert/queue/")
+    assert get.headers["Cache-Control"] == "public, no-cache"
+    etag = get.headers["ETag"]
+
+    # The list is served from the snapshot without querying the database
+    queries = []
+    listener = lambda *args: queries.append(args)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    cached = client.get("/api/alert/queue/")
+    not_modified = client.get("/api/alert/queue/", headers={"If-None-Match": etag})
+    event.remove(engine, "before_cursor_execute", listener)
+
+    assert queries == []
+    assert cached.json() == get.json()
+    assert cached.headers["ETag"] == etag
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.content == b""
+
+    # Creating, updating, and deleting queues all replace the snapshot
+    client.post("/api/alert/queue/", json={"value": "test2"})
+    get = client.get("/api/alert/queue/", headers={"If-None-Match": etag})
+    assert get.status_code == status.HTTP_200_OK
+    assert sorted(q["value"] for q in get.json()) == ["test", "test2"]
+
+    client.patch(create.headers["Content-Location"], json={"value": "test3"})
+    get = client.get("/api/alert/queue/")
+    assert sorted(q["value"] for q in get.json()) == ["test2", "test3"]
+
+    client.delete(create.headers["Content-Location"])
+    get = client.get("/api/alert/queue/")
+    assert [q["value"] for q in get.json()] == ["test2"]
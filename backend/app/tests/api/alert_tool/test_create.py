@@ -12,6 +12,8 @@ from fastapi import status
 @pytest.mark.parametrize(
     "key,value",
     [
+        ("dedup_window", 0),
+        ("dedup_window", "abc"),
         ("description", 123),
         ("description", ""),
         ("uuid", None),
@@ -70,6 +72,8 @@ def test_create_missing_required_fields(client, key):
 @pytest.mark.parametrize(
     "key,value",
     [
+        ("dedup_window", None),
+        ("dedup_window", 300),
         ("description", None),
         ("description", "test"),
         ("uuid", str(uuid.uuid4()))
@@ -12,6 +12,8 @@ from fastapi import status
 @pytest.mark.parametrize(
     "key,value",
     [
+        ("dedup_window", 0),
+        ("dedup_window", "abc"),
         ("description", 123),
         ("description", ""),
         ("value", 123),
@@ -61,6 +63,8 @@ def test_update_nonexistent_uuid(client):
 @pytest.mark.parametrize(
     "key,initial_value,updated_value",
     [
+        ("dedup_window", None, 300),
+        ("dedup_window", 300, None),
         ("description", None, "test"),
         ("description", "test", "test"),
         ("value", "test", "test2"),
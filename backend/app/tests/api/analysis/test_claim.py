@@ -0,0 +1,173 @@
+import pytest
+import time
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+
+def create_lookups(client: TestClient):
+    """
+    Helper function to create the lookup values used by the alerts and analysis module types in these tests.
+    """
+
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/node/directive/", json={"value": "sandbox"})
+    client.post("/api/node/tag/", json={"value": "suspicious"})
+    client.post("/api/observable/type/", json={"value": "ipv4"})
+    client.post("/api/observable/type/", json={"value": "url"})
+
+
+def create_module_type(client: TestClient, **kwargs) -> str:
+    create_json = {"value": "test_module", "version": "1.0.0", **kwargs}
+    create = client.post("/api/analysis/module_type/", json=create_json)
+    assert create.status_code == status.HTTP_201_CREATED
+    return create.headers["content-location"].split("/")[-1]
+
+
+def create_alert(client: TestClient, observables: list) -> dict:
+    """
+    Helper function to create an alert containing the given observables. The observables are given increasing times
+    so that the order they are claimed in is predictable.
+    """
+
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {
+            "discovered_observables": [
+                {"time": f"2021-01-01T00:00:{i:02}+00:00", **o} for i, o in enumerate(observables)
+            ]
+        },
+    }
+    return client.post("/api/alert/tree", json=create_json).json()
+
+
+def claim(client: TestClient, **kwargs):
+    claim_json = {"analysis_module_type": "test_module", "analysis_module_type_version": "1.0.0", **kwargs}
+    return client.post("/api/analysis/work/claim", json=claim_json)
+
+
+#
+# INVALID TESTS
+#
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("analysis_module_type", 123),
+        ("analysis_module_type", ""),
+        ("analysis_module_type", None),
+        ("analysis_module_type_version", 123),
+        ("analysis_module_type_version", ""),
+        ("analysis_module_type_version", None),
+        ("lease_seconds", 0),
+        ("lease_seconds", 86401),
+        ("lease_seconds", "abc"),
+        ("limit", 0),
+        ("limit", 1001),
+        ("limit", "abc"),
+    ],
+)
+def test_claim_invalid_fields(client, key, value):
+    assert claim(client, **{key: value}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_claim_nonexistent_module_type(client):
+    create_lookups(client)
+    create_module_type(client)
+
+    assert claim(client, analysis_module_type_version="2.0.0").status_code == status.HTTP_404_NOT_FOUND
+    assert claim(client, analysis_module_type="abc").status_code == status.HTTP_404_NOT_FOUND
+
+
+#
+# VALID TESTS
+#
+
+
+def test_claim(client):
+    create_lookups(client)
+    create_module_type(client)
+    alert = create_alert(client, [{"type": "ipv4", "value": "127.0.0.1"}, {"type": "url", "value": "http://test"}])
+
+    claim1 = claim(client, limit=1)
+    assert claim1.status_code == status.HTTP_200_OK
+    assert len(claim1.json()) == 1
+    assert claim1.json()[0]["alert_uuid"] == alert["uuid"]
+    assert claim1.json()[0]["observable_instance_uuid"] == alert["analysis"]["discovered_observables"][0]["uuid"]
+    assert claim1.json()[0]["type"] == "ipv4"
+    assert claim1.json()[0]["value"] == "127.0.0.1"
+    assert claim1.json()[0]["expires_on"]
+
+    # The observable instance that is already claimed is not claimed again
+    claim2 = claim(client)
+    assert [c["value"] for c in claim2.json()] == ["http://test"]
+
+    # There is nothing left to claim
+    assert claim(client).json() == []
+
+
+def test_claim_filters(client):
+    create_lookups(client)
+    create_module_type(client, observable_types=["ipv4"], required_directives=["sandbox"], required_tags=["suspicious"])
+    create_alert(
+        client,
+        [
+            {"type": "ipv4", "value": "1.1.1.1"},
+            {"type": "ipv4", "value": "2.2.2.2", "directives": ["sandbox"]},
+            {"type": "ipv4", "value": "3.3.3.3", "tags": ["suspicious"]},
+            {"type": "ipv4", "value": "4.4.4.4", "directives": ["sandbox"], "tags": ["suspicious"]},
+            {"type": "url", "value": "http://test", "directives": ["sandbox"], "tags": ["suspicious"]},
+        ],
+    )
+
+    # Only the observable instance with the right type, directives, and tags is claimed
+    assert [c["value"] for c in claim(client).json()] == ["4.4.4.4"]
+
+
+def test_claim_other_module_type(client):
+    create_lookups(client)
+    create_module_type(client)
+    create_module_type(client, version="2.0.0")
+    create_alert(client, [{"type": "ipv4", "value": "127.0.0.1"}])
+
+    # Claims are per analysis module type, so another module type (or version) can claim the same observable instance
+    assert len(claim(client).json()) == 1
+    assert len(claim(client, analysis_module_type_version="2.0.0").json()) == 1
+
+
+def test_claim_expired_lease(client):
+    create_lookups(client)
+    create_module_type(client)
+    create_alert(client, [{"type": "ipv4", "value": "127.0.0.1"}])
+
+    claim1 = claim(client, lease_seconds=1)
+    assert len(claim1.json()) == 1
+
+    # Once the lease expires, another worker can claim the observable instance
+    time.sleep(1.1)
+    claim2 = claim(client)
+    assert len(claim2.json()) == 1
+    assert claim2.json()[0]["observable_instance_uuid"] == claim1.json()[0]["observable_instance_uuid"]
+    assert claim2.json()[0]["expires_on"] > claim1.json()[0]["expires_on"]
+
+
+def test_claim_analyzed(client):
+    create_lookups(client)
+    module_type_uuid = create_module_type(client)
+    create_alert(client, [{"type": "ipv4", "value": "127.0.0.1"}, {"type": "url", "value": "http://test"}])
+
+    claimed = claim(client, limit=1).json()
+    assert len(claimed) == 1
+
+    # Creating the analysis releases the claim, and the analyzed observable instance is never claimed again
+    create_json = {
+        "analysis_module_type": module_type_uuid,
+        "parent_observable_uuid": claimed[0]["observable_instance_uuid"],
+    }
+    create = client.post("/api/analysis/", json=create_json)
+    assert create.status_code == status.HTTP_201_CREATED
+
+    assert [c["value"] for c in claim(client).json()] == ["http://test"]
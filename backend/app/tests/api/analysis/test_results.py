@@ -0,0 +1,232 @@
+import pytest
+import uuid
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from db.database import engine
+from tests.api.analysis.test_claim import create_lookups, create_module_type
+
+
+def create_alert(client: TestClient) -> dict:
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{"type": "ipv4", "value": "127.0.0.1"}]},
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    return client.get(f"/api/alert/{create.json()['uuid']}").json()
+
+
+def discovered_observables(count: int) -> list:
+    return [{"type": "ipv4", "value": f"10.0.0.{i}", "tags": ["suspicious"]} for i in range(count)]
+
+
+#
+# INVALID TESTS
+#
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("discovered_observables", None),
+        ("discovered_observables", "abc"),
+        ("discovered_observables", [{"type": "ipv4"}]),
+        ("summary", ""),
+        ("version", None),
+        ("version", "abc"),
+    ],
+)
+def test_submit_invalid_fields(client, key, value):
+    submit = client.post(f"/api/analysis/{uuid.uuid4()}/results", json={"version": str(uuid.uuid4()), key: value})
+    assert submit.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_submit_nonexistent_uuid(client):
+    submit = client.post(f"/api/analysis/{uuid.uuid4()}/results", json={"version": str(uuid.uuid4())})
+    assert submit.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_submit_version_mismatch(client):
+    create_lookups(client)
+    alert = create_alert(client)
+
+    submit = client.post(
+        f"/api/analysis/{alert['analysis']['uuid']}/results",
+        json={"discovered_observables": discovered_observables(1), "version": str(uuid.uuid4())},
+    )
+    assert submit.status_code == status.HTTP_409_CONFLICT
+
+    # Nothing was written
+    get = client.get(f"/api/alert/{alert['uuid']}/tree")
+    assert len(get.json()["analysis"]["children"]) == 1
+
+
+def test_submit_nonexistent_observable_type(client):
+    create_lookups(client)
+    alert = create_alert(client)
+
+    submit = client.post(
+        f"/api/analysis/{alert['analysis']['uuid']}/results",
+        json={"discovered_observables": [{"type": "abc", "value": "abc"}], "version": alert["analysis"]["version"]},
+    )
+    assert submit.status_code == status.HTTP_404_NOT_FOUND
+
+
+#
+# VALID TESTS
+#
+
+
+def test_submit(client):
+    create_lookups(client)
+    module_type_uuid = create_module_type(client, extended_version='{"feed": "1"}')
+    alert = create_alert(client)
+    parent_observable_uuid = client.get(f"/api/alert/{alert['uuid']}/tree").json()["analysis"]["children"][0]["uuid"]
+
+    # The worker creates the analysis when it starts and submits everything it found when it finishes
+    analysis_uuid = str(uuid.uuid4())
+    analysis_version = str(uuid.uuid4())
+    create_json = {
+        "analysis_module_type": module_type_uuid,
+        "parent_observable_uuid": parent_observable_uuid,
+        "uuid": analysis_uuid,
+        "version": analysis_version,
+    }
+    client.post("/api/analysis/", json=create_json)
+    alert_version = client.get(f"/api/alert/{alert['uuid']}").json()["version"]
+
+    results_json = {
+        "details": '{"a": 1}',
+        "discovered_observables": [
+            {
+                "type": "url",
+                "value": "http://test",
+                "analyses": [
+                    {
+                        "analysis_module_type": module_type_uuid,
+                        "discovered_observables": [{"type": "ipv4", "value": "10.0.0.1"}],
+                    }
+                ],
+            },
+            {"type": "ipv4", "value": "127.0.0.1", "directives": ["sandbox"]},
+        ],
+        "summary": "test summary",
+        "version": analysis_version,
+    }
+    submit = client.post(f"/api/analysis/{analysis_uuid}/results", json=results_json)
+    assert submit.status_code == status.HTTP_201_CREATED
+    assert submit.headers["Content-Location"]
+    assert submit.json()["uuid"] == analysis_uuid
+    assert len(submit.json()["discovered_observables"]) == 2
+    assert len(submit.json()["discovered_observables"][0]["analyses"][0]["discovered_observables"]) == 1
+
+    # The analysis received the results and a single new version
+    analysis = client.get(f"/api/analysis/{analysis_uuid}").json()
+    assert analysis["details"] == {"a": 1}
+    assert analysis["summary"] == "test summary"
+    assert analysis["version"] != analysis_version
+    assert len(analysis["discovered_observable_uuids"]) == 2
+
+    # The discovered observable instances belong to the same alert, which received a new version
+    assert client.get(f"/api/alert/{alert['uuid']}").json()["version"] != alert_version
+    instance_uuid = submit.json()["discovered_observables"][1]["uuid"]
+    instance = client.get(f"/api/observable/instance/{instance_uuid}").json()
+    assert instance["alert_uuid"] == alert["uuid"]
+    assert instance["parent_analysis_uuid"] == analysis_uuid
+    assert [d["value"] for d in instance["directives"]] == ["sandbox"]
+
+    # The observable that was already in the alert is not counted twice
+    assert instance["observable"]["alert_count"] == 1
+
+    # The nested analysis recorded the extended version of its analysis module type
+    nested_uuid = submit.json()["discovered_observables"][0]["analyses"][0]["uuid"]
+    reusable = client.get(
+        "/api/analysis/reusable",
+        params={
+            "observable_uuid": submit.json()["discovered_observables"][0]["observable_uuid"],
+            "analysis_module_type_uuid": module_type_uuid,
+        },
+    )
+    assert reusable.json()["uuid"] == nested_uuid
+
+
+def test_submit_root_analysis(client):
+    create_lookups(client)
+    alert = create_alert(client)
+
+    submit = client.post(
+        f"/api/analysis/{alert['analysis']['uuid']}/results",
+        json={"discovered_observables": discovered_observables(2), "version": alert["analysis"]["version"]},
+    )
+    assert submit.status_code == status.HTTP_201_CREATED
+
+    # The observable instances discovered by the root analysis belong to its alert
+    tree = client.get(f"/api/alert/{alert['uuid']}/tree").json()
+    assert len(tree["analysis"]["children"]) == 3
+    assert all(c["alert_uuid"] == alert["uuid"] for c in tree["analysis"]["children"])
+    assert tree["version"] != alert["version"]
+
+
+def test_submit_without_alert(client):
+    create_lookups(client)
+    analysis_uuid = str(uuid.uuid4())
+    version = str(uuid.uuid4())
+    client.post("/api/analysis/", json={"uuid": analysis_uuid, "version": version})
+
+    # An analysis that is not part of an alert can still discover observable instances
+    submit = client.post(
+        f"/api/analysis/{analysis_uuid}/results",
+        json={"discovered_observables": discovered_observables(2), "version": version},
+    )
+    assert submit.status_code == status.HTTP_201_CREATED
+
+    assert len(submit.json()["discovered_observables"]) == 2
+
+
+def test_submit_without_observables(client):
+    create_lookups(client)
+    alert = create_alert(client)
+
+    submit = client.post(
+        f"/api/analysis/{alert['analysis']['uuid']}/results",
+        json={"summary": "nothing found", "version": alert["analysis"]["version"]},
+    )
+    assert submit.status_code == status.HTTP_201_CREATED
+    assert submit.json()["discovered_observables"] == []
+
+    # The alert did not change
+    assert client.get(f"/api/alert/{alert['uuid']}").json()["version"] == alert["version"]
+
+
+def test_submit_query_count(client):
+    create_lookups(client)
+
+    # The number of statements does not depend on the number of discovered observables. The first submission only
+    # warms up the lookup cache.
+    counts = []
+    for count in [1, 1, 50]:
+        alert = create_alert(client)
+
+        queries = []
+        listener = lambda *args: queries.append(args)  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        submit = client.post(
+            f"/api/analysis/{alert['analysis']['uuid']}/results",
+            json={"discovered_observables": discovered_observables(count), "version": alert["analysis"]["version"]},
+        )
+        event.remove(engine, "before_cursor_execute", listener)
+
+        assert submit.status_code == status.HTTP_201_CREATED
+        counts.append(len(queries))
+
+    assert counts[1] == counts[2]
+
+    # Each table's rows are inserted with a single multi-row INSERT rather than an executemany
+    inserts = [q for q in queries if q[2].lstrip().upper().startswith("INSERT INTO OBSERVABLE_INSTANCE ")]
+    assert len(inserts) == 1
+    assert inserts[0][5] is False
+    assert inserts[0][2].count("VALUES") == 1
+    assert inserts[0][2].count("), (") == 49
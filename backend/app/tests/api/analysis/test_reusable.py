@@ -0,0 +1,146 @@
+import time
+import uuid
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.api.analysis.test_claim import create_lookups, create_module_type
+
+
+def create_analyzed_alert(client: TestClient, module_type_uuid: str, **analysis) -> dict:
+    """
+    Helper function to create an alert with an observable that was analyzed by the given analysis module type.
+    """
+
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {
+            "discovered_observables": [
+                {
+                    "type": "ipv4",
+                    "value": "127.0.0.1",
+                    "analyses": [{"analysis_module_type": module_type_uuid, "details": '{"a": 1}', **analysis}],
+                }
+            ]
+        },
+    }
+    return client.post("/api/alert/tree", json=create_json).json()
+
+
+def read_reusable(client: TestClient, alert: dict, module_type_uuid: str, **params):
+    params = {
+        "observable_uuid": alert["analysis"]["discovered_observables"][0]["observable_uuid"],
+        "analysis_module_type_uuid": module_type_uuid,
+        **params,
+    }
+    return client.get("/api/analysis/reusable", params=params)
+
+
+#
+# INVALID TESTS
+#
+
+
+def test_get_invalid_params(client):
+    get = client.get(f"/api/analysis/reusable?observable_uuid=1&analysis_module_type_uuid={uuid.uuid4()}")
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    get = client.get(f"/api/analysis/reusable?observable_uuid={uuid.uuid4()}")
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    get = client.get(
+        f"/api/analysis/reusable?observable_uuid={uuid.uuid4()}&analysis_module_type_uuid={uuid.uuid4()}&max_age=-1"
+    )
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_nonexistent(client):
+    get = client.get(f"/api/analysis/reusable?observable_uuid={uuid.uuid4()}&analysis_module_type_uuid={uuid.uuid4()}")
+    assert get.status_code == status.HTTP_404_NOT_FOUND
+
+
+#
+# VALID TESTS
+#
+
+
+def test_get_reusable(client):
+    create_lookups(client)
+    module_type_uuid = create_module_type(client)
+    alert = create_analyzed_alert(client, module_type_uuid, summary="test summary")
+    analysis_uuid = alert["analysis"]["discovered_observables"][0]["analyses"][0]["uuid"]
+
+    # The analysis can be reused for the same observable in a different alert
+    other_alert = client.post(
+        "/api/alert/tree",
+        json={
+            "queue": "test_queue",
+            "type": "test_type",
+            "analysis": {"discovered_observables": [{"type": "ipv4", "value": "127.0.0.1"}]},
+        },
+    ).json()
+
+    get = read_reusable(client, other_alert, module_type_uuid)
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["uuid"] == analysis_uuid
+    assert get.json()["details"] == {"a": 1}
+    assert get.json()["summary"] == "test summary"
+    assert get.headers["etag"]
+
+
+def test_get_reusable_created_analysis(client):
+    create_lookups(client)
+    module_type_uuid = create_module_type(client)
+    alert = create_analyzed_alert(client, create_module_type(client, version="2.0.0"))
+
+    # Results from other versions of the analysis module type are not reused
+    assert read_reusable(client, alert, module_type_uuid).status_code == status.HTTP_404_NOT_FOUND
+
+    create_json = {
+        "analysis_module_type": module_type_uuid,
+        "details": '{"b": 2}',
+        "parent_observable_uuid": alert["analysis"]["discovered_observables"][0]["uuid"],
+    }
+    client.post("/api/analysis/", json=create_json)
+
+    get = read_reusable(client, alert, module_type_uuid)
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["details"] == {"b": 2}
+
+
+def test_get_reusable_error(client):
+    create_lookups(client)
+    module_type_uuid = create_module_type(client)
+    alert = create_analyzed_alert(client, module_type_uuid, error_message="timed out")
+
+    # Failed analyses are not reused
+    assert read_reusable(client, alert, module_type_uuid).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_reusable_extended_version(client):
+    create_lookups(client)
+    module_type_uuid = create_module_type(client, extended_version='{"feed": "1"}')
+    alert = create_analyzed_alert(client, module_type_uuid)
+    assert read_reusable(client, alert, module_type_uuid).status_code == status.HTTP_200_OK
+
+    # Changing the extended version of the analysis module type makes its previous results stale
+    client.patch(f"/api/analysis/module_type/{module_type_uuid}", json={"extended_version": '{"feed": "2"}'})
+    assert read_reusable(client, alert, module_type_uuid).status_code == status.HTTP_404_NOT_FOUND
+
+    # And changing it back makes them fresh again
+    client.patch(f"/api/analysis/module_type/{module_type_uuid}", json={"extended_version": '{"feed": "1"}'})
+    assert read_reusable(client, alert, module_type_uuid).status_code == status.HTTP_200_OK
+
+
+def test_get_reusable_max_age(client):
+    create_lookups(client)
+    module_type_uuid = create_module_type(client)
+    alert = create_analyzed_alert(client, module_type_uuid)
+
+    # A max age of 0 never reuses a result
+    assert read_reusable(client, alert, module_type_uuid, max_age=0).status_code == status.HTTP_404_NOT_FOUND
+
+    time.sleep(1.1)
+    assert read_reusable(client, alert, module_type_uuid, max_age=1).status_code == status.HTTP_404_NOT_FOUND
+    assert read_reusable(client, alert, module_type_uuid, max_age=60).status_code == status.HTTP_200_OK
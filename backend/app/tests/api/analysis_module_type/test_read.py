@@ -38,3 +38,18 @@ def test_get_all_empty(client):
     get = client.get("/api/analysis/module_type/")
     assert get.status_code == status.HTTP_200_OK
     assert get.json() == []
+
+
+def test_get_all_snapshot_nested_lookup(client):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    create_json = {"observable_types": ["test_type"], "value": "test", "version": "1.0.0"}
+    client.post("/api/analysis/module_type/", json=create_json)
+    get = client.get("/api/analysis/module_type/")
+    assert get.json()[0]["observable_types"][0]["value"] == "test_type"
+
+    # Renaming the observable type replaces the snapshot since it is included in the list
+    observable_type_uuid = get.json()[0]["observable_types"][0]["uuid"]
+    client.patch(f"/api/observable/type/{observable_type_uuid}", json={"value": "renamed_type"})
+    get = client.get("/api/analysis/module_type/", headers={"If-None-Match": get.headers["ETag"]})
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()[0]["observable_types"][0]["value"] == "renamed_type"
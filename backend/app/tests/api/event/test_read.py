@@ -39,3 +39,15 @@ def test_get_nonexistent_uuid(client):
 #     get = client.get("/api/alert/module_type/")
 #     assert get.status_code == status.HTTP_200_OK
 #     assert get.json() == []
+
+
+def test_get_etag(client):
+    client.post("/api/event/status/", json={"value": "OPEN"})
+    create = client.post("/api/event/", json={"name": "test", "status": "OPEN"})
+
+    # The ETag is the event's version
+    get = client.get(create.headers["Content-Location"])
+    assert get.headers["ETag"] == f'"{get.json()["version"]}"'
+
+    get = client.get(create.headers["Content-Location"], headers={"If-None-Match": f'W/{get.headers["ETag"]}'})
+    assert get.status_code == status.HTTP_304_NOT_MODIFIED
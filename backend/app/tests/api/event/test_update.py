@@ -365,6 +365,35 @@ def test_update_type(client):
     assert get.json()["version"] != version
 
 
+@pytest.mark.parametrize(
+    "key,create_path",
+    [
+        ("risk_level", "/api/event/risk_level/"),
+        ("source", "/api/event/source/"),
+        ("type", "/api/event/type/"),
+    ],
+)
+def test_update_clear(client, key, create_path):
+    # Create an event status and the value the field is set to
+    client.post("/api/event/status/", json={"value": "OPEN"})
+    client.post(create_path, json={"value": "test"})
+
+    # Create an event with the field set
+    version = str(uuid.uuid4())
+    create = client.post("/api/event/", json={"version": version, "name": "test", "status": "OPEN", key: "test"})
+    get = client.get(create.headers["Content-Location"])
+    assert get.json()[key]["value"] == "test"
+
+    # Clear the field
+    update = client.patch(create.headers["Content-Location"], json={key: None, "version": version})
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+
+    # Read it back
+    get = client.get(create.headers["Content-Location"])
+    assert get.json()[key] is None
+    assert get.json()["version"] != version
+
+
 def test_update_vectors(client):
     # Create an event status
     client.post("/api/event/status/", json={"value": "OPEN"})
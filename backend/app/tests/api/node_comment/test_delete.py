@@ -79,6 +79,7 @@ def test_delete(client):
     get = client.get(create.headers["Content-Location"])
     assert get.status_code == status.HTTP_404_NOT_FOUND
 
-    # And make sure the node no longer shows the comment
-    get_node = client.get(node_create.headers["Content-Location"])
-    assert get_node.json()["comments"] == []
+    # And make sure the node no longer shows the comment. Deleting the comment counts as modifying the node.
+    get_node_after = client.get(node_create.headers["Content-Location"])
+    assert get_node_after.json()["comments"] == []
+    assert get_node_after.json()["version"] != get_node.json()["version"]
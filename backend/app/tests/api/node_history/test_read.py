@@ -0,0 +1,149 @@
+import pytest
+import uuid
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from db.node_history import node_history_writer
+
+
+def create_alert(client: TestClient, updates: int = 0) -> str:
+    """
+    Helper function to create an alert, update its name the given number of times, and write its history.
+    """
+
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+
+    version = str(uuid.uuid4())
+    create = client.post("/api/alert/", json={"queue": "test_queue", "type": "test_type", "version": version})
+    alert_uuid = client.get(create.headers["Content-Location"]).json()["uuid"]
+
+    for i in range(updates):
+        client.patch(f"/api/alert/{alert_uuid}", json={"name": str(i), "version": version})
+        version = client.get(f"/api/alert/{alert_uuid}").json()["version"]
+
+    node_history_writer.flush()
+    return alert_uuid
+
+
+#
+# INVALID TESTS
+#
+
+
+def test_get_invalid_uuid(client):
+    get = client.get("/api/node/1/history")
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_nonexistent_uuid(client):
+    get = client.get(f"/api/node/{uuid.uuid4()}/history")
+    assert get.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("action", "abc"),
+        ("user", "johndoe"),
+    ],
+)
+def test_get_nonexistent_filters(client, key, value):
+    alert_uuid = create_alert(client)
+
+    get = client.get(f"/api/node/{alert_uuid}/history", params={key: value})
+    assert get.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"cursor": "abc"},
+        {"limit": 0},
+        {"limit": 1001},
+    ],
+)
+def test_get_invalid_pagination(client, params):
+    alert_uuid = create_alert(client)
+
+    get = client.get(f"/api/node/{alert_uuid}/history", params=params)
+    assert get.status_code in [status.HTTP_400_BAD_REQUEST, status.HTTP_422_UNPROCESSABLE_ENTITY]
+
+
+#
+# VALID TESTS
+#
+
+
+def test_get_history(client):
+    alert_uuid = create_alert(client, updates=1)
+
+    get = client.get(f"/api/node/{alert_uuid}/history")
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["next_cursor"] is None
+    assert [h["action"]["value"] for h in get.json()["items"]] == ["CREATE", "UPDATE"]
+    assert all(h["node_uuid"] == alert_uuid for h in get.json()["items"])
+    assert get.json()["items"][0]["before"] is None
+    assert get.json()["items"][1]["after"]["name"] == "0"
+
+
+def test_get_history_filter_action(client):
+    alert_uuid = create_alert(client, updates=2)
+
+    get = client.get(f"/api/node/{alert_uuid}/history", params={"action": "UPDATE"})
+    assert [h["after"]["name"] for h in get.json()["items"]] == ["0", "1"]
+
+
+def test_get_history_filter_user(client):
+    alert_uuid = create_alert(client, updates=1)
+    client.post("/api/user/role/", json={"value": "test_role"})
+    client.post(
+        "/api/user/",
+        json={
+            "default_alert_queue": "test_queue",
+            "display_name": "John Doe",
+            "email": "john@test.com",
+            "password": "abcd1234",
+            "roles": ["test_role"],
+            "username": "johndoe",
+        },
+    )
+
+    # The changes are not attributed to a user until the API has authentication, so none of them match
+    get = client.get(f"/api/node/{alert_uuid}/history", params={"user": "johndoe"})
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json() == {"items": [], "next_cursor": None}
+
+
+def test_get_history_pagination(client):
+    alert_uuid = create_alert(client, updates=4)
+
+    # Page through the history two records at a time
+    records = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+
+        get = client.get(f"/api/node/{alert_uuid}/history", params=params)
+        assert len(get.json()["items"]) <= 2
+        records += get.json()["items"]
+
+        cursor = get.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(records) == 5
+    assert len({r["uuid"] for r in records}) == 5
+    assert [(r["timestamp"], r["uuid"]) for r in records] == sorted((r["timestamp"], r["uuid"]) for r in records)
+
+
+def test_get_history_other_node(client):
+    alert_uuid = create_alert(client)
+    analysis_uuid = client.get(f"/api/alert/{alert_uuid}").json()["analysis"]["uuid"]
+
+    # The alert's analysis has its own history
+    get = client.get(f"/api/node/{analysis_uuid}/history")
+    assert [h["node_uuid"] for h in get.json()["items"]] == [analysis_uuid]
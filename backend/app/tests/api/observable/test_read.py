@@ -1,6 +1,11 @@
+import asyncio
+import json
 import uuid
 
-from fastapi import status
+from fastapi import Request, status
+from fastapi.responses import StreamingResponse
+
+from api.routes.observable import get_all_observables
 
 
 #
@@ -34,10 +39,63 @@ def test_get_all(client):
     # Read them back
     get = client.get("/api/observable/")
     assert get.status_code == status.HTTP_200_OK
-    assert len(get.json()) == 2
+    assert len(get.json()["items"]) == 2
+    assert get.json()["next_cursor"] is None
 
 
 def test_get_all_empty(client):
     get = client.get("/api/observable/")
     assert get.status_code == status.HTTP_200_OK
-    assert get.json() == []
+    assert get.json() == {"items": [], "next_cursor": None}
+
+
+def test_get_all_pagination(client):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    for i in range(5):
+        client.post("/api/observable/", json={"type": "test_type", "value": f"test{i}"})
+
+    # Page through the observables two at a time
+    values = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+
+        get = client.get("/api/observable/", params=params)
+        assert len(get.json()["items"]) <= 2
+        values += [o["value"] for o in get.json()["items"]]
+
+        cursor = get.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(values) == [f"test{i}" for i in range(5)]
+
+
+def test_get_all_stream(client, db):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    for i in range(5):
+        client.post("/api/observable/", json={"type": "test_type", "value": f"test{i}"})
+
+    # Starlette 0.13's TestClient cannot read a StreamingResponse on Python 3.11, so the route is called directly and
+    # the lines it streams are read from the response's body iterator.
+    request = Request({"type": "http", "headers": [(b"accept", b"application/x-ndjson")]})
+    response = get_all_observables(request=request, cursor=None, limit=50, sort=None, db=db)
+    assert isinstance(response, StreamingResponse)
+    assert response.media_type == "application/x-ndjson"
+
+    async def read_lines() -> list:
+        return [line async for line in response.body_iterator]
+
+    loop = asyncio.new_event_loop()
+    try:
+        lines = loop.run_until_complete(read_lines())
+    finally:
+        loop.close()
+
+    # Every observable is streamed as a line of JSON
+    assert all(line.endswith("\n") for line in lines)
+    observables = [json.loads(line) for line in lines]
+    assert sorted(o["value"] for o in observables) == [f"test{i}" for i in range(5)]
+    assert all(o["type"]["value"] == "test_type" for o in observables)
@@ -0,0 +1,137 @@
+import uuid
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+
+def create_lookups(client: TestClient):
+    """
+    Helper function to create the lookup values used by the alerts in these tests.
+    """
+
+    client.post("/api/alert/disposition/", json={"rank": 1, "value": "FALSE_POSITIVE"})
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/queue/", json={"value": "other_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/observable/type/", json={"value": "test_type"})
+
+
+def create_alert(client: TestClient, value: str, queue: str = "test_queue", disposition: str = None) -> dict:
+    """
+    Helper function to create an alert containing an observable with the given value.
+    """
+
+    create_json = {
+        "queue": queue,
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{"type": "test_type", "value": value}]},
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+
+    if disposition:
+        version = client.get(create.headers["Content-Location"]).json()["version"]
+        client.patch(create.headers["Content-Location"], json={"disposition": disposition, "version": version})
+
+    return create.json()
+
+
+#
+# INVALID TESTS
+#
+
+
+def test_get_invalid_uuid(client):
+    get = client.get("/api/observable/1/alerts")
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_nonexistent_uuid(client):
+    get = client.get(f"/api/observable/{uuid.uuid4()}/alerts")
+    assert get.status_code == status.HTTP_404_NOT_FOUND
+
+
+#
+# VALID TESTS
+#
+
+
+def test_get_alerts(client):
+    create_lookups(client)
+
+    # Create alerts that contain the observable in different queues and with different dispositions
+    alerts = [
+        create_alert(client, "evil.com"),
+        create_alert(client, "evil.com", disposition="FALSE_POSITIVE"),
+        create_alert(client, "evil.com", queue="other_queue", disposition="FALSE_POSITIVE"),
+    ]
+    create_alert(client, "good.com")
+    observable_uuid = alerts[0]["analysis"]["discovered_observables"][0]["observable_uuid"]
+
+    get = client.get(f"/api/observable/{observable_uuid}/alerts")
+    assert get.status_code == status.HTTP_200_OK
+    assert sorted(a["uuid"] for a in get.json()["items"]) == sorted(a["uuid"] for a in alerts)
+    assert get.json()["next_cursor"] is None
+    assert sorted(get.json()["dispositions"], key=lambda c: c["count"]) == [
+        {"count": 1, "value": None},
+        {"count": 2, "value": "FALSE_POSITIVE"},
+    ]
+    assert sorted(get.json()["queues"], key=lambda c: c["count"]) == [
+        {"count": 1, "value": "other_queue"},
+        {"count": 2, "value": "test_queue"},
+    ]
+
+
+def test_get_alerts_pagination(client):
+    create_lookups(client)
+
+    alerts = [create_alert(client, "evil.com") for _ in range(5)]
+    observable_uuid = alerts[0]["analysis"]["discovered_observables"][0]["observable_uuid"]
+
+    # Page through the alerts two at a time. The counts always include every alert.
+    alert_uuids = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+
+        get = client.get(f"/api/observable/{observable_uuid}/alerts", params=params)
+        assert len(get.json()["items"]) <= 2
+        assert get.json()["queues"] == [{"count": 5, "value": "test_queue"}]
+        alert_uuids += [a["uuid"] for a in get.json()["items"]]
+
+        cursor = get.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(alert_uuids) == sorted(a["uuid"] for a in alerts)
+
+
+def test_get_alerts_repeated_observable(client):
+    create_lookups(client)
+
+    # An alert that contains the observable more than once is only returned once
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {
+            "discovered_observables": [
+                {"type": "test_type", "value": "evil.com"},
+                {"type": "test_type", "value": "evil.com", "context": "again"},
+            ]
+        },
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    observable_uuid = create.json()["analysis"]["discovered_observables"][0]["observable_uuid"]
+
+    get = client.get(f"/api/observable/{observable_uuid}/alerts")
+    assert [a["uuid"] for a in get.json()["items"]] == [create.json()["uuid"]]
+    assert get.json()["dispositions"] == [{"count": 1, "value": None}]
+
+
+def test_get_alerts_none(client):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    create = client.post("/api/observable/", json={"type": "test_type", "value": "test"})
+
+    get = client.get(f"{create.headers['Content-Location']}/alerts")
+    assert get.json() == {"items": [], "next_cursor": None, "dispositions": [], "queues": []}
@@ -0,0 +1,199 @@
+import pytest
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+
+def create_lookups(client: TestClient):
+    """
+    Helper function to create the lookup values used by the alerts in these tests.
+    """
+
+    client.post("/api/alert/disposition/", json={"rank": 1, "value": "FALSE_POSITIVE"})
+    client.post("/api/alert/disposition/", json={"malicious": True, "rank": 2, "value": "DELIVERY"})
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/observable/type/", json={"value": "test_type"})
+
+
+def create_alert(client: TestClient, values: list, time: str = "2021-01-01T00:00:00+00:00") -> dict:
+    """
+    Helper function to create an alert containing observables with the given values.
+    """
+
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {
+            "discovered_observables": [{"time": time, "type": "test_type", "value": value} for value in values]
+        },
+    }
+    return client.post("/api/alert/tree", json=create_json).json()
+
+
+def disposition_alert(client: TestClient, alert_uuid: str, disposition: str):
+    version = client.get(f"/api/alert/{alert_uuid}").json()["version"]
+    update = client.patch(f"/api/alert/{alert_uuid}", json={"disposition": disposition, "version": version})
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+
+
+def read_observable(client: TestClient, alert: dict, index: int = 0) -> dict:
+    observable_uuid = alert["analysis"]["discovered_observables"][index]["observable_uuid"]
+    return client.get(f"/api/observable/{observable_uuid}").json()
+
+
+#
+# INVALID TESTS
+#
+
+
+def test_get_all_invalid_sort(client):
+    get = client.get("/api/observable/?sort=abc")
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+#
+# VALID TESTS
+#
+
+
+def test_new_observable(client):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    client.post("/api/observable/", json={"type": "test_type", "value": "test"})
+
+    # An observable that has not been seen in any alerts has empty statistics
+    observable = client.get("/api/observable/").json()["items"][0]
+    assert observable["alert_count"] == 0
+    assert observable["first_seen"] is None
+    assert observable["last_seen"] is None
+    assert observable["malicious_alert_count"] == 0
+
+
+def test_alert_tree_sightings(client):
+    create_lookups(client)
+
+    # The observable appears twice in the first alert, but the alert is only counted once
+    alert1 = create_alert(client, ["test", "test"], time="2021-01-02T00:00:00+00:00")
+    observable = read_observable(client, alert1)
+    assert observable["alert_count"] == 1
+    assert observable["first_seen"] == "2021-01-02T00:00:00+00:00"
+    assert observable["last_seen"] == "2021-01-02T00:00:00+00:00"
+
+    # Seeing the observable again updates the times it was seen and counts the new alert
+    create_alert(client, ["test"], time="2021-01-03T00:00:00+00:00")
+    create_alert(client, ["test"], time="2021-01-01T00:00:00+00:00")
+    observable = read_observable(client, alert1)
+    assert observable["alert_count"] == 3
+    assert observable["first_seen"] == "2021-01-01T00:00:00+00:00"
+    assert observable["last_seen"] == "2021-01-03T00:00:00+00:00"
+    assert observable["malicious_alert_count"] == 0
+
+
+def test_observable_instance_sightings(client):
+    create_lookups(client)
+    alert = create_alert(client, ["test"])
+
+    # Adding another instance of the observable to the same alert does not count the alert again
+    create_json = {
+        "alert_uuid": alert["uuid"],
+        "parent_analysis_uuid": alert["analysis"]["uuid"],
+        "time": "2021-02-01T00:00:00+00:00",
+        "type": "test_type",
+        "value": "test",
+    }
+    create = client.post("/api/observable/instance/", json=create_json)
+    assert create.status_code == status.HTTP_201_CREATED
+
+    observable = read_observable(client, alert)
+    assert observable["alert_count"] == 1
+    assert observable["first_seen"] == "2021-01-01T00:00:00+00:00"
+    assert observable["last_seen"] == "2021-02-01T00:00:00+00:00"
+
+    # Adding it to a malicious alert counts as a malicious sighting
+    alert2 = create_alert(client, ["other"])
+    disposition_alert(client, alert2["uuid"], "DELIVERY")
+    create_json.update({"alert_uuid": alert2["uuid"], "parent_analysis_uuid": alert2["analysis"]["uuid"]})
+    client.post("/api/observable/instance/", json=create_json)
+
+    observable = read_observable(client, alert)
+    assert observable["alert_count"] == 2
+    assert observable["malicious_alert_count"] == 1
+
+
+def test_disposition_changes(client):
+    create_lookups(client)
+    alert1 = create_alert(client, ["test", "other"])
+    alert2 = create_alert(client, ["test"])
+
+    # Dispositioning an alert as malicious counts it for every observable in the alert
+    disposition_alert(client, alert1["uuid"], "DELIVERY")
+    assert read_observable(client, alert1, 0)["malicious_alert_count"] == 1
+    assert read_observable(client, alert1, 1)["malicious_alert_count"] == 1
+
+    # Changing to another malicious disposition does not count the alert twice
+    client.post("/api/alert/disposition/", json={"malicious": True, "rank": 3, "value": "EXPLOITATION"})
+    disposition_alert(client, alert1["uuid"], "EXPLOITATION")
+    assert read_observable(client, alert1, 0)["malicious_alert_count"] == 1
+
+    # The bulk update adjusts the counts of every alert it changes
+    alerts = [client.get(f"/api/alert/{a['uuid']}").json() for a in [alert1, alert2]]
+    alerts = [{"uuid": a["uuid"], "version": a["version"]} for a in alerts]
+    update = client.patch("/api/alert/bulk", json={"alerts": alerts, "disposition": "DELIVERY"})
+    assert len(update.json()["updated"]) == 2
+    assert read_observable(client, alert1, 0)["malicious_alert_count"] == 2
+    assert read_observable(client, alert1, 1)["malicious_alert_count"] == 1
+
+    # Changing to a disposition that is not malicious removes the alert from the counts
+    disposition_alert(client, alert1["uuid"], "FALSE_POSITIVE")
+    assert read_observable(client, alert1, 0)["malicious_alert_count"] == 1
+    assert read_observable(client, alert1, 1)["malicious_alert_count"] == 0
+
+
+def test_disposition_malicious_changes(client):
+    create_lookups(client)
+    alert = create_alert(client, ["test"])
+    disposition_alert(client, alert["uuid"], "FALSE_POSITIVE")
+    assert read_observable(client, alert)["malicious_alert_count"] == 0
+
+    # Changing whether or not a disposition is malicious recounts the observables in its alerts
+    disposition_uuid = client.get(f"/api/alert/{alert['uuid']}").json()["disposition"]["uuid"]
+    client.patch(f"/api/alert/disposition/{disposition_uuid}", json={"malicious": True})
+    assert read_observable(client, alert)["malicious_alert_count"] == 1
+
+    client.patch(f"/api/alert/disposition/{disposition_uuid}", json={"malicious": False})
+    assert read_observable(client, alert)["malicious_alert_count"] == 0
+
+
+@pytest.mark.parametrize("sort", ["alert_count", "malicious_alert_count"])
+def test_get_all_sorted_by_count(client, sort):
+    create_lookups(client)
+
+    # The observable "c" is in three alerts, "b" is in two, and "a" is in one
+    for values in [["a", "b", "c"], ["b", "c"], ["c"]]:
+        alert = create_alert(client, values)
+        disposition_alert(client, alert["uuid"], "DELIVERY")
+
+    get = client.get(f"/api/observable/?sort={sort}&limit=2")
+    assert [o["value"] for o in get.json()["items"]] == ["c", "b"]
+    assert [o[sort] for o in get.json()["items"]] == [3, 2]
+
+    get = client.get(f"/api/observable/?sort={sort}&limit=2&cursor={get.json()['next_cursor']}")
+    assert [o["value"] for o in get.json()["items"]] == ["a"]
+    assert get.json()["next_cursor"] is None
+
+
+def test_get_all_sorted_by_time(client):
+    create_lookups(client)
+    create_alert(client, ["a"], time="2021-01-01T00:00:00+00:00")
+    create_alert(client, ["b"], time="2021-01-03T00:00:00+00:00")
+    create_alert(client, ["c"], time="2021-01-02T00:00:00+00:00")
+    create_alert(client, ["a"], time="2021-01-04T00:00:00+00:00")
+
+    # Observables that have never been seen in an alert are not included
+    client.post("/api/observable/", json={"type": "test_type", "value": "d"})
+
+    get = client.get("/api/observable/?sort=first_seen")
+    assert [o["value"] for o in get.json()["items"]] == ["b", "c", "a"]
+
+    get = client.get("/api/observable/?sort=last_seen")
+    assert [o["value"] for o in get.json()["items"]] == ["a", "b", "c"]
@@ -0,0 +1,122 @@
+import pytest
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+
+def create_observables(client: TestClient, values: list, type: str = "test_type"):
+    """
+    Helper function to create observables with the given values.
+    """
+
+    for value in values:
+        client.post("/api/observable/", json={"type": type, "value": value})
+
+
+#
+# INVALID TESTS
+#
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"q": ""},
+        {"q": "ab"},
+        {"q": "abc", "limit": 0},
+        {"q": "abc", "limit": 1001},
+    ],
+)
+def test_search_invalid_params(client, params):
+    get = client.get("/api/observable/search", params=params)
+    assert get.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_search_invalid_cursor(client):
+    get = client.get("/api/observable/search", params={"q": "abc", "cursor": "abc"})
+    assert get.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_search_nonexistent_type(client):
+    get = client.get("/api/observable/search", params={"q": "abc", "type": "abc"})
+    assert get.status_code == status.HTTP_404_NOT_FOUND
+
+
+#
+# VALID TESTS
+#
+
+
+def test_search(client):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    create_observables(client, ["evil.com", "www.EVIL.com", "evil.com.example.org", "good.com"])
+
+    # The matches are case insensitive and the closest match comes first
+    get = client.get("/api/observable/search", params={"q": "evil.com"})
+    assert get.status_code == status.HTTP_200_OK
+    values = [o["value"] for o in get.json()["items"]]
+    assert values[0] == "evil.com"
+    assert sorted(values) == sorted(["evil.com", "www.EVIL.com", "evil.com.example.org"])
+    assert get.json()["next_cursor"] is None
+
+
+def test_search_wildcards(client):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    create_observables(client, ["c:\\temp\\100%_evil.exe", "c:\\temp\\100xevil.exe"])
+
+    # The LIKE wildcards in the search text are matched literally
+    get = client.get("/api/observable/search", params={"q": "100%_evil"})
+    assert [o["value"] for o in get.json()["items"]] == ["c:\\temp\\100%_evil.exe"]
+
+    get = client.get("/api/observable/search", params={"q": "temp\\100"})
+    assert len(get.json()["items"]) == 2
+
+
+def test_search_type(client):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    client.post("/api/observable/type/", json={"value": "other_type"})
+    create_observables(client, ["evil.com"])
+    create_observables(client, ["evil.com"], type="other_type")
+
+    get = client.get("/api/observable/search", params={"q": "evil", "type": "other_type"})
+    assert [o["type"]["value"] for o in get.json()["items"]] == ["other_type"]
+
+
+def test_search_pagination(client):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    create_observables(client, [f"{'a' * i}evil.com" for i in range(7)])
+
+    # Page through the results three at a time
+    results = []
+    cursor = None
+    while True:
+        params = {"q": "evil.com", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+
+        get = client.get("/api/observable/search", params=params)
+        assert len(get.json()["items"]) <= 3
+        results += [o["value"] for o in get.json()["items"]]
+
+        cursor = get.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    # Every result is returned once, starting with the closest match
+    assert len(results) == 7
+    assert sorted(results) == sorted(f"{'a' * i}evil.com" for i in range(7))
+    assert results[0] == "evil.com"
+
+
+def test_search_uses_trigram_index(client, db):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    create_observables(client, ["evil.com"])
+
+    # The tiny test table would normally be scanned sequentially, so make sure the index can be used at all
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = db.execute(
+        text("EXPLAIN SELECT * FROM observable WHERE value ILIKE :pattern ESCAPE '\\'"), {"pattern": "%evil%"}
+    ).scalars().all()
+    assert "observable_value_trgm" in "\n".join(plan)
@@ -423,6 +423,30 @@ def test_create_valid_required_fields(client):
     assert get_analysis.json()["version"] != initial_analysis_version
 
 
+def test_create_valid_existing_observable(client):
+    alert_uuid, analysis_uuid = create_alert(client=client)
+    client.post("/api/observable/type/", json={"value": "test_type"})
+
+    # Create the observable ahead of time
+    create_observable = client.post("/api/observable/", json={"type": "test_type", "value": "test"})
+    observable_uuid = client.get(create_observable.headers["Content-Location"]).json()["uuid"]
+
+    # Create two observable instances that represent the same observable
+    create_json = {
+        "alert_uuid": alert_uuid,
+        "parent_analysis_uuid": analysis_uuid,
+        "type": "test_type",
+        "value": "test",
+    }
+    for _ in range(2):
+        create = client.post("/api/observable/instance/", json=create_json)
+        assert create.status_code == status.HTTP_201_CREATED
+
+        # Both of them should use the existing observable instead of trying to create it again
+        get = client.get(create.headers["Content-Location"])
+        assert get.json()["observable"]["uuid"] == observable_uuid
+
+
 @pytest.mark.parametrize(
     "values",
     VALID_DIRECTIVES,
@@ -23,6 +23,31 @@ def test_get_nonexistent_uuid(client):
 #
 
 
+def test_get_etag_observable_changes(client):
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/observable/type/", json={"value": "test_type"})
+
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{"type": "test_type", "value": "test"}]},
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    observable_instance = create.json()["analysis"]["discovered_observables"][0]
+    get = client.get(f"/api/observable/instance/{observable_instance['uuid']}")
+    assert get.json()["observable"]["alert_count"] == 1
+
+    # Seeing the observable in another alert does not change the observable instance's version, but it does change
+    # the ETag since the observable's statistics are part of the response
+    client.post("/api/alert/tree", json=create_json)
+    get = client.get(
+        f"/api/observable/instance/{observable_instance['uuid']}", headers={"If-None-Match": get.headers["ETag"]}
+    )
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["observable"]["alert_count"] == 2
+
+
 # There is currently no get_all endpoint for analysis
 # def test_get_all(client):
 #     # Create some objects
@@ -3,12 +3,29 @@ import pytest
 
 from alembic.config import Config
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
-from db.database import engine, get_db
+from db.crud.lookup_cache import lookup_cache
+from db.crud.lookup_snapshots import lookup_snapshots
+from db.crud.node_cache import node_cache
+from db.database import engine, get_async_db, get_db
+from db.node_history import node_history_writer
 from main import app
 
 
+class SyncSessionRunner:
+    """
+    Stands in for an AsyncSession in the async routes by running their functions directly on a regular Session.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.sync_session, *args, **kwargs)
+
+
 @pytest.fixture(scope="session", autouse=True)
 def apply_migrations():
     """
@@ -32,14 +49,29 @@ def db():
     Most tests will not need to use this fixture directly, as they will use it indirectly via the client fixture.
     """
 
+    # The caches must start empty since the rows cached by a previous test were rolled back.
+    lookup_cache.clear()
+    lookup_snapshots.clear()
+    node_cache.clear()
+
     # Connect to the database and begin a nested transaction.
     connection = engine.connect()
     connection.begin()
     session = Session(bind=connection)
 
+    # The node history is written using the test's transaction whenever node_history_writer.flush() is called instead
+    # of from a background thread. The actions it cached during a previous test were rolled back.
+    node_history_writer.clear()
+    node_history_writer.bind = connection
+
+    # A rollback undoes everything the test has done so far, including the nodes the queued history refers to.
+    event.listen(session, "after_rollback", lambda session: node_history_writer.clear())
+
     yield session
 
     # Close the session and the connection. The transaction is automatically rolled back.
+    node_history_writer.clear()
+    node_history_writer.bind = engine
     session.close()
     connection.close()
 
@@ -58,9 +90,15 @@ def client(db):
     def override_get_db():
         yield db
 
+    # The async routes run their database work with AsyncSession.run_sync. Running it directly on the testing db
+    # fixture instead lets those routes use the same transaction as every other route in the test.
+    async def override_get_async_db():
+        yield SyncSessionRunner(db)
+
     # Override the get_db function to use the testing db fixture so that every
     # test gets its own transaction that is rolled back when it completes.
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
     with TestClient(app) as c:
         yield c
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from db.alert_stream import AlertStream, CHANNEL, notify_alert_changes, RESET
+from db.database import database_url, engine
+
+
+def create_alert(client: TestClient, queue: str = "test_queue") -> dict:
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/queue/", json={"value": "other_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    create = client.post("/api/alert/", json={"queue": queue, "type": "test_type"})
+    return client.get(create.headers["Content-Location"]).json()
+
+
+def change(queue: str, previous_queue: str = None) -> str:
+    return json.dumps({"action": "UPDATE", "changed": [], "previous_queue": previous_queue, "queue": queue})
+
+
+def test_notify_alert_changes(client, db):
+    alert = create_alert(client)
+    alert_uuid = uuid.UUID(alert["uuid"])
+    other_queue_uuid = uuid.UUID(client.get("/api/alert/queue/").json()[1]["uuid"])
+
+    payloads = notify_alert_changes(
+        [(alert_uuid, "CREATE", [], None), (alert_uuid, "UPDATE", ["owner", "queue"], other_queue_uuid)], db=db
+    )
+    assert sorted((json.loads(p) for p in payloads), key=lambda p: p["action"]) == [
+        {"action": "CREATE", "changed": [], "queue": "test_queue", "uuid": alert["uuid"], "version": alert["version"]},
+        {
+            "action": "UPDATE",
+            "changed": ["owner", "queue"],
+            "previous_queue": "other_queue",
+            "queue": "test_queue",
+            "uuid": alert["uuid"],
+            "version": alert["version"],
+        },
+    ]
+
+
+def test_publish():
+    stream = AlertStream(dsn=database_url)
+    test_queue = stream.subscribe("test_queue")
+    other_queue = stream.subscribe("other_queue")
+    every_queue = stream.subscribe()
+    assert stream.stats() == {"listening": False, "subscribers": 3}
+
+    # The changes go to the subscribers of the alert's queue and of every queue
+    stream.publish(change("test_queue"))
+    assert test_queue.get_nowait() == change("test_queue")
+    assert every_queue.get_nowait() == change("test_queue")
+    assert other_queue.empty()
+
+    # An alert moved to another queue is sent to the subscribers of both queues
+    stream.publish(change("other_queue", previous_queue="test_queue"))
+    assert test_queue.qsize() == 1
+    assert other_queue.qsize() == 1
+    assert every_queue.qsize() == 1
+
+    stream.unsubscribe("test_queue", test_queue)
+    stream.publish(change("test_queue"))
+    assert test_queue.qsize() == 1
+    assert stream.stats()["subscribers"] == 2
+
+
+def test_publish_overflow():
+    stream = AlertStream(dsn=database_url, queue_size=2)
+    subscription = stream.subscribe()
+
+    # A subscriber that falls behind only receives a reset instead of the changes it missed
+    for _ in range(3):
+        stream.publish(change("test_queue"))
+
+    assert subscription.get_nowait() == RESET
+    assert subscription.empty()
+
+
+def test_listen():
+    async def listen() -> str:
+        stream = AlertStream(dsn=database_url)
+        await stream.listen()
+        subscription = stream.subscribe("test_queue")
+        assert stream.stats()["listening"] is True
+
+        # Notifications are only delivered once they are committed, so this one is sent outside of the test's
+        # transaction. Sending a notification does not change anything in the database.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(select(func.pg_notify(CHANNEL, change("test_queue"))))
+
+        try:
+            return await asyncio.wait_for(subscription.get(), timeout=5)
+        finally:
+            await stream.stop()
+
+    # asyncio.run is not used since it leaves the thread without an event loop for the tests that follow
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(listen()) == change("test_queue")
+    finally:
+        loop.close()
+
+
+def test_reconnect():
+    async def reconnect() -> list:
+        stream = AlertStream(dsn=database_url, reconnect_delay=0.1)
+        await stream.listen()
+        subscription = stream.subscribe("test_queue")
+
+        # Kill the listening connection from another session
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(select(func.pg_terminate_backend(stream._connection.get_server_pid())))
+
+        try:
+            # The subscriber is reset when the connection is lost and again once it is reopened
+            received = [await asyncio.wait_for(subscription.get(), timeout=5) for _ in range(2)]
+            assert stream.stats()["listening"] is True
+
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.execute(select(func.pg_notify(CHANNEL, change("test_queue"))))
+
+            received.append(await asyncio.wait_for(subscription.get(), timeout=5))
+            return received
+        finally:
+            await stream.stop()
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(reconnect()) == [RESET, RESET, change("test_queue")]
+    finally:
+        loop.close()
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.alert import AlertCreate, AlertSearch, AlertSort
+from api.models.alert_queue import AlertQueueCreate
+from api.models.alert_type import AlertTypeCreate
+from api.routes.alert import _create_alert, _read_alert, _read_alerts, _search_alerts
+from db import crud
+from db.database import async_engine
+from db.schemas.alert_queue import AlertQueue
+from db.schemas.alert_type import AlertType
+
+
+def run_async_session(fn):
+    """
+    Helper function to run the given coroutine function with an AsyncSession that uses the real asyncpg engine. The
+    client fixture replaces the async session, so this makes sure that the async routes also work with asyncpg.
+    Everything is done inside of a transaction that is rolled back.
+    """
+
+    async def run():
+        async with async_engine.connect() as connection:
+            await connection.begin()
+            session = AsyncSession(bind=connection)
+
+            try:
+                return await fn(session)
+            finally:
+                await session.close()
+
+    # A separate event loop is used so that the one used by the TestClient in the other tests is not closed.
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(run())
+    finally:
+        loop.run_until_complete(async_engine.dispose())
+        loop.close()
+
+
+async def create_lookups(session: AsyncSession):
+    await session.run_sync(lambda s: crud.create(obj=AlertQueueCreate(value="test_queue"), db_table=AlertQueue, db=s))
+    await session.run_sync(lambda s: crud.create(obj=AlertTypeCreate(value="test_type"), db_table=AlertType, db=s))
+
+
+def test_async_session(db):
+    async def create_and_read_alert(session: AsyncSession):
+        await create_lookups(session)
+
+        alert = AlertCreate(queue="test_queue", type="test_type")
+        await session.run_sync(_create_alert, alert)
+        return await session.run_sync(_read_alert, alert.uuid)
+
+    response = run_async_session(create_and_read_alert)
+
+    alert = json.loads(response.body)
+    assert alert["queue"]["value"] == "test_queue"
+    assert alert["analysis"]["uuid"]
+
+
+@pytest.mark.parametrize("sort", [AlertSort.event_time, AlertSort.insert_time])
+def test_async_session_read_page(db, sort):
+    async def read_pages(session: AsyncSession):
+        await create_lookups(session)
+        for _ in range(3):
+            await session.run_sync(_create_alert, AlertCreate(queue="test_queue", type="test_type"))
+
+        filters = dict.fromkeys(["disposition", "owner", "queue", "tool", "tool_instance", "type"])
+        page1 = await session.run_sync(_read_alerts, cursor=None, filters=filters, limit=2, sort=sort)
+        page2 = await session.run_sync(_read_alerts, cursor=page1.next_cursor, filters=filters, limit=2, sort=sort)
+        return page1, page2
+
+    # The cursor values have to be converted back into timestamps and UUIDs since asyncpg does not accept strings
+    page1, page2 = run_async_session(read_pages)
+    assert len(page1.items) == 2
+    assert page1.next_cursor
+    assert len(page2.items) == 1
+    assert page2.next_cursor is None
+    assert len({a.uuid for a in page1.items + page2.items}) == 3
+
+
+def test_async_session_search_page(db):
+    async def search_pages(session: AsyncSession):
+        await create_lookups(session)
+        for _ in range(3):
+            await session.run_sync(_create_alert, AlertCreate(queue="test_queue", type="test_type"))
+
+        search = AlertSearch(filter={"field": "queue", "op": "eq", "value": "test_queue"}, limit=2)
+        page1 = await session.run_sync(_search_alerts, search)
+        page2 = await session.run_sync(_search_alerts, search.copy(update={"cursor": page1.next_cursor}))
+        return page1, page2
+
+    page1, page2 = run_async_session(search_pages)
+    assert len(page1.items) == 2
+    assert len(page2.items) == 1
+    assert page2.next_cursor is None
+    assert len({a.uuid for a in page1.items + page2.items}) == 3
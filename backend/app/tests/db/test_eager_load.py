@@ -0,0 +1,42 @@
+from api.models.alert_queue import AlertQueueRead
+from api.models.analysis import AnalysisRead
+from api.models.node_threat import NodeThreatRead
+from db.crud import eager_load_options
+from db.schemas.alert_queue import AlertQueue
+from db.schemas.analysis import Analysis
+from db.schemas.node_threat import NodeThreat
+
+
+def option_paths(options: tuple) -> set:
+    """
+    Helper function to convert the loader options into the attribute names along each of their paths.
+    """
+
+    return {".".join(attribute.key for attribute in option.path) for option in options}
+
+
+def test_no_relationships():
+    assert eager_load_options(model=AlertQueueRead, db_table=AlertQueue) == ()
+
+
+def test_nested_relationships():
+    assert option_paths(eager_load_options(model=NodeThreatRead, db_table=NodeThreat)) == {"types"}
+
+    paths = option_paths(eager_load_options(model=AnalysisRead, db_table=Analysis))
+    assert "threats.types" in paths
+    assert "comments.user.roles" in paths
+    assert "analysis_module_type.required_tags" in paths
+
+
+def test_association_proxies():
+    paths = option_paths(eager_load_options(model=AnalysisRead, db_table=Analysis))
+    assert "discovered_observables" in paths
+    assert "parent_observable" in paths
+
+
+def test_exclude():
+    exclude = frozenset({"discovered_observable_uuids", "threats"})
+    paths = option_paths(eager_load_options(model=AnalysisRead, db_table=Analysis, exclude=exclude))
+    assert "discovered_observables" not in paths
+    assert "threats" not in paths
+    assert "tags" in paths
@@ -0,0 +1,95 @@
+import pytest
+
+from fastapi import HTTPException, status
+
+from db import crud
+from db.crud.lookup_cache import lookup_cache
+from db.schemas.alert_queue import AlertQueue
+from db.schemas.node_threat import NodeThreat
+
+
+def test_read_by_value_hit(client, db):
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+
+    # The first read misses the cache and the second read hits it
+    stats = lookup_cache.stats()
+    first = crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db)
+    second = crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db)
+    assert lookup_cache.stats()["misses"] == stats["misses"] + 1
+    assert lookup_cache.stats()["hits"] == stats["hits"] + 1
+
+    # The cached object is the same instance that is already in the session
+    assert first is second
+
+
+def test_read_by_value_hit_new_session(client, db):
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    uuid = crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db).uuid
+
+    # Reading the value after the session is cleared attaches the cached row to the session without a query
+    db.expunge_all()
+    stats = lookup_cache.stats()
+    cached = crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db)
+    assert lookup_cache.stats()["hits"] == stats["hits"] + 1
+    assert cached.uuid == uuid
+    assert cached in db
+
+
+def test_read_by_values_partial_hit(client, db):
+    client.post("/api/alert/queue/", json={"value": "test_queue1"})
+    client.post("/api/alert/queue/", json={"value": "test_queue2"})
+    crud.read_by_value(value="test_queue1", db_table=AlertQueue, db=db)
+
+    # Only the value that is not cached is read from the database
+    stats = lookup_cache.stats()
+    results = crud.read_by_values(values=["test_queue1", "test_queue2"], db_table=AlertQueue, db=db)
+    assert sorted(r.value for r in results) == ["test_queue1", "test_queue2"]
+    assert lookup_cache.stats()["hits"] == stats["hits"] + 1
+    assert lookup_cache.stats()["misses"] == stats["misses"] + 1
+
+
+def test_read_by_value_nonexistent_not_cached(client, db):
+    with pytest.raises(HTTPException) as e:
+        crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db)
+    assert e.value.status_code == status.HTTP_404_NOT_FOUND
+
+    # Creating the value after a failed read works since missing values are never cached
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    assert crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db).value == "test_queue"
+
+
+@pytest.mark.parametrize(
+    "path,db_table,extra_json",
+    [
+        ("/api/alert/queue/", AlertQueue, {}),
+        ("/api/node/threat/", NodeThreat, {"types": ["test_type"]}),
+    ],
+)
+def test_invalidate_on_update(client, db, path, db_table, extra_json):
+    client.post("/api/node/threat/type/", json={"value": "test_type"})
+    create = client.post(path, json={"value": "test", **extra_json})
+    crud.read_by_value(value="test", db_table=db_table, db=db)
+
+    # Renaming the value removes the old value from the cache
+    client.patch(create.headers["Content-Location"], json={"value": "renamed"})
+    with pytest.raises(HTTPException):
+        crud.read_by_value(value="test", db_table=db_table, db=db)
+    assert crud.read_by_value(value="renamed", db_table=db_table, db=db).value == "renamed"
+
+
+def test_invalidate_on_delete(client, db):
+    create = client.post("/api/alert/queue/", json={"value": "test_queue"})
+    crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db)
+
+    client.delete(create.headers["Content-Location"])
+    with pytest.raises(HTTPException):
+        crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db)
+
+
+def test_clear_on_rollback(client, db):
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    crud.read_by_value(value="test_queue", db_table=AlertQueue, db=db)
+    assert lookup_cache.stats()["size"] == 1
+
+    crud.rollback(db)
+    assert lookup_cache.stats()["size"] == 0
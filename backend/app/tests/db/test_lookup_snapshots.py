@@ -0,0 +1,35 @@
+import time
+
+from db.crud.lookup_snapshots import LookupSnapshots
+from db.schemas.alert_queue import AlertQueue
+from db.schemas.alert_type import AlertType
+
+
+def test_set_and_get():
+    snapshots = LookupSnapshots(ttl=60)
+    etag, body = snapshots.set(AlertQueue, body=b"[]", generation=snapshots.generation)
+
+    assert snapshots.get(AlertQueue) == (etag, b"[]")
+    assert snapshots.get(AlertType) is None
+    assert snapshots.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    # The ETag only depends on the response
+    assert LookupSnapshots(ttl=60).set(AlertType, body=b"[]", generation=0)[0] == etag
+
+
+def test_stale_generation():
+    snapshots = LookupSnapshots(ttl=60)
+
+    # A snapshot that was built before the snapshots were cleared is returned but not stored
+    generation = snapshots.generation
+    snapshots.clear()
+    assert snapshots.set(AlertQueue, body=b"[]", generation=generation)[1] == b"[]"
+    assert snapshots.get(AlertQueue) is None
+
+
+def test_expiration():
+    snapshots = LookupSnapshots(ttl=0.01)
+    snapshots.set(AlertQueue, body=b"[]", generation=snapshots.generation)
+    time.sleep(0.02)
+
+    assert snapshots.get(AlertQueue) is None
@@ -0,0 +1,32 @@
+import time
+
+from db.crud.node_cache import NodeCache
+
+
+def test_lru_eviction():
+    cache = NodeCache(max_size=2, ttl=60)
+    cache.set("a", b"a")
+    cache.set("b", b"b")
+
+    # Reading "a" makes "b" the least recently used entry, so it is the one evicted
+    assert cache.get("a") == b"a"
+    cache.set("c", b"c")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a"
+    assert cache.get("c") == b"c"
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2}
+
+
+def test_expiration():
+    cache = NodeCache(max_size=2, ttl=0.01)
+    cache.set("a", b"a")
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_disabled():
+    cache = NodeCache(max_size=0, ttl=60)
+    cache.set("a", b"a")
+    assert cache.get("a") is None
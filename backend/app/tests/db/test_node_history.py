@@ -0,0 +1,152 @@
+import uuid
+
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from db.database import engine
+from db.node_history import node_history_writer, NodeHistoryWriter
+from db.schemas.node_history import NodeHistory
+
+
+def create_lookups(client: TestClient):
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/queue/", json={"value": "other_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    client.post("/api/node/tag/", json={"value": "test_tag"})
+    client.post("/api/observable/type/", json={"value": "test_type"})
+
+
+def read_history(db, node_uuid) -> list:
+    return sorted(
+        db.query(NodeHistory).filter(NodeHistory.node_uuid == node_uuid).all(), key=lambda h: h.action.value
+    )
+
+
+def test_alert_history(client, db):
+    create_lookups(client)
+
+    # Create an alert and update it
+    version = str(uuid.uuid4())
+    create = client.post("/api/alert/", json={"queue": "test_queue", "type": "test_type", "version": version})
+    alert_uuid = client.get(create.headers["Content-Location"]).json()["uuid"]
+    client.patch(
+        create.headers["Content-Location"],
+        json={"name": "test", "queue": "other_queue", "tags": ["test_tag"], "version": version},
+    )
+    new_version = client.get(create.headers["Content-Location"]).json()["version"]
+
+    # Nothing is written until the writer flushes the queue
+    assert read_history(db, alert_uuid) == []
+    node_history_writer.flush()
+
+    create_history, update_history = read_history(db, alert_uuid)
+    assert create_history.action.value == "CREATE"
+    assert create_history.before is None
+    assert create_history.after["queue"] == "test_queue"
+    assert create_history.after["version"] == version
+
+    # The update only contains the fields that changed, including the tags changed through the ORM
+    assert update_history.action.value == "UPDATE"
+    assert set(update_history.after) == {"name", "queue_uuid", "tags", "version"}
+    assert update_history.before["name"] is None
+    assert update_history.before["tags"] == []
+    assert update_history.before["version"] == version
+    assert update_history.after["name"] == "test"
+    assert update_history.after["tags"] == ["test_tag"]
+    assert update_history.after["version"] == new_version
+
+
+def test_alert_tree_history(client, db):
+    create_lookups(client)
+
+    create_json = {
+        "queue": "test_queue",
+        "type": "test_type",
+        "analysis": {"discovered_observables": [{"type": "test_type", "value": "test", "tags": ["test_tag"]}]},
+    }
+    create = client.post("/api/alert/tree", json=create_json)
+    node_history_writer.flush()
+
+    # Every node in the tree has a single record with the values from each of its tables
+    observable_instance = create.json()["analysis"]["discovered_observables"][0]
+    for node_uuid in [create.json()["uuid"], create.json()["analysis"]["uuid"], observable_instance["uuid"]]:
+        assert [h.action.value for h in read_history(db, node_uuid)] == ["CREATE"]
+
+    history = read_history(db, observable_instance["uuid"])[0]
+    assert history.after["node_type"] == "observable_instance"
+    assert history.after["observable_uuid"] == observable_instance["observable_uuid"]
+    assert history.after["tags"] == ["test_tag"]
+
+
+def test_bulk_update_history(client, db):
+    create_lookups(client)
+
+    alerts = []
+    for _ in range(2):
+        alert = {"uuid": str(uuid.uuid4()), "version": str(uuid.uuid4())}
+        client.post("/api/alert/", json={**alert, "queue": "test_queue", "type": "test_type"})
+        alerts.append(alert)
+
+    client.patch("/api/alert/bulk", json={"alerts": alerts, "queue": "other_queue"})
+    node_history_writer.flush()
+
+    for alert in alerts:
+        update_history = read_history(db, alert["uuid"])[1]
+        assert set(update_history.after) == {"queue_uuid", "version"}
+        assert update_history.before["version"] == alert["version"]
+        assert update_history.after["version"] != alert["version"]
+
+
+def test_version_mismatch_not_recorded(client, db):
+    create_lookups(client)
+
+    create = client.post("/api/alert/", json={"queue": "test_queue", "type": "test_type"})
+    alert_uuid = client.get(create.headers["Content-Location"]).json()["uuid"]
+    client.patch(create.headers["Content-Location"], json={"name": "test", "version": str(uuid.uuid4())})
+    node_history_writer.flush()
+
+    assert [h.action.value for h in read_history(db, alert_uuid)] == ["CREATE"]
+
+
+def test_writer_batches(client, db):
+    create_lookups(client)
+    create = client.post("/api/alert/", json={"queue": "test_queue", "type": "test_type"})
+    alert_uuid = client.get(create.headers["Content-Location"]).json()["uuid"]
+
+    # Queue up five records using a writer that writes two records per batch
+    writer = NodeHistoryWriter(bind=db.connection(), batch_size=2, flush_interval=1.0)
+    writer.enqueue(
+        [
+            {
+                "action": "TEST",
+                "action_user_uuid": None,
+                "after": {"name": str(i)},
+                "before": {},
+                "node_uuid": alert_uuid,
+                "timestamp": datetime.utcnow(),
+            }
+            for i in range(5)
+        ]
+    )
+    assert writer.stats() == {"queued": 5, "written": 0, "failed": 0}
+
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO node_history "):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    writer.flush()
+    event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 3
+    assert writer.stats() == {"queued": 0, "written": 5, "failed": 0}
+    assert sorted(h.after["name"] for h in read_history(db, alert_uuid) if h.action.value == "TEST") == [
+        "0",
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from db import node_versions
+from db.database import engine
+from db.node_history import node_history_writer
+from db.schemas.node import Node
+from db.schemas.node_history import NodeHistory
+
+
+def create_alert(client: TestClient) -> dict:
+    client.post("/api/alert/queue/", json={"value": "test_queue"})
+    client.post("/api/alert/type/", json={"value": "test_type"})
+    create = client.post("/api/alert/", json={"queue": "test_queue", "type": "test_type"})
+    return client.get(create.headers["Content-Location"]).json()
+
+
+def read_version(db, node_uuid):
+    return db.query(Node.version).filter(Node.uuid == node_uuid).scalar()
+
+
+def test_bump_on_commit(client, db):
+    alert = create_alert(client)
+
+    # The version does not change until the transaction commits
+    node_versions.bump(db, alert["uuid"], alert["analysis"]["uuid"], None)
+    node_versions.bump(db, alert["uuid"])
+    assert str(read_version(db, alert["uuid"])) == alert["version"]
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    db.commit()
+    event.remove(engine, "before_cursor_execute", listener)
+
+    # Both nodes were bumped by a single statement even though the alert was given twice
+    assert len([s for s in statements if s.startswith("UPDATE node")]) == 1
+    new_version = read_version(db, alert["uuid"])
+    assert str(new_version) != alert["version"]
+    assert str(read_version(db, alert["analysis"]["uuid"])) != alert["analysis"]["version"]
+
+    # The new version is recorded in the history
+    node_history_writer.flush()
+    update_history = db.query(NodeHistory).filter(NodeHistory.node_uuid == alert["uuid"]).all()[-1]
+    assert update_history.action.value == "UPDATE"
+    assert update_history.before == {"version": alert["version"]}
+    assert update_history.after == {"version": str(new_version)}
+
+
+def test_bump_discarded_on_rollback(client, db):
+    alert = create_alert(client)
+
+    node_versions.bump(db, alert["uuid"])
+    db.rollback()
+    assert "node_version_bumps" not in db.info
+
+
+def test_observable_instances_bump_alert(client):
+    alert = create_alert(client)
+    client.post("/api/observable/type/", json={"value": "test_type"})
+
+    # Every observable instance added to the alert still gives it a new version
+    versions = [alert["version"]]
+    for value in ["a", "b"]:
+        create_json = {
+            "alert_uuid": alert["uuid"],
+            "parent_analysis_uuid": alert["analysis"]["uuid"],
+            "type": "test_type",
+            "value": value,
+        }
+        client.post("/api/observable/instance/", json=create_json)
+        versions.append(client.get(f"/api/alert/{alert['uuid']}").json()["version"])
+
+    assert len(set(versions)) == 3
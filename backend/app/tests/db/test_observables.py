@@ -0,0 +1,83 @@
+import uuid
+
+from datetime import datetime, timezone
+from sqlalchemy import event, select
+
+from api.models.observable import ObservableRead
+from db import crud
+from db.database import engine
+from db.schemas.observable import Observable
+from db.schemas.observable_type import ObservableType
+
+
+def test_read_or_create_observables(client, db):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    client.post("/api/observable/", json={"type": "test_type", "value": "existing"})
+
+    # Count the queries used to resolve a mix of existing and new observables (with a duplicate)
+    observable_type = crud.read_by_value(value="test_type", db_table=ObservableType, db=db)
+    queries = []
+    listener = lambda *args: queries.append(args)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    results = crud.read_or_create_observables(
+        observables=[("test_type", "existing"), ("test_type", "new"), ("test_type", "new")], db=db
+    )
+    event.remove(engine, "before_cursor_execute", listener)
+
+    # The observable type is cached, so only the upsert statement is needed
+    assert observable_type.uuid
+    assert len(queries) == 1
+
+    assert set(results) == {("test_type", "existing"), ("test_type", "new")}
+    assert all(isinstance(u, uuid.UUID) for u in results.values())
+    assert db.query(Observable).filter(Observable.value.in_(["existing", "new"])).count() == 2
+
+    # Resolving them again returns the same UUIDs without creating anything
+    assert crud.read_or_create_observables(observables=list(results), db=db) == results
+    assert db.query(Observable).filter(Observable.value.in_(["existing", "new"])).count() == 2
+
+
+def test_read_or_create_observable(client, db):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+
+    observable_uuid = crud.read_or_create_observable(type="test_type", value="test", db=db)
+    assert crud.read_or_create_observable(type="test_type", value="test", db=db) == observable_uuid
+
+
+def test_update_observable_sightings_without_alert(client, db):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    observable_uuid = crud.read_or_create_observable(type="test_type", value="test", db=db)
+
+    # A sighting outside of any alert still counts towards the first and last seen times
+    time = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    crud.update_observable_sightings([(observable_uuid, None, time)], db=db)
+
+    observable = db.execute(
+        select(Observable.alert_count, Observable.first_seen, Observable.last_seen).where(
+            Observable.uuid == observable_uuid
+        )
+    ).one()
+    assert observable.alert_count == 0
+    assert observable.first_seen == time
+    assert observable.last_seen == time
+
+
+def test_stream_all(client, db):
+    client.post("/api/observable/type/", json={"value": "test_type"})
+    for i in range(5):
+        client.post("/api/observable/", json={"type": "test_type", "value": f"test{i}"})
+
+    queries = []
+    listener = lambda *args: queries.append(args)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    observables = [
+        ObservableRead.from_orm(o)
+        for o in crud.stream_all(db_table=Observable, db=db, response_model=ObservableRead, batch_size=2)
+    ]
+    event.remove(engine, "before_cursor_execute", listener)
+
+    # The observables are read in order using a single query that also loads their types
+    assert [o.uuid for o in observables] == sorted(o.uuid for o in observables)
+    assert sorted(o.value for o in observables) == [f"test{i}" for i in range(5)]
+    assert all(o.type.value == "test_type" for o in observables)
+    assert len(queries) == 1
@@ -0,0 +1,63 @@
+import pytest
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+
+from db.database import database_url, engine, pool_metrics
+from db.pool_metrics import PoolMetrics
+
+
+def test_in_use(db):
+    # The db fixture holds a connection for the duration of the test
+    db.connection()
+    assert pool_metrics.snapshot(engine.pool)["in_use"] >= 1
+
+
+def test_checkout_and_checkin():
+    metrics = PoolMetrics()
+    test_engine = create_engine(database_url, poolclass=metrics.instrument_pool_class(QueuePool))
+    metrics.listen(test_engine)
+
+    connection = test_engine.connect()
+    snapshot = metrics.snapshot(test_engine.pool)
+    assert snapshot["checkouts"] == 1
+    assert snapshot["connections_created"] == 1
+    assert snapshot["in_use"] == 1
+    assert snapshot["checkout_wait_total_seconds"] > 0
+    assert snapshot["oldest_connection_age_seconds"] > 0
+
+    connection.close()
+    snapshot = metrics.snapshot(test_engine.pool)
+    assert snapshot["in_use"] == 0
+    assert snapshot["checked_in"] == 1
+
+    # Disposing of the engine closes the connections and recreates the pool, which must still be instrumented
+    test_engine.dispose()
+    assert metrics.snapshot(test_engine.pool)["oldest_connection_age_seconds"] == 0
+    test_engine.connect().close()
+    assert metrics.snapshot(test_engine.pool)["checkouts"] == 2
+
+
+def test_checkout_timeout():
+    metrics = PoolMetrics()
+    test_engine = create_engine(
+        database_url,
+        max_overflow=0,
+        poolclass=metrics.instrument_pool_class(QueuePool),
+        pool_size=1,
+        pool_timeout=0.1,
+    )
+    metrics.listen(test_engine)
+
+    # The second checkout waits for the only connection in the pool and times out
+    connection = test_engine.connect()
+    with pytest.raises(TimeoutError):
+        test_engine.connect()
+
+    snapshot = metrics.snapshot(test_engine.pool)
+    assert snapshot["checkout_timeouts"] == 1
+    assert snapshot["checkout_wait_max_seconds"] >= 0.1
+
+    connection.close()
+    test_engine.dispose()
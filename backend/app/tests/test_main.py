@@ -9,3 +9,19 @@ def test_ping():
     response = client.get("/api/ping")
     assert response.status_code == 200
     assert response.json() == {"ping": "pong"}
+
+
+def test_metrics():
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert set(response.json()) == {
+        "database_pool",
+        "async_database_pool",
+        "alert_search_statements",
+        "alert_stream",
+        "lookup_cache",
+        "lookup_snapshots",
+        "node_cache",
+        "node_history",
+    }
+    assert response.json()["database_pool"]["pool_size"] == 5